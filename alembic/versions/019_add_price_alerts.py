@@ -0,0 +1,60 @@
+"""Add persistent price alerts and arbitrage subscribers
+
+Revision ID: 019_price_alerts
+Revises: 018_privy_wallets
+Create Date: 2026-10-18
+
+Adds:
+- price_alerts table (user price alerts, loaded by the alerts service on startup)
+- arbitrage_subscribers table (users subscribed to arbitrage alerts)
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '019_price_alerts'
+down_revision: Union[str, None] = '018_privy_wallets'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'price_alerts',
+        sa.Column('id', sa.String(36), primary_key=True),
+        sa.Column('user_telegram_id', sa.BigInteger(), nullable=False),
+        sa.Column('platform', postgresql.ENUM(name='platform', create_type=False), nullable=False),
+        sa.Column('market_id', sa.String(255), nullable=False),
+        sa.Column('market_title', sa.Text(), nullable=False),
+        sa.Column('token_id', sa.String(255), nullable=True),
+        sa.Column('outcome', sa.String(8), nullable=False),
+        sa.Column('condition', sa.String(8), nullable=False),
+        sa.Column('target_price', sa.Numeric(18, 8), nullable=False),
+        sa.Column('triggered', sa.Boolean(), nullable=False, server_default='false'),
+        sa.Column('triggered_price', sa.Numeric(18, 8), nullable=True),
+        sa.Column('triggered_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index(
+        'ix_price_alerts_platform_market_triggered',
+        'price_alerts',
+        ['platform', 'market_id', 'triggered'],
+    )
+    op.create_index('ix_price_alerts_user', 'price_alerts', ['user_telegram_id'])
+
+    op.create_table(
+        'arbitrage_subscribers',
+        sa.Column('telegram_id', sa.BigInteger(), primary_key=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('arbitrage_subscribers')
+    op.drop_index('ix_price_alerts_user', table_name='price_alerts')
+    op.drop_index('ix_price_alerts_platform_market_triggered', table_name='price_alerts')
+    op.drop_table('price_alerts')
@@ -0,0 +1,37 @@
+"""Add market_matches table
+
+Revision ID: 020_market_matches
+Revises: 019_price_alerts
+Create Date: 2026-10-18
+
+Adds market_matches: confirmed equivalent markets across platforms, used by
+the arbitrage scanner as a persistent matching cache.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '020_market_matches'
+down_revision: Union[str, None] = '019_price_alerts'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'market_matches',
+        sa.Column('platform_a', sa.String(20), primary_key=True),
+        sa.Column('market_id_a', sa.String(255), primary_key=True),
+        sa.Column('platform_b', sa.String(20), primary_key=True),
+        sa.Column('market_id_b', sa.String(255), primary_key=True),
+        sa.Column('similarity', sa.Float(), nullable=True),
+        sa.Column('source', sa.String(16), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('market_matches')
@@ -0,0 +1,49 @@
+"""Add broadcast jobs and blocked-bot tracking
+
+Revision ID: 021_broadcasts
+Revises: 020_market_matches
+Create Date: 2026-10-18
+
+Adds:
+- broadcasts table (admin broadcast jobs with checkpointed progress)
+- users.bot_blocked_at (users who blocked the bot are skipped by broadcasts)
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '021_broadcasts'
+down_revision: Union[str, None] = '020_market_matches'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('bot_blocked_at', sa.DateTime(timezone=True), nullable=True))
+
+    op.create_table(
+        'broadcasts',
+        sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column('admin_telegram_id', sa.BigInteger(), nullable=False),
+        sa.Column('status_message_id', sa.BigInteger(), nullable=True),
+        sa.Column('text', sa.Text(), nullable=False, server_default=''),
+        sa.Column('photo_file_id', sa.String(255), nullable=True),
+        sa.Column('status', sa.String(16), nullable=False, server_default='running'),
+        sa.Column('total', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('last_telegram_id', sa.BigInteger(), nullable=True),
+        sa.Column('sent', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('failed', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('blocked', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index('ix_broadcasts_status', 'broadcasts', ['status'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_broadcasts_status', table_name='broadcasts')
+    op.drop_table('broadcasts')
+    op.drop_column('users', 'bot_blocked_at')
@@ -0,0 +1,73 @@
+"""Add NUMERIC mirrors of string amount columns
+
+Revision ID: 022_numeric_amounts
+Revises: 021_broadcasts
+Create Date: 2026-10-18
+
+Adds orders.input_amount_numeric, positions.token_amount_numeric and
+fee_transactions.amount_usdc_numeric so aggregations can run in SQL.
+
+The columns are backfilled in keyset batches, each committed on its own
+(autocommit block), so no long-held row locks block live trading. Values
+that do not parse as numbers stay NULL. The application writes both the
+string and the numeric column from here on.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '022_numeric_amounts'
+down_revision: Union[str, None] = '021_broadcasts'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILLS = [
+    ('orders', 'input_amount', 'input_amount_numeric'),
+    ('positions', 'token_amount', 'token_amount_numeric'),
+    ('fee_transactions', 'amount_usdc', 'amount_usdc_numeric'),
+]
+BATCH_SIZE = 5000
+AMOUNT_PATTERN = r'^-?[0-9]+(\.[0-9]+)?$'
+
+
+def _backfill(connection, table: str, source: str, target: str) -> None:
+    statement = sa.text(f"""
+        WITH batch AS (
+            SELECT id FROM {table}
+            WHERE id > :after_id
+            ORDER BY id
+            LIMIT :batch_size
+        )
+        UPDATE {table} AS t
+        SET {target} = CASE WHEN t.{source} ~ :pattern THEN CAST(t.{source} AS NUMERIC) END
+        FROM batch
+        WHERE t.id = batch.id
+        RETURNING t.id
+    """)
+    after_id = ''
+    while True:
+        ids = connection.execute(
+            statement,
+            {'after_id': after_id, 'batch_size': BATCH_SIZE, 'pattern': AMOUNT_PATTERN},
+        ).scalars().all()
+        if not ids:
+            break
+        after_id = max(ids)
+
+
+def upgrade() -> None:
+    for table, _, target in BACKFILLS:
+        op.add_column(table, sa.Column(target, sa.Numeric(), nullable=True))
+
+    with op.get_context().autocommit_block():
+        connection = op.get_bind()
+        for table, source, target in BACKFILLS:
+            _backfill(connection, table, source, target)
+
+
+def downgrade() -> None:
+    for table, _, target in BACKFILLS:
+        op.drop_column(table, target)
@@ -0,0 +1,40 @@
+"""Index users.referred_by_id
+
+Revision ID: 023_referred_by_index
+Revises: 022_numeric_amounts
+Create Date: 2026-10-18
+
+The referral tree queries walk users by referred_by_id. The index is built
+CONCURRENTLY so the users table stays writable while it builds.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '023_referred_by_index'
+down_revision: Union[str, None] = '022_numeric_amounts'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_users_referred_by_id',
+            'users',
+            ['referred_by_id'],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_users_referred_by_id',
+            table_name='users',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
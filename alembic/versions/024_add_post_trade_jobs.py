@@ -0,0 +1,59 @@
+"""Add post-trade job outbox
+
+Revision ID: 024_post_trade_jobs
+Revises: 023_referred_by_index
+Create Date: 2026-10-18
+
+Adds:
+- post_trade_jobs table (fees, partner volume and postbacks run after a trade)
+- unique index on fee_transactions (order_id, tier) so a retried job cannot
+  credit the same referral commission twice
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '024_post_trade_jobs'
+down_revision: Union[str, None] = '023_referred_by_index'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'post_trade_jobs',
+        sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column('kind', sa.String(32), nullable=False),
+        sa.Column('payload', sa.Text(), nullable=False, server_default='{}'),
+        sa.Column('status', sa.String(16), nullable=False, server_default='pending'),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('run_after', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index('ix_post_trade_jobs_status_run_after', 'post_trade_jobs', ['status', 'run_after'])
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_fee_tx_order_tier',
+            'fee_transactions',
+            ['order_id', 'tier'],
+            unique=True,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_fee_tx_order_tier',
+            table_name='fee_transactions',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.drop_index('ix_post_trade_jobs_status_run_after', table_name='post_trade_jobs')
+    op.drop_table('post_trade_jobs')
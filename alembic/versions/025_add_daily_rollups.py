@@ -0,0 +1,73 @@
+"""Add daily rollup tables for analytics
+
+Revision ID: 025_daily_rollups
+Revises: 024_post_trade_jobs
+Create Date: 2026-10-18
+
+Adds:
+- daily_trade_rollups (confirmed order volume per day, platform and user)
+- daily_fee_rollups (fee transactions per day, user, chain family and type)
+- created_at indexes on orders and fee_transactions, used to roll up one day
+  and to read the raw rows at the edges of a period
+
+The tables start empty; the rollup compactor backfills them day by day.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '025_daily_rollups'
+down_revision: Union[str, None] = '024_post_trade_jobs'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'daily_trade_rollups',
+        sa.Column('day', sa.Date(), primary_key=True),
+        sa.Column('platform', postgresql.ENUM(name='platform', create_type=False), primary_key=True),
+        sa.Column('user_id', sa.String(36), primary_key=True),
+        sa.Column('partner_id', sa.String(36), nullable=True),
+        sa.Column('volume_usdc', sa.Numeric(), nullable=False, server_default='0'),
+        sa.Column('trade_count', sa.Integer(), nullable=False, server_default='0'),
+    )
+    op.create_index('ix_daily_trade_rollups_user', 'daily_trade_rollups', ['user_id'])
+    op.create_index('ix_daily_trade_rollups_partner_day', 'daily_trade_rollups', ['partner_id', 'day'])
+
+    op.create_table(
+        'daily_fee_rollups',
+        sa.Column('day', sa.Date(), primary_key=True),
+        sa.Column('user_id', sa.String(36), primary_key=True),
+        sa.Column('chain_family', postgresql.ENUM(name='chainfamily', create_type=False), primary_key=True),
+        sa.Column('tx_type', sa.String(32), primary_key=True),
+        sa.Column('amount_usdc', sa.Numeric(), nullable=False, server_default='0'),
+        sa.Column('tx_count', sa.Integer(), nullable=False, server_default='0'),
+    )
+    op.create_index('ix_daily_fee_rollups_type_day', 'daily_fee_rollups', ['tx_type', 'day'])
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_orders_created_at', 'orders', ['created_at'],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.create_index(
+            'ix_fee_tx_created_at', 'fee_transactions', ['created_at'],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_fee_tx_created_at', table_name='fee_transactions', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_orders_created_at', table_name='orders', postgresql_concurrently=True, if_exists=True)
+    op.drop_index('ix_daily_fee_rollups_type_day', table_name='daily_fee_rollups')
+    op.drop_table('daily_fee_rollups')
+    op.drop_index('ix_daily_trade_rollups_partner_day', table_name='daily_trade_rollups')
+    op.drop_index('ix_daily_trade_rollups_user', table_name='daily_trade_rollups')
+    op.drop_table('daily_trade_rollups')
+    op.execute("DELETE FROM system_config WHERE key = 'rollups_complete_through'")
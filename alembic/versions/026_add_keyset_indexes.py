@@ -0,0 +1,68 @@
+"""Index positions and orders for keyset pagination
+
+Revision ID: 026_keyset_indexes
+Revises: 025_daily_rollups
+Create Date: 2026-10-18
+
+Position and order lists are paged by (created_at, id) cursors. The
+positions index replaces ix_positions_user_status, which is its prefix.
+Orders are listed across all statuses, so their index leads with user_id
+and created_at. Indexes are built CONCURRENTLY so trading is not blocked.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '026_keyset_indexes'
+down_revision: Union[str, None] = '025_daily_rollups'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_positions_user_status_created',
+            'positions',
+            ['user_id', 'status', 'created_at', 'id'],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            'ix_positions_user_status',
+            table_name='positions',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.create_index(
+            'ix_orders_user_created',
+            'orders',
+            ['user_id', 'created_at', 'id'],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_orders_user_created',
+            table_name='orders',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.create_index(
+            'ix_positions_user_status',
+            'positions',
+            ['user_id', 'status'],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            'ix_positions_user_status_created',
+            table_name='positions',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -37,7 +37,7 @@ async def run_api():
     from src.db.database import init_db
     from src.config import settings
 
-    await init_db(settings.database_url)
+    await init_db(settings.database_url, role="api")
 
     app = create_api_app()
     # Railway uses PORT, fallback to API_PORT or 8000
@@ -84,6 +84,11 @@ async def main():
     print("  - Mini App API")
     print("=" * 50)
 
+    # One connection pool shared by both services, sized for the combined load
+    from src.db.database import init_db
+    from src.config import settings
+    await init_db(settings.database_url, role="all")
+
     # Create tasks for both services
     bot_task = asyncio.create_task(run_bot())
     api_task = asyncio.create_task(run_api())
@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+"""
+Benchmark admin analytics queries on a seeded dataset.
+
+Seeds users, confirmed orders and referral fee transactions into a scratch
+PostgreSQL database (rows are prefixed "bench-" and removed afterwards),
+then times the previous Python-side aggregation against the SQL-side
+queries in src.db.database, before and after the daily rollups are compacted.
+
+Usage:
+    DATABASE_URL=postgresql://... python scripts/bench_analytics.py
+    python scripts/bench_analytics.py --database-url postgresql://... --orders 1000000 --keep
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import select, text  # noqa: E402
+
+from src.db import database  # noqa: E402
+from src.db.models import FeeTransaction, Order, OrderStatus, Platform, User  # noqa: E402
+from src.services.rollups import RollupCompactor  # noqa: E402
+
+PLATFORMS = [p.name for p in Platform]
+
+
+async def seed(users: int, orders: int, referral_txs: int) -> None:
+    platforms = "ARRAY[" + ",".join(f"'{p}'" for p in PLATFORMS) + "]"
+    async with database.get_session() as session:
+        await session.execute(text(
+            "INSERT INTO users (id, telegram_id, active_platform, default_slippage_bps, "
+            "cm_registration_sent, cm_qualification_sent) "
+            "SELECT 'bench-' || g, 9000000000 + g, 'KALSHI', 100, false, false "
+            "FROM generate_series(1, :n) g"
+        ), {"n": users})
+        await session.execute(text(
+            "INSERT INTO orders (id, user_id, platform, chain, market_id, outcome, side, "
+            "input_token, input_amount, input_amount_numeric, output_token, expected_output, status, created_at) "
+            f"SELECT 'bench-' || g, 'bench-' || (1 + g % :users), "
+            f"({platforms})[1 + g % {len(PLATFORMS)}]::platform, 'SOLANA', 'm' || (g % 5000), "
+            "'YES', 'BUY', 'USDC', ((1 + g % 500) * 1000000)::text, (1 + g % 500) * 1000000, 'T', '0', "
+            "CASE WHEN g % 10 = 0 THEN 'FAILED' ELSE 'CONFIRMED' END::orderstatus, "
+            "now() - (g % 90) * interval '1 day' "
+            "FROM generate_series(1, :n) g"
+        ), {"n": orders, "users": users})
+        await session.execute(text(
+            "INSERT INTO fee_transactions (id, user_id, chain_family, tx_type, amount_usdc, amount_usdc_numeric, created_at) "
+            "SELECT 'bench-' || g, 'bench-' || (1 + g % 1000), 'SOLANA', "
+            "'referral_tier' || (1 + g % 3), ((g % 100) / 100.0)::text, (g % 100) / 100.0, "
+            "now() - (g % 90) * interval '1 day' "
+            "FROM generate_series(1, :n) g"
+        ), {"n": referral_txs})
+        for table in ("users", "orders", "fee_transactions"):
+            await session.execute(text(f"ANALYZE {table}"))
+
+
+async def cleanup() -> None:
+    async with database.get_session() as session:
+        for table in ("daily_trade_rollups", "daily_fee_rollups"):
+            await session.execute(text(f"DELETE FROM {table} WHERE user_id LIKE 'bench-%'"))
+        for table in ("fee_transactions", "orders", "users"):
+            await session.execute(text(f"DELETE FROM {table} WHERE id LIKE 'bench-%'"))
+
+
+async def python_side_stats() -> Decimal:
+    """The previous implementation: load confirmed orders and referral rows, sum in Python."""
+    async with database.get_session() as session:
+        orders = (await session.execute(
+            select(Order).where(Order.status == OrderStatus.CONFIRMED)
+        )).scalars().all()
+        volume = sum((Decimal(o.input_amount) / Decimal("1000000") for o in orders), Decimal("0"))
+        referral = (await session.execute(
+            select(FeeTransaction).where(FeeTransaction.tx_type.like("referral_tier%"))
+        )).scalars().all()
+        sum(Decimal(tx.amount_usdc) for tx in referral)
+        return volume
+
+
+async def python_side_top_traders(limit: int = 10) -> None:
+    async with database.get_session() as session:
+        orders = (await session.execute(
+            select(Order).where(Order.status == OrderStatus.CONFIRMED)
+        )).scalars().all()
+        stats: dict[str, Decimal] = {}
+        for o in orders:
+            stats[o.user_id] = stats.get(o.user_id, Decimal("0")) + Decimal(o.input_amount) / Decimal("1000000")
+        for user_id, _ in sorted(stats.items(), key=lambda x: x[1], reverse=True)[:limit]:
+            await session.execute(select(User).where(User.id == user_id))
+
+
+async def timed(label: str, coro) -> float:
+    start = time.perf_counter()
+    await coro
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<40} {elapsed:8.2f}s")
+    return elapsed
+
+
+async def sql_side(title: str) -> None:
+    since_7d = datetime.now(timezone.utc) - timedelta(days=7)
+    print(title)
+    await timed("get_analytics_stats", database.get_analytics_stats())
+    await timed("get_analytics_stats (7d)", database.get_analytics_stats(since=since_7d))
+    await timed("get_analytics_by_platform", database.get_analytics_by_platform())
+    await timed("get_top_traders", database.get_top_traders())
+    await timed("get_top_referrers", database.get_top_referrers())
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark admin analytics queries")
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL"), help="Scratch PostgreSQL URL")
+    parser.add_argument("--users", type=int, default=50000)
+    parser.add_argument("--orders", type=int, default=1000000)
+    parser.add_argument("--referral-txs", type=int, default=200000)
+    parser.add_argument("--keep", action="store_true", help="Keep seeded rows")
+    parser.add_argument("--skip-python", action="store_true", help="Skip the slow Python-side baseline")
+    args = parser.parse_args()
+
+    if not args.database_url:
+        parser.error("--database-url or DATABASE_URL is required")
+
+    await database.init_db(args.database_url)
+    await database.create_tables()
+    try:
+        print(f"Seeding {args.users} users, {args.orders} orders, {args.referral_txs} referral payouts...")
+        start = time.perf_counter()
+        await seed(args.users, args.orders, args.referral_txs)
+        print(f"Seeded in {time.perf_counter() - start:.1f}s\n")
+
+        if not args.skip_python:
+            print("Python-side aggregation (before):")
+            await timed("stats (volume + referral payouts)", python_side_stats())
+            await timed("top traders", python_side_top_traders())
+
+        await sql_side("SQL-side aggregation (raw rows):")
+
+        await timed("compact daily rollups", RollupCompactor(lag_days=0).compact())
+        await sql_side("SQL-side aggregation (rollups):")
+    finally:
+        if not args.keep:
+            await cleanup()
+        await database.close_db()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
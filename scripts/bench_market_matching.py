@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+"""
+Benchmark cross-platform market matching on synthetic catalogs.
+
+Generates N markets per platform for five platforms, with a share of
+markets duplicated across platforms under reworded titles, and times
+candidate generation + scoring for every platform pair.
+
+Usage:
+    python scripts/bench_market_matching.py
+    python scripts/bench_market_matching.py --markets 5000 --naive
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services.market_matching import (  # noqa: E402
+    MIN_COMMON_WORDS,
+    MIN_SIMILARITY,
+    extract_match_key,
+    match_catalogs,
+)
+
+PLATFORMS = ["polymarket", "kalshi", "limitless", "opinion", "myriad"]
+
+SUBJECTS = [f"subject{i}" for i in range(5000)]
+TOPICS = [f"topic{i}" for i in range(300)]
+QUALIFIERS = [f"period{i}" for i in range(120)]
+FILLER = ["exceed", "reach", "announce", "approve", "hold", "above", "below", "during", "after", "record"]
+
+
+def synthetic_title(rng: random.Random) -> str:
+    words = [
+        rng.choice(SUBJECTS),
+        rng.choice(SUBJECTS),
+        rng.choice(TOPICS),
+        rng.choice(QUALIFIERS),
+        rng.choice(FILLER),
+    ]
+    return "Will " + " ".join(words) + "?"
+
+
+def reword(title: str, rng: random.Random) -> str:
+    words = title.rstrip("?").split()[1:]
+    rng.shuffle(words)
+    return "Will the " + " ".join(words) + " " + rng.choice(FILLER) + "?"
+
+
+def build_catalogs(markets: int, overlap: float, seed: int) -> dict[str, list[str]]:
+    rng = random.Random(seed)
+    shared = [synthetic_title(rng) for _ in range(int(markets * overlap))]
+    catalogs = {}
+    for platform in PLATFORMS:
+        titles = [reword(t, rng) for t in shared]
+        titles += [synthetic_title(rng) for _ in range(markets - len(titles))]
+        rng.shuffle(titles)
+        catalogs[platform] = titles
+    return catalogs
+
+
+def naive_match(keys_a, keys_b) -> int:
+    found = 0
+    for a in keys_a:
+        for b in keys_b:
+            common = len(a & b)
+            union = len(a | b)
+            if union and common >= MIN_COMMON_WORDS and common / union >= MIN_SIMILARITY:
+                found += 1
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark market matching")
+    parser.add_argument("--markets", type=int, default=5000, help="Markets per platform")
+    parser.add_argument("--overlap", type=float, default=0.2, help="Share of markets listed on every platform")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--naive", action="store_true", help="Also time the nested-loop matcher on one pair")
+    args = parser.parse_args()
+
+    catalogs = build_catalogs(args.markets, args.overlap, args.seed)
+
+    start = time.perf_counter()
+    keys = {p: [extract_match_key(t) for t in titles] for p, titles in catalogs.items()}
+    key_time = time.perf_counter() - start
+    print(f"Extracted keys for {len(PLATFORMS)} x {args.markets} markets in {key_time:.2f}s")
+
+    total_pairs = 0
+    start = time.perf_counter()
+    for i, platform_a in enumerate(PLATFORMS):
+        for platform_b in PLATFORMS[i + 1:]:
+            pair_start = time.perf_counter()
+            pairs = match_catalogs(keys[platform_a], keys[platform_b])
+            total_pairs += len(pairs)
+            print(f"  {platform_a:>10} x {platform_b:<10} {len(pairs):6d} pairs in {time.perf_counter() - pair_start:.2f}s")
+    print(f"Vectorized matcher: {total_pairs} pairs across all platform pairs in {time.perf_counter() - start:.2f}s")
+
+    if args.naive:
+        start = time.perf_counter()
+        found = naive_match(keys[PLATFORMS[0]], keys[PLATFORMS[1]])
+        elapsed = time.perf_counter() - start
+        print(f"Naive matcher (one platform pair): {found} pairs in {elapsed:.2f}s "
+              f"(~{elapsed * 10:.0f}s for all ten pairs)")
+
+
+if __name__ == "__main__":
+    main()
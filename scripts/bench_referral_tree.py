@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+"""
+Benchmark referral tree queries on a synthetic referral tree.
+
+Seeds a tree of users into a scratch PostgreSQL database (ids prefixed
+"bench-", removed afterwards) in which every user refers `--fanout` others,
+then times the previous per-user queries against the recursive CTE
+versions of get_referral_stats and get_referral_chain.
+
+Usage:
+    DATABASE_URL=postgresql://... python scripts/bench_referral_tree.py
+    python scripts/bench_referral_tree.py --database-url postgresql://... --users 100000 --fanout 20
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import select, text  # noqa: E402
+
+from src.db import database  # noqa: E402
+from src.db.models import User  # noqa: E402
+
+
+async def seed(users: int, fanout: int) -> None:
+    # User g is referred by user (g - 1) / fanout, giving a tree rooted at bench-0
+    async with database.get_session() as session:
+        await session.execute(text(
+            "INSERT INTO users (id, telegram_id, active_platform, default_slippage_bps, "
+            "cm_registration_sent, cm_qualification_sent, referred_by_id) "
+            "SELECT 'bench-' || g, 9100000000 + g, 'KALSHI', 100, false, false, "
+            "CASE WHEN g = 0 THEN NULL ELSE 'bench-' || ((g - 1) / :fanout) END "
+            "FROM generate_series(0, :n - 1) g"
+        ), {"n": users, "fanout": fanout})
+        await session.execute(text("ANALYZE users"))
+
+
+async def cleanup() -> None:
+    async with database.get_session() as session:
+        await session.execute(text("UPDATE users SET referred_by_id = NULL WHERE id LIKE 'bench-%'"))
+        await session.execute(text("DELETE FROM users WHERE id LIKE 'bench-%'"))
+
+
+async def per_user_stats(user_id: str) -> int:
+    """The previous implementation: one query per tier-1 and per tier-2 user."""
+    queries = 1
+    async with database.get_session() as session:
+        tier1 = (await session.execute(select(User).where(User.referred_by_id == user_id))).scalars().all()
+        tier2_ids = []
+        for t1 in tier1:
+            queries += 1
+            t2 = (await session.execute(select(User).where(User.referred_by_id == t1.id))).scalars().all()
+            tier2_ids.extend(u.id for u in t2)
+        for t2_id in tier2_ids:
+            queries += 1
+            (await session.execute(select(User).where(User.referred_by_id == t2_id))).scalars().all()
+    return queries
+
+
+async def per_tier_chain(user_id: str) -> None:
+    """The previous implementation: two round trips per tier."""
+    async with database.get_session() as session:
+        current_id = user_id
+        for _ in range(3):
+            user = (await session.execute(select(User).where(User.id == current_id))).scalar_one_or_none()
+            if not user or not user.referred_by_id:
+                break
+            referrer = (await session.execute(
+                select(User).where(User.id == user.referred_by_id)
+            )).scalar_one_or_none()
+            if not referrer:
+                break
+            current_id = referrer.id
+
+
+async def timed(label: str, coro) -> None:
+    start = time.perf_counter()
+    result = await coro
+    elapsed = time.perf_counter() - start
+    suffix = f"  ({result} queries)" if isinstance(result, int) else ""
+    print(f"  {label:<40} {elapsed * 1000:9.1f}ms{suffix}")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark referral tree queries")
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL"), help="Scratch PostgreSQL URL")
+    parser.add_argument("--users", type=int, default=100000)
+    parser.add_argument("--fanout", type=int, default=20, help="Referrals per user")
+    parser.add_argument("--keep", action="store_true", help="Keep seeded rows")
+    args = parser.parse_args()
+
+    if not args.database_url:
+        parser.error("--database-url or DATABASE_URL is required")
+
+    await database.init_db(args.database_url)
+    await database.create_tables()
+    try:
+        print(f"Seeding {args.users} users with fanout {args.fanout}...")
+        await seed(args.users, args.fanout)
+
+        root, leaf = "bench-0", f"bench-{args.users - 1}"
+
+        print("Per-user queries (before):")
+        await timed("referral stats (root)", per_user_stats(root))
+        await timed("referral chain (leaf)", per_tier_chain(leaf))
+
+        print("Recursive CTE (after):")
+        await timed("get_referral_stats (root)", database.get_referral_stats(root))
+        await timed("get_referral_chain (leaf)", database.get_referral_chain(leaf))
+    finally:
+        if not args.keep:
+            await cleanup()
+        await database.close_db()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
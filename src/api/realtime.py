@@ -92,7 +92,7 @@ async def price_event_generator(
 
 
 async def multi_market_event_generator(
-    markets: list[dict],  # [{"market_id": str, "yes_token": str, "no_token": str}]
+    markets: list[dict],  # [{"market_id": str, "yes_token": str, "no_token": str, "slug": str}]
 ) -> AsyncGenerator[str, None]:
     """
     Generate SSE events for multiple markets across platforms.
@@ -106,6 +106,8 @@ async def multi_market_event_generator(
 
     # Track subscriptions for cleanup
     subscriptions: list[tuple[str, str]] = []
+    polled_markets: list[tuple[str, str]] = []
+    ws_markets: list[tuple[str, Optional[str], Optional[str]]] = []
 
     try:
         # Subscribe to all markets
@@ -131,6 +133,7 @@ async def multi_market_event_generator(
                     yes_token=yes_token,
                     no_token=no_token,
                 )
+                ws_markets.append((market_id, yes_token, no_token))
             else:
                 # Use polling for other platforms (Kalshi, Limitless, Opinion)
                 price_poller.subscribe(
@@ -138,7 +141,9 @@ async def multi_market_event_generator(
                     market_id=market_id,
                     yes_token=yes_token,
                     no_token=no_token,
+                    slug=market.get("slug"),
                 )
+                polled_markets.append((platform, market_id))
 
         # Send connection confirmation
         yield f"event: connected\ndata: {json.dumps({'markets': len(markets)})}\n\n"
@@ -163,6 +168,10 @@ async def multi_market_event_generator(
         # Cleanup subscriptions
         for platform, token_id in subscriptions:
             price_cache.unsubscribe(platform, token_id, on_price_update)
+        for platform, market_id in polled_markets:
+            price_poller.unsubscribe(platform, market_id)
+        for market_id, yes_token, no_token in ws_markets:
+            await polymarket_ws_manager.unsubscribe_market(yes_token, no_token)
 
 
 @router.get("/prices/stream")
@@ -271,22 +280,24 @@ async def get_realtime_status():
             "type": "websocket",
             "connected": polymarket_ws_manager.is_connected,
             "state": polymarket_ws_manager._client.state.value if polymarket_ws_manager._client else "not_started",
+            "subscriptions": polymarket_ws_manager.subscription_count(),
         },
         "kalshi": {
             "type": "polling",
             "active": price_poller._running,
-            "subscriptions": len([s for s in price_poller._subscriptions.values() if s.platform == "kalshi"]),
+            "subscriptions": price_poller.subscription_count("kalshi"),
         },
         "limitless": {
             "type": "polling",
             "active": price_poller._running,
-            "subscriptions": len([s for s in price_poller._subscriptions.values() if s.platform == "limitless"]),
+            "subscriptions": price_poller.subscription_count("limitless"),
         },
         "opinion": {
             "type": "polling",
             "active": price_poller._running,
-            "subscriptions": len([s for s in price_poller._subscriptions.values() if s.platform == "opinion"]),
+            "subscriptions": price_poller.subscription_count("opinion"),
         },
+        "poller": price_poller.get_stats(),
     }
 
 
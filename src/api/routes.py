@@ -25,7 +25,15 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..config import get_settings
-from ..db.database import get_session_dependency as get_session
+from ..db.database import (
+    get_closed_pnl_by_platform,
+    get_identity_cache,
+    get_pool_stats,
+    get_session_dependency as get_session,
+    get_user_by_telegram_id,
+    get_user_positions_page,
+    invalidate_identity,
+)
 from ..db.models import (
     Chain,
     ChainFamily,
@@ -184,10 +192,7 @@ async def get_current_user(
     if x_telegram_init_data:
         tg_user = get_user_from_init_data(x_telegram_init_data, settings.telegram_bot_token)
         if tg_user:
-            result = await session.execute(
-                select(User).where(User.telegram_id == tg_user.id)
-            )
-            user = result.scalar_one_or_none()
+            user = await get_user_by_telegram_id(tg_user.id)
 
             if not user:
                 user = User(
@@ -223,10 +228,7 @@ async def get_current_user(
             try:
                 payload = jwt.decode(token, settings.telegram_bot_token, algorithms=["HS256"])
                 telegram_id = int(payload["sub"])
-                result = await session.execute(
-                    select(User).where(User.telegram_id == telegram_id)
-                )
-                user = result.scalar_one_or_none()
+                user = await get_user_by_telegram_id(telegram_id)
             except Exception:
                 pass
 
@@ -271,6 +273,7 @@ async def get_current_user(
                         }
                     )
                     await session.commit()
+                    invalidate_identity(user_id=user.id)
                     # Update local user object
                     user.country = country_code.upper()
                     user.country_verified_at = datetime.now(timezone.utc)
@@ -564,6 +567,7 @@ async def set_active_platform(
         {"platform": platform_enum.name, "uid": user.id}
     )
     await session.commit()
+    invalidate_identity(user_id=user.id)
 
     return {"status": "success", "active_platform": platform}
 
@@ -1168,6 +1172,66 @@ async def get_kalshi_candlesticks(
     return await coalesce(f"kalshi_candles:{market_id}:{start_ts}:{end_ts}:{interval}", _fetch, _recheck)
 
 
+@router.get("/markets/{platform}/{market_id}/candles")
+@limiter.limit(settings.rate_limit_heavy)
+async def get_market_candles(
+    request: Request,
+    platform: str,
+    market_id: str,
+    token_id: str = Query(..., description="Outcome token ID"),
+    interval: str = Query(default="1m", description="1m, 5m, or 1h"),
+    start_ts: Optional[int] = Query(default=None, description="Start timestamp (unix seconds)"),
+    end_ts: Optional[int] = Query(default=None, description="End timestamp (unix seconds)"),
+):
+    """Get OHLC candles for a market outcome.
+
+    Served from the in-memory live price history. For Polymarket, history
+    older than the buffer is filled in from Dome.
+    """
+    from ..services.price_history import CANDLE_INTERVALS, price_history
+
+    if interval not in CANDLE_INTERVALS:
+        raise HTTPException(status_code=400, detail=f"Invalid interval: {interval}")
+
+    plat_lower = platform.lower()
+    end_ts = end_ts or int(time.time())
+    candles = price_history.get_candles(plat_lower, token_id, interval, start_ts, end_ts)
+    source = "live"
+
+    oldest = price_history.oldest_timestamp(plat_lower, token_id)
+    needs_backfill = oldest is None or (start_ts is not None and start_ts < oldest)
+    if needs_backfill and plat_lower == Platform.POLYMARKET.value:
+        from ..services.dome import dome_client
+
+        backfill_end = int(oldest) if oldest is not None else end_ts
+        history = await dome_client.get_candlesticks(
+            market_id, interval=interval, start_time=start_ts, end_time=backfill_end,
+        )
+        first_live = candles[0].timestamp if candles else None
+        history = [c for c in history if first_live is None or c.timestamp < first_live]
+        if history:
+            candles = history + candles
+            source = "mixed" if first_live is not None else "dome"
+
+    return {
+        "platform": plat_lower,
+        "market_id": market_id,
+        "token_id": token_id,
+        "interval": interval,
+        "source": source,
+        "candles": [
+            {
+                "timestamp": c.timestamp,
+                "open": str(c.open),
+                "high": str(c.high),
+                "low": str(c.low),
+                "close": str(c.close),
+            }
+            for c in candles
+        ],
+    }
+
+
 @router.get("/markets/kalshi/{market_id}/trades")
 @limiter.limit(settings.rate_limit_heavy)
 async def get_kalshi_trades(
@@ -2209,32 +2273,33 @@ async def execute_swap(
 async def get_positions(
     platform: Optional[str] = None,
     status: str = "open",
-    limit: int = Query(default=25, le=25),
-    page: int = Query(default=1, ge=1),
+    limit: int = Query(default=25, ge=1, le=25),
+    cursor: Optional[str] = Query(default=None, description="next_cursor from the previous page"),
     user: User = Depends(get_current_user),
-    session: AsyncSession = Depends(get_session)
 ):
-    """Get user's positions."""
-    query = select(Position).where(Position.user_id == user.id)
-
+    """Get user's positions, newest first, one keyset page at a time."""
+    plat_enum = None
     if platform:
         try:
             plat_enum = Platform(platform.lower())
-            query = query.where(Position.platform == plat_enum)
         except ValueError:
             raise HTTPException(status_code=400, detail=f"Invalid platform: {platform}")
 
+    status_enum = None
     if status:
         try:
             status_enum = PositionStatus(status.lower())
-            query = query.where(Position.status == status_enum)
         except ValueError:
             pass  # Ignore invalid status
 
-    result = await session.execute(query)
-    positions = result.scalars().all()
+    try:
+        page = await get_user_positions_page(
+            user.id, platform=plat_enum, status=status_enum, limit=limit, after=cursor,
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
 
-    all_items = [
+    items = [
         {
             "id": p.id,
             "platform": p.platform.value,
@@ -2248,11 +2313,13 @@ async def get_positions(
             "pnl": calculate_pnl(p),
             "created_at": p.created_at.isoformat(),
         }
-        for p in positions
+        for p in page.items
     ]
 
-    meta, page_items = paginate_results(all_items, page, limit)
-    return {"positions": page_items, **meta}
+    return {
+        "positions": items,
+        "pagination": {"limit": limit, "next_cursor": page.next_cursor, "has_more": page.next_cursor is not None},
+    }
 
 
 def calculate_pnl(position: Position) -> Optional[float]:
@@ -2273,56 +2340,23 @@ def calculate_pnl(position: Position) -> Optional[float]:
 async def get_pnl_summary(
     platform: Optional[str] = None,
     user: User = Depends(get_current_user),
-    session: AsyncSession = Depends(get_session)
 ):
-    """Get PnL summary across platforms."""
-    query = select(Position).where(
-        Position.user_id == user.id,
-        Position.status == PositionStatus.CLOSED
-    )
-
+    """Get PnL summary of closed positions per platform."""
+    plat_enum = None
     if platform:
         try:
             plat_enum = Platform(platform.lower())
-            query = query.where(Position.platform == plat_enum)
         except ValueError:
             raise HTTPException(status_code=400, detail=f"Invalid platform: {platform}")
 
-    result = await session.execute(query)
-    positions = result.scalars().all()
-
-    # Calculate summary by platform
-    summaries = {}
-    for p in positions:
-        plat = p.platform.value
-        if plat not in summaries:
-            summaries[plat] = {
-                "platform": plat,
-                "total_pnl": 0.0,
-                "total_trades": 0,
-                "total_invested": 0.0,
-                "winning_trades": 0,
-                "losing_trades": 0,
-            }
-
-        pnl = calculate_pnl(p) or 0
-        invested = float(p.entry_price) * float(p.token_amount)
-
-        summaries[plat]["total_pnl"] += pnl
-        summaries[plat]["total_trades"] += 1
-        summaries[plat]["total_invested"] += invested
+    summaries = await get_closed_pnl_by_platform(user.id, platform=plat_enum)
 
-        if pnl > 0:
-            summaries[plat]["winning_trades"] += 1
-        elif pnl < 0:
-            summaries[plat]["losing_trades"] += 1
-
-    # Calculate ROI
     for plat, s in summaries.items():
+        s["platform"] = plat
         if s["total_invested"] > 0:
             s["roi_percent"] = (s["total_pnl"] / s["total_invested"]) * 100
         else:
-            s["roi_percent"] = 0.0
+            s["roi_percent"] = Decimal("0")
 
     return {"summaries": list(summaries.values())}
 
@@ -2763,6 +2797,24 @@ def create_api_app() -> FastAPI:
         from src.services.polymarket_ws import polymarket_ws_manager
         from src.services.price_poller import price_poller
 
+        # Warm price history from the last few hours of stored ticks. Runs on
+        # the loop before the feeds start so replayed ticks land first and
+        # live ticks are never interleaved with (or overwritten by) old ones.
+        if settings.tick_store_enabled:
+            try:
+                from src.services.price_history import price_history
+                from src.services.tick_store import get_tick_store
+                from src.services.websocket_manager import price_cache
+
+                tick_store = get_tick_store()
+                since = time.time() - settings.tick_store_warm_hours * 3600
+                loaded = tick_store.warm(price_history, since)
+                price_cache.add_tick_listener(tick_store.record)
+                await tick_store.start()
+                print(f"[API] Tick store started ({loaded} ticks replayed)")
+            except Exception as e:
+                print(f"[API] Failed to start tick store: {e}")
+
         # Start Polymarket WebSocket
         try:
             await polymarket_ws_manager.start()
@@ -2789,6 +2841,9 @@ def create_api_app() -> FastAPI:
         stop_cache_warmer()
         await polymarket_ws_manager.stop()
         await price_poller.stop()
+        if settings.tick_store_enabled:
+            from src.services.tick_store import get_tick_store
+            await get_tick_store().stop()
         print("[API] Real-time services stopped")
 
     # Health check (exempt from rate limiting)
@@ -2806,6 +2861,19 @@ def create_api_app() -> FastAPI:
             return {"status": "unavailable", "reason": "cache module not loaded"}
         return await rc.health_check()
 
+    @app.get("/health/db")
+    @limiter.exempt
+    async def db_health_check():
+        """Report database connection pool usage, wait times and identity cache hit rates."""
+        return {**get_pool_stats(), "identity_cache": get_identity_cache().stats()}
+
+    @app.get("/health/notifications")
+    @limiter.exempt
+    async def notifications_health_check():
+        """Report notification queue depth, delivery counts and latency (active only where the bot runs)."""
+        from src.services.notifications import get_notification_dispatcher
+        return get_notification_dispatcher().stats()
+
     # =========================================
     # Direct routes for webapp (no /api/v1 prefix)
     # =========================================
@@ -31,6 +31,32 @@ class Settings(BaseSettings):
     # Database Configuration
     # ===================
     database_url: str = Field(..., description="PostgreSQL connection string")
+    database_replica_url: Optional[str] = Field(
+        default=None,
+        description="Read replica connection string for read-only queries (unset = primary only)"
+    )
+    db_replica_sticky_seconds: float = Field(
+        default=5.0,
+        description="Seconds a user's reads stay on the primary after they write (replica lag cover)"
+    )
+    # Pool sizing defaults depend on the process role (bot, api or all);
+    # set these to override them for this process
+    db_pool_size: Optional[int] = Field(default=None, description="Persistent pooled connections")
+    db_max_overflow: Optional[int] = Field(default=None, description="Extra connections allowed under load")
+    db_pool_timeout: Optional[float] = Field(default=None, description="Seconds to wait for a pooled connection")
+    db_pool_recycle: int = Field(default=1800, description="Replace connections older than this many seconds")
+    db_ping_idle_seconds: int = Field(
+        default=300,
+        description="Ping a connection on checkout only if it sat idle this long"
+    )
+    db_statement_cache_size: int = Field(
+        default=500,
+        description="Prepared statements cached per connection (0 disables, e.g. behind pgbouncer)"
+    )
+    identity_cache_ttl: float = Field(
+        default=30.0,
+        description="Seconds user and wallet records are served from memory (0 disables)"
+    )
     
     # ===================
     # Security Configuration
@@ -394,6 +420,40 @@ class Settings(BaseSettings):
     cache_ttl_market_detail: int = Field(default=5, description="TTL for individual market, orderbook (seconds)")
     cache_ttl_search: int = Field(default=15, description="TTL for search results (seconds)")
 
+    # ===================
+    # Tick Store
+    # ===================
+    tick_store_enabled: bool = Field(default=True, description="Persist live price ticks to disk")
+    tick_store_dir: str = Field(default="data/ticks", description="Directory for tick store segment files")
+    tick_store_flush_interval: float = Field(default=1.0, description="Seconds between tick store flushes (one fsync per flush)")
+    tick_store_warm_hours: float = Field(default=6.0, description="Hours of stored ticks replayed into price history on startup")
+    tick_store_retention_days: int = Field(default=14, description="Days of tick segments kept on disk (0 keeps everything)")
+
+    # ===================
+    # Notifications
+    # ===================
+    notification_workers: int = Field(default=8, description="Concurrent Telegram notification senders")
+    notification_global_rate: float = Field(default=25.0, description="Max bot-wide messages per second (Telegram allows ~30)")
+    notification_per_chat_interval: float = Field(default=1.0, description="Min seconds between messages to one chat")
+    notification_queue_size: int = Field(default=10000, description="Max queued notifications before new ones are dropped")
+    notification_dedup_window: float = Field(default=60.0, description="Seconds an identical notification to a chat is suppressed")
+    notification_stats_interval: float = Field(default=60.0, description="Seconds between notification queue stats log lines (0 disables)")
+    broadcast_workers: int = Field(default=16, description="Concurrent senders per admin broadcast")
+    broadcast_chunk_size: int = Field(default=500, description="Recipients per broadcast checkpoint")
+
+    # ===================
+    # Post-Trade Jobs
+    # ===================
+    post_trade_workers: int = Field(default=4, description="Workers running fee, partner volume and postback jobs")
+    post_trade_max_attempts: int = Field(default=8, description="Attempts before a post-trade job is marked failed")
+
+    # ===================
+    # Analytics Rollups
+    # ===================
+    rollup_interval: float = Field(default=3600.0, description="Seconds between daily rollup compactions")
+    rollup_lag_days: int = Field(default=1, description="Days a UTC day is left raw after it ends before it is rolled up")
+    rollup_reconcile_days: int = Field(default=7, description="Recent rolled-up days checked against raw data each compaction")
+
     # ===================
     # Rate Limiting
     # ===================
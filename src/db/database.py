@@ -2,9 +2,15 @@
 Database connection and session management.
 """
 
+import functools
+import inspect
+import time
 import uuid
+from bisect import bisect_left
 from contextlib import asynccontextmanager
-from typing import AsyncGenerator, Optional
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import AsyncGenerator, AsyncIterator, Optional
 
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
@@ -12,8 +18,13 @@ from sqlalchemy.ext.asyncio import (
     async_sessionmaker,
     create_async_engine,
 )
-from sqlalchemy import select, update, delete, text
-from sqlalchemy.orm import selectinload
+from sqlalchemy import Numeric, String, bindparam, event, literal, select, tuple_, update, delete, text
+from sqlalchemy import func as sql_func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import DisconnectionError, IntegrityError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.orm import aliased, selectinload
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from src.db.models import (
     Base,
@@ -27,11 +38,20 @@ from src.db.models import (
     Partner,
     PartnerGroup,
     SystemConfig,
+    PriceAlertRecord,
+    ArbitrageSubscriber,
+    MarketMatch,
+    Broadcast,
+    PostTradeJob,
+    DailyTradeRollup,
+    DailyFeeRollup,
     ChainFamily,
     Platform,
     Chain,
+    OrderSide,
     OrderStatus,
     PositionStatus,
+    parse_amount,
 )
 from src.utils.logging import get_logger
 from decimal import Decimal
@@ -42,37 +62,198 @@ logger = get_logger(__name__)
 _engine: Optional[AsyncEngine] = None
 _session_factory: Optional[async_sessionmaker[AsyncSession]] = None
 
+# Optional read replica for read-only helpers (see get_read_session)
+_replica_engine: Optional[AsyncEngine] = None
+_replica_session_factory: Optional[async_sessionmaker[AsyncSession]] = None
+
 
 def generate_id() -> str:
     """Generate a unique ID."""
     return str(uuid.uuid4())
 
 
-async def init_db(database_url: str) -> None:
-    """Initialize database connection."""
-    global _engine, _session_factory
-    
+# ===================
+# Connection Pool
+# ===================
+
+# Pool sizing per process role. The bot runs the post-trade workers and other
+# background jobs, the API serves concurrent requests, and "all" is both in
+# one process (run_all.py). DB_POOL_* settings override these.
+POOL_DEFAULTS = {
+    "bot": {"pool_size": 5, "max_overflow": 10, "pool_timeout": 30.0},
+    "api": {"pool_size": 10, "max_overflow": 10, "pool_timeout": 10.0},
+    "all": {"pool_size": 15, "max_overflow": 15, "pool_timeout": 15.0},
+}
+
+# Connection wait time histogram bucket upper bounds, in milliseconds
+POOL_WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+
+class PoolMetrics:
+    """Counts pool checkouts and how long callers waited for a connection."""
+
+    def __init__(self, buckets_ms: tuple = POOL_WAIT_BUCKETS_MS):
+        self.buckets_ms = buckets_ms
+        self.counts = [0] * (len(buckets_ms) + 1)
+        self.waiters = 0
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def observe(self, wait_seconds: float) -> None:
+        self.checkouts += 1
+        self.wait_total += wait_seconds
+        self.wait_max = max(self.wait_max, wait_seconds)
+        self.counts[bisect_left(self.buckets_ms, wait_seconds * 1000)] += 1
+
+    def snapshot(self) -> dict:
+        labels = [f"le_{b}ms" for b in self.buckets_ms] + ["inf"]
+        return {
+            "waiters": self.waiters,
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_avg_ms": round(self.wait_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+            "wait_max_ms": round(self.wait_max * 1000, 3),
+            "wait_histogram_ms": dict(zip(labels, self.counts)),
+        }
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool that records checkout wait times in its metrics."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def connect(self):
+        self.metrics.waiters += 1
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except PoolTimeoutError:
+            self.metrics.timeouts += 1
+            raise
+        finally:
+            self.metrics.waiters -= 1
+            self.metrics.observe(time.perf_counter() - start)
+
+
+def _install_idle_ping(engine: AsyncEngine, idle_seconds: int) -> None:
+    """
+    Ping connections on checkout only after they sat idle in the pool.
+
+    Replaces pool_pre_ping, which costs a round trip on every checkout. A
+    connection that was just returned is assumed alive; an idle one may have
+    been dropped by the server or a proxy, so it is pinged and replaced if dead.
+    """
+    @event.listens_for(engine.sync_engine.pool, "checkin")
+    def _stamp_checkin(dbapi_connection, connection_record):
+        connection_record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(engine.sync_engine.pool, "checkout")
+    def _ping_if_idle(dbapi_connection, connection_record, connection_proxy):
+        checked_in_at = connection_record.info.get("checked_in_at")
+        if checked_in_at is None or time.monotonic() - checked_in_at < idle_seconds:
+            return
+        try:
+            dbapi_connection.ping()
+        except Exception as e:
+            # The pool discards this connection and checks out another
+            raise DisconnectionError(str(e)) from e
+
+
+def _create_engine(database_url: str, pool: dict) -> AsyncEngine:
+    """Create an engine on the instrumented pool with idle pings and statement caching."""
+    from src.config import settings
+
     # Convert postgres:// to postgresql+asyncpg://
     if database_url.startswith("postgres://"):
         database_url = database_url.replace("postgres://", "postgresql+asyncpg://", 1)
     elif database_url.startswith("postgresql://"):
         database_url = database_url.replace("postgresql://", "postgresql+asyncpg://", 1)
-    
-    _engine = create_async_engine(
+
+    connect_args = {}
+    if database_url.startswith("postgresql+asyncpg://"):
+        connect_args["prepared_statement_cache_size"] = settings.db_statement_cache_size
+
+    engine = create_async_engine(
         database_url,
         echo=False,
-        pool_size=5,
-        max_overflow=10,
-        pool_pre_ping=True,
+        poolclass=InstrumentedPool,
+        pool_recycle=settings.db_pool_recycle,
+        # Reuse the most recent connections so surplus ones idle out and are recycled
+        pool_use_lifo=True,
+        connect_args=connect_args,
+        **pool,
     )
-    
+    _install_idle_ping(engine, settings.db_ping_idle_seconds)
+    return engine
+
+
+async def init_db(database_url: str, role: str = "bot") -> None:
+    """
+    Initialize database connection.
+
+    Args:
+        database_url: PostgreSQL connection string
+        role: Process role ("bot", "api" or "all") selecting pool defaults.
+              A second call in the same process keeps the existing engine.
+    """
+    global _engine, _session_factory, _replica_engine, _replica_session_factory
+    from src.config import settings
+
+    if _engine is not None:
+        return
+
+    pool = dict(POOL_DEFAULTS[role])
+    for key, value in (
+        ("pool_size", settings.db_pool_size),
+        ("max_overflow", settings.db_max_overflow),
+        ("pool_timeout", settings.db_pool_timeout),
+    ):
+        if value is not None:
+            pool[key] = value
+
+    _engine = _create_engine(database_url, pool)
     _session_factory = async_sessionmaker(
         _engine,
         class_=AsyncSession,
         expire_on_commit=False,
     )
-    
-    logger.info("Database connection initialized")
+
+    if settings.database_replica_url:
+        _replica_engine = _create_engine(settings.database_replica_url, pool)
+        _replica_session_factory = async_sessionmaker(
+            _replica_engine,
+            class_=AsyncSession,
+            expire_on_commit=False,
+        )
+
+    logger.info("Database connection initialized", role=role, replica=_replica_engine is not None, **pool)
+
+
+def _pool_stats(engine: AsyncEngine) -> dict:
+    pool = engine.sync_engine.pool
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": pool.overflow(),
+        "max_overflow": pool._max_overflow,
+        **pool.metrics.snapshot(),
+    }
+
+
+def get_pool_stats() -> dict:
+    """Return connection pool usage and checkout wait metrics."""
+    if _engine is None:
+        return {"status": "unavailable", "reason": "database not initialized"}
+
+    stats = {"status": "ok", **_pool_stats(_engine)}
+    if _replica_engine is not None:
+        stats["replica"] = _pool_stats(_replica_engine)
+    return stats
 
 
 async def create_tables() -> None:
@@ -112,8 +293,13 @@ async def create_tables() -> None:
 
 async def close_db() -> None:
     """Close database connection."""
-    global _engine, _session_factory
-    
+    global _engine, _session_factory, _replica_engine, _replica_session_factory
+
+    if _replica_engine:
+        await _replica_engine.dispose()
+        _replica_engine = None
+        _replica_session_factory = None
+
     if _engine:
         await _engine.dispose()
         _engine = None
@@ -150,10 +336,202 @@ async def get_session_dependency() -> AsyncGenerator[AsyncSession, None]:
             raise
 
 
+# ===================
+# Read Replica Routing
+# ===================
+
+# user_id -> monotonic time until which that user's reads stay on the primary
+_sticky_until: dict[str, float] = {}
+
+
+def mark_user_write(user_id: str) -> None:
+    """
+    Pin a user's reads to the primary for db_replica_sticky_seconds.
+
+    Called by the write helpers for orders and positions so a user sees their
+    own trade right away even while the replica lags behind.
+    """
+    if _replica_session_factory is None:
+        return
+    from src.config import settings
+
+    now = time.monotonic()
+    if len(_sticky_until) > 10000:
+        for uid in [u for u, until in _sticky_until.items() if until <= now]:
+            del _sticky_until[uid]
+    _sticky_until[user_id] = now + settings.db_replica_sticky_seconds
+
+
+def reads_from_primary(user_id: Optional[str]) -> bool:
+    """Whether get_read_session(user_id) would use the primary."""
+    if _replica_session_factory is None:
+        return True
+    return user_id is not None and _sticky_until.get(user_id, 0.0) > time.monotonic()
+
+
+@asynccontextmanager
+async def get_read_session(user_id: Optional[str] = None) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Get a session for read-only queries.
+
+    Uses the replica when one is configured, except for a user who wrote
+    within the last few seconds (read-your-writes). Nothing is committed.
+    """
+    factory = _session_factory if reads_from_primary(user_id) else _replica_session_factory
+    if factory is None:
+        raise RuntimeError("Database not initialized")
+
+    async with factory() as session:
+        yield session
+
+
+# ===================
+# Identity Cache
+# ===================
+
+_MISS = object()
+
+
+class IdentityCache:
+    """
+    Short-lived in-process cache of User and Wallet records.
+
+    Serves the lookups nearly every bot handler and API request starts with
+    (get_user_by_telegram_id, get_wallet, get_user_wallets). The helpers that
+    change a user or their wallets drop that user's entries; the TTL bounds
+    how long writes made by another process can go unseen. Cached records
+    are detached and shared between callers, so they must not be modified.
+    """
+
+    def __init__(self, ttl: float = 30.0, max_users: int = 10000):
+        self.ttl = ttl
+        self.max_users = max_users
+        self._users: dict[int, tuple[float, User]] = {}  # telegram_id -> (expires, user)
+        self._telegram_ids: dict[str, int] = {}  # user_id -> telegram_id
+        self._wallets: dict[tuple[str, ChainFamily], tuple[float, Optional[Wallet]]] = {}
+        self._wallet_lists: dict[str, tuple[float, list[Wallet]]] = {}
+        self._hits = {"user": 0, "wallet": 0, "wallets": 0}
+        self._misses = {"user": 0, "wallet": 0, "wallets": 0}
+        self._invalidations = 0
+        # Bumped by every invalidation; a fill whose query started before an
+        # invalidation may hold the old row and is dropped
+        self.generation = 0
+
+    def _get(self, kind: str, entries: dict, key):
+        entry = entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self._hits[kind] += 1
+            return entry[1]
+        self._misses[kind] += 1
+        return _MISS
+
+    def _put(self, entries: dict, key, value, generation: int) -> bool:
+        if self.ttl <= 0 or generation != self.generation:
+            return False
+        entries[key] = (time.monotonic() + self.ttl, value)
+        return True
+
+    def get_user(self, telegram_id: int):
+        """Return the cached user, or _MISS."""
+        return self._get("user", self._users, telegram_id)
+
+    def put_user(self, user: User, generation: int) -> None:
+        if len(self._users) >= self.max_users:
+            self.clear()
+        if self._put(self._users, user.telegram_id, user, generation):
+            self._telegram_ids[user.id] = user.telegram_id
+
+    def get_wallet(self, user_id: str, chain_family: ChainFamily):
+        """Return the cached active wallet (None if the user has none), or _MISS."""
+        return self._get("wallet", self._wallets, (user_id, chain_family))
+
+    def put_wallet(self, user_id: str, chain_family: ChainFamily, wallet: Optional[Wallet], generation: int) -> None:
+        self._put(self._wallets, (user_id, chain_family), wallet, generation)
+
+    def get_wallets(self, user_id: str):
+        """Return the cached list of all the user's wallets, or _MISS."""
+        return self._get("wallets", self._wallet_lists, user_id)
+
+    def put_wallets(self, user_id: str, wallets: list[Wallet], generation: int) -> None:
+        self._put(self._wallet_lists, user_id, wallets, generation)
+
+    def invalidate(self, user_id: Optional[str] = None, telegram_id: Optional[int] = None) -> None:
+        """Drop a user and their wallets, given either identifier."""
+        self._invalidations += 1
+        self.generation += 1
+        if telegram_id is None and user_id is not None:
+            telegram_id = self._telegram_ids.get(user_id)
+        if telegram_id is not None:
+            entry = self._users.pop(telegram_id, None)
+            if user_id is None and entry is not None:
+                user_id = entry[1].id
+        if user_id is not None:
+            self._telegram_ids.pop(user_id, None)
+            self._wallet_lists.pop(user_id, None)
+            for chain_family in ChainFamily:
+                self._wallets.pop((user_id, chain_family), None)
+
+    def clear(self) -> None:
+        self.generation += 1
+        self._users.clear()
+        self._telegram_ids.clear()
+        self._wallets.clear()
+        self._wallet_lists.clear()
+
+    def stats(self) -> dict:
+        """Return entry counts and hit rates since startup."""
+        stats = {
+            "ttl": self.ttl,
+            "users": len(self._users),
+            "wallets": len(self._wallets) + len(self._wallet_lists),
+            "invalidations": self._invalidations,
+        }
+        for kind, hits in self._hits.items():
+            lookups = hits + self._misses[kind]
+            stats[f"{kind}_hits"] = hits
+            stats[f"{kind}_misses"] = self._misses[kind]
+            stats[f"{kind}_hit_rate"] = round(hits / lookups, 4) if lookups else 0.0
+        return stats
+
+
+# Global identity cache (created on first use so settings load lazily)
+_identity_cache: Optional[IdentityCache] = None
+
+
+def get_identity_cache() -> IdentityCache:
+    """Get the global identity cache."""
+    global _identity_cache
+    if _identity_cache is None:
+        from src.config import settings
+        _identity_cache = IdentityCache(ttl=settings.identity_cache_ttl)
+    return _identity_cache
+
+
+def invalidate_identity(user_id: Optional[str] = None, telegram_id: Optional[int] = None) -> None:
+    """Drop cached records for a user after changing them outside these helpers."""
+    get_identity_cache().invalidate(user_id=user_id, telegram_id=telegram_id)
+
+
+def _invalidates_identity(func):
+    """Drop the cached user and wallets named by the helper's user_id/telegram_id once it has committed."""
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            arguments = signature.bind(*args, **kwargs).arguments
+            invalidate_identity(user_id=arguments.get("user_id"), telegram_id=arguments.get("telegram_id"))
+
+    return wrapper
+
+
 # ===================
 # User Operations
 # ===================
 
+@_invalidates_identity
 async def get_or_create_user(
     telegram_id: int,
     username: Optional[str] = None,
@@ -175,6 +553,9 @@ async def get_or_create_user(
                 user.username = username
                 user.first_name = first_name
                 user.last_name = last_name
+            # Talking to the bot again means it is no longer blocked
+            if user.bot_blocked_at is not None:
+                user.bot_blocked_at = None
             return user
         
         # Create new user
@@ -193,16 +574,27 @@ async def get_or_create_user(
 
 
 async def get_user_by_telegram_id(telegram_id: int) -> Optional[User]:
-    """Get user by Telegram ID."""
+    """Get user by Telegram ID (served from the identity cache when fresh)."""
+    cache = get_identity_cache()
+    user = cache.get_user(telegram_id)
+    if user is not _MISS:
+        return user
+
+    generation = cache.generation
     async with get_session() as session:
         result = await session.execute(
             select(User)
             .where(User.telegram_id == telegram_id)
             .options(selectinload(User.wallets))
         )
-        return result.scalar_one_or_none()
+        user = result.scalar_one_or_none()
+
+    if user is not None:
+        cache.put_user(user, generation)
+    return user
 
 
+@_invalidates_identity
 async def update_user_platform(telegram_id: int, platform: Platform) -> None:
     """Update user's active platform."""
     async with get_session() as session:
@@ -214,6 +606,7 @@ async def update_user_platform(telegram_id: int, platform: Platform) -> None:
         )
 
 
+@_invalidates_identity
 async def update_user_country(telegram_id: int, country_code: str) -> None:
     """Update user's country (ISO 3166-1 alpha-2 code) - deprecated, use set_user_country_verified."""
     async with get_session() as session:
@@ -224,6 +617,7 @@ async def update_user_country(telegram_id: int, country_code: str) -> None:
         )
 
 
+@_invalidates_identity
 async def set_user_geo_token(telegram_id: int, token: str) -> None:
     """Set geo verification token for a user."""
     async with get_session() as session:
@@ -243,6 +637,7 @@ async def get_user_by_geo_token(token: str) -> Optional[User]:
         return result.scalar_one_or_none()
 
 
+@_invalidates_identity
 async def set_user_country_verified(user_id: str, country_code: str) -> None:
     """Set user's country as verified from IP detection."""
     async with get_session() as session:
@@ -260,6 +655,7 @@ async def set_user_country_verified(user_id: str, country_code: str) -> None:
         )
 
 
+@_invalidates_identity
 async def clear_user_geo_token(user_id: str) -> None:
     """Clear the geo verification token after use or expiry."""
     async with get_session() as session:
@@ -270,6 +666,7 @@ async def clear_user_geo_token(user_id: str) -> None:
         )
 
 
+@_invalidates_identity
 async def set_user_proof_verified(user_id: str) -> None:
     """Mark user's Solana wallet as DFlow Proof KYC verified."""
     async with get_session() as session:
@@ -284,6 +681,7 @@ async def set_user_proof_verified(user_id: str) -> None:
 # Wallet Operations
 # ===================
 
+@_invalidates_identity
 async def create_wallet(
     user_id: str,
     chain_family: ChainFamily,
@@ -330,7 +728,13 @@ async def create_wallet(
 
 
 async def get_wallet(user_id: str, chain_family: ChainFamily) -> Optional[Wallet]:
-    """Get user's active wallet for a chain family."""
+    """Get user's active wallet for a chain family (served from the identity cache when fresh)."""
+    cache = get_identity_cache()
+    wallet = cache.get_wallet(user_id, chain_family)
+    if wallet is not _MISS:
+        return wallet
+
+    generation = cache.generation
     async with get_session() as session:
         result = await session.execute(
             select(Wallet)
@@ -338,18 +742,31 @@ async def get_wallet(user_id: str, chain_family: ChainFamily) -> Optional[Wallet
             .where(Wallet.chain_family == chain_family)
             .where(Wallet.is_active == True)
         )
-        return result.scalar_one_or_none()
+        wallet = result.scalar_one_or_none()
+
+    cache.put_wallet(user_id, chain_family, wallet, generation)
+    return wallet
 
 
 async def get_user_wallets(user_id: str) -> list[Wallet]:
-    """Get all wallets for a user."""
+    """Get all wallets for a user (served from the identity cache when fresh)."""
+    cache = get_identity_cache()
+    wallets = cache.get_wallets(user_id)
+    if wallets is not _MISS:
+        return list(wallets)
+
+    generation = cache.generation
     async with get_session() as session:
         result = await session.execute(
             select(Wallet).where(Wallet.user_id == user_id)
         )
-        return list(result.scalars().all())
+        wallets = list(result.scalars().all())
 
+    cache.put_wallets(user_id, wallets, generation)
+    return list(wallets)
 
+
+@_invalidates_identity
 async def delete_user_wallets(user_id: str) -> bool:
     """Delete all wallets for a user."""
     async with get_session() as session:
@@ -366,6 +783,7 @@ async def delete_user_wallets(user_id: str) -> bool:
         return True
 
 
+@_invalidates_identity
 async def delete_wallet_by_chain(
     user_id: str, chain_family: ChainFamily, source: Optional[str] = None
 ) -> bool:
@@ -410,6 +828,7 @@ async def get_inactive_wallet(user_id: str, chain_family: ChainFamily) -> Option
         return result.scalar_one_or_none()
 
 
+@_invalidates_identity
 async def deactivate_wallet(user_id: str, chain_family: ChainFamily) -> bool:
     """Set is_active=False on the current active wallet for a chain family."""
     async with get_session() as session:
@@ -428,6 +847,7 @@ async def deactivate_wallet(user_id: str, chain_family: ChainFamily) -> bool:
         return False
 
 
+@_invalidates_identity
 async def switch_active_wallet(user_id: str, chain_family: ChainFamily) -> Optional[Wallet]:
     """Switch active wallet for a chain family.
 
@@ -466,6 +886,93 @@ async def switch_active_wallet(user_id: str, chain_family: ChainFamily) -> Optio
         return inactive
 
 
+# ===================
+# Keyset Pagination
+# ===================
+
+# Position and order lists are paged by (created_at, id) cursors rather than
+# offsets, so a later page costs the same index range scan as the first.
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+@dataclass
+class Page:
+    """One page of rows, newest first, with cursors to the neighbouring pages."""
+    items: list
+    next_cursor: Optional[str] = None  # older rows follow
+    prev_cursor: Optional[str] = None  # newer rows precede
+
+
+def encode_cursor(created_at: datetime, row_id: str) -> str:
+    """
+    Opaque cursor for a row: hex microseconds since the epoch and the row id.
+
+    Kept short enough to fit in Telegram callback data (64 bytes).
+    """
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    micros = (created_at - _EPOCH) // timedelta(microseconds=1)
+    return f"{micros:x}.{row_id}"
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, str]:
+    """Inverse of encode_cursor. Raises ValueError for a malformed cursor."""
+    micros, sep, row_id = cursor.partition(".")
+    if not sep or not row_id:
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    return _EPOCH + timedelta(microseconds=int(micros, 16)), row_id
+
+
+async def _keyset_page(
+    session: AsyncSession,
+    query,
+    model,
+    limit: int,
+    after: Optional[str] = None,
+    before: Optional[str] = None,
+) -> Page:
+    """
+    Run query for one page ordered by (created_at, id) descending.
+
+    after continues with the rows older than that cursor, before goes back to
+    the rows newer than it. One extra row is fetched to tell whether the page
+    has a neighbour in that direction.
+    """
+    key = tuple_(model.created_at, model.id)
+
+    if before:
+        created_at, row_id = decode_cursor(before)
+        result = await session.execute(
+            query.where(key > tuple_(literal(created_at), literal(row_id)))
+            .order_by(model.created_at.asc(), model.id.asc())
+            .limit(limit + 1)
+        )
+        rows = list(result.scalars().all())
+        has_newer = len(rows) > limit
+        rows = rows[:limit][::-1]
+        return Page(
+            items=rows,
+            next_cursor=encode_cursor(rows[-1].created_at, rows[-1].id) if rows else None,
+            prev_cursor=encode_cursor(rows[0].created_at, rows[0].id) if has_newer else None,
+        )
+
+    if after:
+        created_at, row_id = decode_cursor(after)
+        query = query.where(key < tuple_(literal(created_at), literal(row_id)))
+    result = await session.execute(
+        query.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1)
+    )
+    rows = list(result.scalars().all())
+    has_older = len(rows) > limit
+    rows = rows[:limit]
+    return Page(
+        items=rows,
+        next_cursor=encode_cursor(rows[-1].created_at, rows[-1].id) if has_older else None,
+        prev_cursor=encode_cursor(rows[0].created_at, rows[0].id) if after and rows else None,
+    )
+
+
 # ===================
 # Position Operations
 # ===================
@@ -501,6 +1008,7 @@ async def create_position(
         )
         session.add(position)
         await session.flush()
+        mark_user_write(user_id)
         
         logger.info("Created position", user_id=user_id, market_id=market_id)
         return position
@@ -512,7 +1020,7 @@ async def get_user_positions(
     status: Optional[PositionStatus] = None,
 ) -> list[Position]:
     """Get user's positions with optional filters."""
-    async with get_session() as session:
+    async with get_read_session(user_id) as session:
         query = select(Position).where(Position.user_id == user_id)
         
         if platform:
@@ -526,6 +1034,26 @@ async def get_user_positions(
         return list(result.scalars().all())
 
 
+async def get_user_positions_page(
+    user_id: str,
+    platform: Optional[Platform] = None,
+    status: Optional[PositionStatus] = None,
+    limit: int = 20,
+    after: Optional[str] = None,
+    before: Optional[str] = None,
+) -> Page:
+    """Get one page of a user's positions, newest first (see _keyset_page for cursors)."""
+    async with get_read_session(user_id) as session:
+        query = select(Position).where(Position.user_id == user_id)
+
+        if platform:
+            query = query.where(Position.platform == platform)
+        if status:
+            query = query.where(Position.status == status)
+
+        return await _keyset_page(session, query, Position, limit, after=after, before=before)
+
+
 async def get_position_by_id(position_id: str) -> Optional[Position]:
     """Get a position by its ID."""
     async with get_session() as session:
@@ -535,17 +1063,28 @@ async def get_position_by_id(position_id: str) -> Optional[Position]:
         return result.scalar_one_or_none()
 
 
+def _mirror_amounts(values: dict) -> dict:
+    """Add NUMERIC mirror columns for amount strings in a Core UPDATE's values."""
+    for column in ("input_amount", "token_amount", "amount_usdc"):
+        if column in values:
+            values[f"{column}_numeric"] = parse_amount(values[column])
+    return values
+
+
 async def update_position(
     position_id: str,
     **kwargs,
 ) -> None:
     """Update a position."""
     async with get_session() as session:
-        await session.execute(
+        result = await session.execute(
             update(Position)
             .where(Position.id == position_id)
-            .values(**kwargs)
+            .values(**_mirror_amounts(kwargs))
+            .returning(Position.user_id)
         )
+        for user_id in result.scalars():
+            mark_user_write(user_id)
 
 
 async def delete_position_by_token_id(token_id: str) -> int:
@@ -586,7 +1125,7 @@ async def create_order(
     market_title: Optional[str] = None,
 ) -> Order:
     """Create a new order."""
-    from src.db.models import Outcome as OutcomeEnum, OrderSide
+    from src.db.models import Outcome as OutcomeEnum
 
     async with get_session() as session:
         order = Order(
@@ -607,6 +1146,7 @@ async def create_order(
         )
         session.add(order)
         await session.flush()
+        mark_user_write(user_id)
         
         logger.info("Created order", user_id=user_id, order_id=order.id)
         return order
@@ -614,15 +1154,27 @@ async def create_order(
 
 async def update_order(
     order_id: str,
+    post_trade_jobs: Optional[list[tuple[str, str]]] = None,
     **kwargs,
 ) -> None:
-    """Update an order."""
+    """
+    Update an order.
+
+    post_trade_jobs, given as (kind, JSON payload), are inserted into the
+    outbox in the same transaction, so a confirmed order always has its jobs.
+    """
     async with get_session() as session:
-        await session.execute(
+        result = await session.execute(
             update(Order)
             .where(Order.id == order_id)
-            .values(**kwargs)
+            .values(**_mirror_amounts(kwargs))
+            .returning(Order.user_id)
         )
+        user_ids = list(result.scalars())
+        if post_trade_jobs:
+            session.add_all([PostTradeJob(kind=kind, payload=payload) for kind, payload in post_trade_jobs])
+    for user_id in user_ids:
+        mark_user_write(user_id)
 
 
 async def get_user_orders(
@@ -631,7 +1183,7 @@ async def get_user_orders(
     limit: int = 20,
 ) -> list[Order]:
     """Get user's order history."""
-    async with get_session() as session:
+    async with get_read_session(user_id) as session:
         query = select(Order).where(Order.user_id == user_id)
         
         if platform:
@@ -643,6 +1195,23 @@ async def get_user_orders(
         return list(result.scalars().all())
 
 
+async def get_user_orders_page(
+    user_id: str,
+    platform: Optional[Platform] = None,
+    limit: int = 20,
+    after: Optional[str] = None,
+    before: Optional[str] = None,
+) -> Page:
+    """Get one page of a user's order history, newest first (see _keyset_page for cursors)."""
+    async with get_read_session(user_id) as session:
+        query = select(Order).where(Order.user_id == user_id)
+
+        if platform:
+            query = query.where(Order.platform == platform)
+
+        return await _keyset_page(session, query, Order, limit, after=after, before=before)
+
+
 async def get_order_by_id(order_id: str) -> Optional[Order]:
     """Get a specific order by ID."""
     async with get_session() as session:
@@ -720,6 +1289,7 @@ def generate_referral_code(telegram_id: int) -> str:
     return str(telegram_id)
 
 
+@_invalidates_identity
 async def get_or_create_referral_code(user_id: str) -> str:
     """Get user's referral code or create one if not exists."""
     async with get_session() as session:
@@ -753,6 +1323,7 @@ async def get_user_by_referral_code(referral_code: str) -> Optional[User]:
         return result.scalar_one_or_none()
 
 
+@_invalidates_identity
 async def set_user_referrer(user_id: str, referrer_id: str) -> bool:
     """Set a user's referrer (only if not already set)."""
     async with get_session() as session:
@@ -784,69 +1355,56 @@ async def get_referral_chain(user_id: str) -> list[User]:
     Get the referral chain for a user (up to 3 tiers).
     Returns [tier1_referrer, tier2_referrer, tier3_referrer] or fewer if chain is shorter.
     """
-    chain = []
-    current_id = user_id
+    # Walk up referred_by_id from the user's referrer in one recursive query
+    parent = aliased(User)
+    chain = (
+        select(User.id, User.referred_by_id, literal(1).label("tier"))
+        .where(User.id == select(User.referred_by_id).where(User.id == user_id).scalar_subquery())
+        .cte("referral_chain", recursive=True)
+    )
+    chain = chain.union_all(
+        select(parent.id, parent.referred_by_id, chain.c.tier + 1)
+        .join(chain, parent.id == chain.c.referred_by_id)
+        .where(chain.c.tier < 3)
+    )
 
     async with get_session() as session:
-        for _ in range(3):
-            result = await session.execute(
-                select(User).where(User.id == current_id)
-            )
-            user = result.scalar_one_or_none()
-
-            if not user or not user.referred_by_id:
-                break
-
-            # Get the referrer
-            referrer_result = await session.execute(
-                select(User).where(User.id == user.referred_by_id)
-            )
-            referrer = referrer_result.scalar_one_or_none()
-
-            if referrer:
-                chain.append(referrer)
-                current_id = referrer.id
-            else:
-                break
-
-    return chain
+        result = await session.execute(
+            select(User).join(chain, User.id == chain.c.id).order_by(chain.c.tier)
+        )
+        return list(result.scalars().all())
 
 
 async def get_referral_stats(user_id: str) -> dict:
     """Get referral statistics for a user."""
-    async with get_session() as session:
-        # Count tier 1 (direct referrals)
-        tier1_result = await session.execute(
-            select(User).where(User.referred_by_id == user_id)
-        )
-        tier1_users = list(tier1_result.scalars().all())
-        tier1_count = len(tier1_users)
+    # Walk down referred_by_id three tiers deep in one recursive query
+    child = aliased(User)
+    downline = (
+        select(User.id, literal(1).label("tier"))
+        .where(User.referred_by_id == user_id)
+        .cte("referral_downline", recursive=True)
+    )
+    downline = downline.union_all(
+        select(child.id, downline.c.tier + 1)
+        .join(downline, child.referred_by_id == downline.c.id)
+        .where(downline.c.tier < 3)
+    )
 
-        # Count tier 2
-        tier2_count = 0
-        tier2_user_ids = []
-        for t1_user in tier1_users:
-            t2_result = await session.execute(
-                select(User).where(User.referred_by_id == t1_user.id)
-            )
-            t2_users = list(t2_result.scalars().all())
-            tier2_count += len(t2_users)
-            tier2_user_ids.extend([u.id for u in t2_users])
-
-        # Count tier 3
-        tier3_count = 0
-        for t2_id in tier2_user_ids:
-            t3_result = await session.execute(
-                select(User).where(User.referred_by_id == t2_id)
-            )
-            tier3_count += len(list(t3_result.scalars().all()))
+    async with get_read_session(user_id) as session:
+        result = await session.execute(
+            select(downline.c.tier, sql_func.count()).group_by(downline.c.tier)
+        )
+        counts = dict(result.all())
 
-        return {
-            "tier1": tier1_count,
-            "tier2": tier2_count,
-            "tier3": tier3_count,
-            "total": tier1_count + tier2_count + tier3_count,
-        }
+    tier1_count = counts.get(1, 0)
+    tier2_count = counts.get(2, 0)
+    tier3_count = counts.get(3, 0)
+    return {
+        "tier1": tier1_count,
+        "tier2": tier2_count,
+        "tier3": tier3_count,
+        "total": tier1_count + tier2_count + tier3_count,
+    }
 
 
 # ===================
@@ -880,67 +1438,104 @@ async def get_or_create_fee_balance(user_id: str, chain_family: ChainFamily) ->
         return balance
 
 
-async def add_referral_earnings(
-    user_id: str,
-    amount_usdc: str,
+def _add_amount(column, amount):
+    """SQL expression adding to an amount string column, evaluated in the UPDATE itself."""
+    return sql_func.cast(sql_func.cast(column, Numeric) + sql_func.cast(amount, Numeric), String)
+
+
+def _violates(error: IntegrityError, constraint: str) -> bool:
+    """Whether an IntegrityError was raised by the named constraint or unique index."""
+    for exc in (error.orig, getattr(error.orig, "__cause__", None)):
+        name = getattr(exc, "constraint_name", None)
+        if name:
+            return name == constraint
+    # Drivers that do not expose the name still quote it in the message
+    return f'"{constraint}"' in str(error.orig)
+
+
+async def credit_referral_earnings(
     source_user_id: str,
     order_id: str,
-    tier: int,
     chain_family: ChainFamily,
-) -> None:
-    """Add referral earnings to a user's balance for a specific chain."""
-    async with get_session() as session:
-        # Get or create fee balance for this chain
-        result = await session.execute(
-            select(FeeBalance)
-            .where(FeeBalance.user_id == user_id)
-            .where(FeeBalance.chain_family == chain_family)
-        )
-        balance = result.scalar_one_or_none()
+    credits: list[tuple[int, str, Decimal]],
+) -> bool:
+    """
+    Credit referral commissions from one trade in a single transaction.
 
-        if not balance:
-            balance = FeeBalance(
-                id=generate_id(),
-                user_id=user_id,
-                chain_family=chain_family,
-                claimable_usdc="0",
-                total_earned_usdc="0",
-                total_withdrawn_usdc="0",
-            )
-            session.add(balance)
+    Args:
+        source_user_id: The trader whose fee is being shared
+        order_id: The order the fee came from
+        chain_family: Chain the fee was earned on
+        credits: (tier, referrer user ID, amount in USDC) per commission
 
-        # Update balances
-        current_claimable = Decimal(balance.claimable_usdc)
-        current_total = Decimal(balance.total_earned_usdc)
-        add_amount = Decimal(amount_usdc)
+    Balances are upserted with one INSERT ... ON CONFLICT that adds to the
+    stored amounts inside the statement, so concurrent trades crediting the
+    same referrer cannot overwrite each other.
 
-        balance.claimable_usdc = str(current_claimable + add_amount)
-        balance.total_earned_usdc = str(current_total + add_amount)
+    Returns:
+        False if this order's commissions were already credited (nothing changes)
+    """
+    if not credits:
+        return True
 
-        # Create transaction record
-        tx_type = f"referral_tier{tier}"
-        tx = FeeTransaction(
-            id=generate_id(),
-            user_id=user_id,
-            order_id=order_id,
-            chain_family=chain_family,
-            tx_type=tx_type,
-            amount_usdc=amount_usdc,
-            source_user_id=source_user_id,
-            tier=tier,
-        )
-        session.add(tx)
+    # ON CONFLICT cannot touch the same row twice in one statement
+    per_user: dict[str, Decimal] = {}
+    for _, user_id, amount in credits:
+        per_user[user_id] = per_user.get(user_id, Decimal("0")) + amount
+
+    insert_balances = pg_insert(FeeBalance).values([
+        {
+            "id": generate_id(),
+            "user_id": user_id,
+            "chain_family": chain_family,
+            "claimable_usdc": str(amount),
+            "total_earned_usdc": str(amount),
+            "total_withdrawn_usdc": "0",
+        }
+        for user_id, amount in per_user.items()
+    ])
+    insert_balances = insert_balances.on_conflict_do_update(
+        index_elements=[FeeBalance.user_id, FeeBalance.chain_family],
+        set_={
+            "claimable_usdc": _add_amount(FeeBalance.claimable_usdc, insert_balances.excluded.claimable_usdc),
+            "total_earned_usdc": _add_amount(FeeBalance.total_earned_usdc, insert_balances.excluded.total_earned_usdc),
+            "updated_at": sql_func.now(),
+        },
+    )
 
-        await session.flush()
+    try:
+        async with get_session() as session:
+            await session.execute(insert_balances)
+            # Flushed as one multi-row INSERT
+            session.add_all([
+                FeeTransaction(
+                    id=generate_id(),
+                    user_id=user_id,
+                    order_id=order_id,
+                    chain_family=chain_family,
+                    tx_type=f"referral_tier{tier}",
+                    amount_usdc=str(amount),
+                    source_user_id=source_user_id,
+                    tier=tier,
+                )
+                for tier, user_id, amount in credits
+            ])
+            await session.flush()
+    except IntegrityError as e:
+        if not _violates(e, "ix_fee_tx_order_tier"):
+            raise
+        # The balance upsert was rolled back with the insert
+        logger.info("Referral earnings already credited", order_id=order_id)
+        return False
 
-        logger.info(
-            "Added referral earnings",
-            user_id=user_id,
-            amount=amount_usdc,
-            tier=tier,
-            chain=chain_family.value,
-            source_user_id=source_user_id,
-        )
+    logger.info(
+        "Added referral earnings",
+        source_user_id=source_user_id,
+        order_id=order_id,
+        chain=chain_family.value,
+        credits=[(tier, user_id, str(amount)) for tier, user_id, amount in credits],
+    )
+    return True
 
 
 async def process_withdrawal(
@@ -952,10 +1547,12 @@ async def process_withdrawal(
 ) -> bool:
     """Process a withdrawal from user's fee balance for a specific chain."""
     async with get_session() as session:
+        # Lock the row so a concurrent referral credit is not overwritten
         result = await session.execute(
             select(FeeBalance)
             .where(FeeBalance.user_id == user_id)
             .where(FeeBalance.chain_family == chain_family)
+            .with_for_update()
         )
         balance = result.scalar_one_or_none()
 
@@ -1022,31 +1619,6 @@ async def get_all_fee_balances(user_id: str) -> list[FeeBalance]:
 # PnL Operations
 # ===================
 
-async def get_orders_for_pnl(
-    user_id: str,
-    platform: Optional[Platform] = None,
-    since: Optional["datetime"] = None,
-) -> list[Order]:
-    """Get confirmed orders for PnL calculation."""
-    from datetime import datetime
-
-    async with get_session() as session:
-        query = select(Order).where(
-            Order.user_id == user_id,
-            Order.status == OrderStatus.CONFIRMED,
-        )
-
-        if platform:
-            query = query.where(Order.platform == platform)
-        if since:
-            query = query.where(Order.executed_at >= since)
-
-        query = query.order_by(Order.executed_at.desc())
-
-        result = await session.execute(query)
-        return list(result.scalars().all())
-
-
 async def get_positions_for_pnl(
     user_id: str,
     platform: Optional[Platform] = None,
@@ -1054,7 +1626,7 @@ async def get_positions_for_pnl(
     include_closed: bool = True,
 ) -> list[Position]:
     """Get positions for PnL calculation."""
-    async with get_session() as session:
+    async with get_read_session(user_id) as session:
         query = select(Position).where(Position.user_id == user_id)
 
         if platform:
@@ -1076,12 +1648,94 @@ async def get_positions_for_pnl(
         return list(result.scalars().all())
 
 
-# ===================
-# Partner Management
-# ===================
-
-async def create_partner(
-    name: str,
+async def get_realized_pnl(
+    user_id: str,
+    platform: Platform,
+    since: Optional[datetime] = None,
+) -> dict:
+    """
+    Realized PnL from confirmed orders on a platform: sell proceeds minus buy cost.
+
+    Summed in SQL over the numeric amounts (USDC, 6-decimal base units), so
+    the result is an exact Decimal. Orders whose amount does not parse are
+    counted as trades but add nothing.
+    """
+    amount = _order_amount() / 1000000
+    async with get_read_session(user_id) as session:
+        query = select(
+            sql_func.coalesce(sql_func.sum(amount).filter(Order.side == OrderSide.BUY), 0),
+            sql_func.coalesce(sql_func.sum(amount).filter(Order.side == OrderSide.SELL), 0),
+            sql_func.count(Order.id),
+        ).where(
+            Order.user_id == user_id,
+            Order.platform == platform,
+            Order.status == OrderStatus.CONFIRMED,
+        )
+        if since:
+            query = query.where(Order.executed_at >= since)
+
+        cost, proceeds, trade_count = (await session.execute(query)).one()
+
+    cost, proceeds = Decimal(cost), Decimal(proceeds)
+    return {
+        "realized_pnl": proceeds - cost,
+        "total_cost": cost,
+        "total_proceeds": proceeds,
+        "trade_count": trade_count,
+    }
+
+
+async def get_closed_pnl_by_platform(
+    user_id: str,
+    platform: Optional[Platform] = None,
+) -> dict:
+    """
+    PnL of a user's closed positions per platform in one grouped query.
+
+    A position's PnL is (current_price - entry_price) * token_amount; ones
+    without a current price count as trades with no PnL. Values are Decimal.
+
+    Returns:
+        Dict keyed by platform value, only for platforms with closed positions
+    """
+    amount = _position_amount()
+    pnl = (Position.current_price - Position.entry_price) * amount
+    async with get_read_session(user_id) as session:
+        query = (
+            select(
+                Position.platform,
+                sql_func.coalesce(sql_func.sum(pnl), 0),
+                sql_func.coalesce(sql_func.sum(Position.entry_price * amount), 0),
+                sql_func.count(Position.id),
+                sql_func.count(Position.id).filter(pnl > 0),
+                sql_func.count(Position.id).filter(pnl < 0),
+            )
+            .where(Position.user_id == user_id, Position.status == PositionStatus.CLOSED)
+            .group_by(Position.platform)
+        )
+        if platform:
+            query = query.where(Position.platform == platform)
+
+        rows = (await session.execute(query)).all()
+
+    return {
+        plat.value: {
+            "total_pnl": Decimal(total_pnl),
+            "total_invested": Decimal(invested),
+            "total_trades": trades,
+            "winning_trades": wins,
+            "losing_trades": losses,
+        }
+        for plat, total_pnl, invested, trades, wins, losses in rows
+    }
+
+
+# ===================
+# Partner Management
+# ===================
+
+async def create_partner(
+    name: str,
     code: str,
     revenue_share_bps: int = 1000,
     telegram_user_id: Optional[int] = None,
@@ -1282,6 +1936,7 @@ async def get_effective_revenue_share(user_id: str) -> tuple[Optional[int], Opti
         return partner.revenue_share_bps, partner.id, user.partner_group_id
 
 
+@_invalidates_identity
 async def attribute_user_to_partner(
     user_id: str,
     partner_id: str,
@@ -1325,7 +1980,7 @@ async def attribute_user_to_partner(
 
 async def get_partner_stats(partner_id: str) -> dict:
     """Get detailed statistics for a partner."""
-    async with get_session() as session:
+    async with get_read_session() as session:
         # Get partner
         partner_result = await session.execute(
             select(Partner).where(Partner.id == partner_id)
@@ -1340,35 +1995,27 @@ async def get_partner_stats(partner_id: str) -> dict:
         )
         groups = list(groups_result.scalars().all())
 
-        # Get attributed users
-        users_result = await session.execute(
-            select(User).where(User.partner_id == partner_id)
+        # Attributed users and their confirmed order volume in one round trip
+        user_count = (
+            select(sql_func.count(User.id))
+            .where(User.partner_id == partner_id)
+            .scalar_subquery()
         )
-        users = list(users_result.scalars().all())
-
-        # Calculate total volume from orders
-        total_volume = Decimal("0")
-        total_fees = Decimal("0")
-
-        for user in users:
-            orders_result = await session.execute(
-                select(Order).where(
-                    Order.user_id == user.id,
-                    Order.status == OrderStatus.CONFIRMED,
-                )
-            )
-            orders = list(orders_result.scalars().all())
-            for order in orders:
-                try:
-                    total_volume += Decimal(order.input_amount) / Decimal("1000000")  # USDC decimals
-                except:
-                    pass
+        volume = (
+            select(_order_volume_usdc())
+            .select_from(Order)
+            .join(User, User.id == Order.user_id)
+            .where(User.partner_id == partner_id, Order.status == OrderStatus.CONFIRMED)
+            .scalar_subquery()
+        )
+        total_users, total_volume = (await session.execute(select(user_count, volume))).one()
+        total_volume = Decimal(total_volume or 0)
+        total_fees = Decimal(partner.total_fees_usdc or "0")
 
         return {
             "partner": partner,
             "groups": groups,
-            "users": users,
-            "total_users": len(users),
+            "total_users": total_users or 0,
             "total_groups": len(groups),
             "total_volume_usdc": total_volume,
             "total_fees_usdc": total_fees,
@@ -1377,11 +2024,32 @@ async def get_partner_stats(partner_id: str) -> dict:
         }
 
 
-async def update_partner_volume(partner_id: str, volume_usdc: Decimal, fee_usdc: Decimal) -> None:
-    """Update partner volume and fee stats after a trade."""
+async def update_partner_volume(
+    partner_id: str,
+    volume_usdc: Decimal,
+    fee_usdc: Decimal,
+    job_id: Optional[int] = None,
+) -> bool:
+    """
+    Update partner volume and fee stats after a trade.
+
+    When run from a post-trade job, the job is deleted in the same transaction
+    and nothing is counted if it is already gone (another run of the job
+    counted it), so a retried or re-claimed job cannot count a trade twice.
+
+    Returns:
+        False if the job had already been applied
+    """
     async with get_session() as session:
+        if job_id is not None:
+            removed = await session.execute(
+                delete(PostTradeJob).where(PostTradeJob.id == job_id).returning(PostTradeJob.id)
+            )
+            if removed.scalar_one_or_none() is None:
+                return False
+
         result = await session.execute(
-            select(Partner).where(Partner.id == partner_id)
+            select(Partner).where(Partner.id == partner_id).with_for_update()
         )
         partner = result.scalar_one_or_none()
         if partner:
@@ -1389,15 +2057,166 @@ async def update_partner_volume(partner_id: str, volume_usdc: Decimal, fee_usdc:
             current_fees = Decimal(partner.total_fees_usdc)
             partner.total_volume_usdc = str(current_volume + volume_usdc)
             partner.total_fees_usdc = str(current_fees + fee_usdc)
-            await session.commit()
+    return True
 
 
 # ============================================================================
 # Analytics Functions
 # ============================================================================
 
-from datetime import datetime, timedelta
-from sqlalchemy import func as sql_func
+from sqlalchemy import Date, case, insert, or_, union_all
+
+# Amount strings that do not parse are skipped
+_AMOUNT_PATTERN = r"^-?[0-9]+(\.[0-9]+)?$"
+_REFERRAL_TX_TYPES = ["referral_tier1", "referral_tier2", "referral_tier3"]
+
+# SystemConfig key holding the last UTC day covered by the daily rollups
+ROLLUP_WATERMARK_KEY = "rollups_complete_through"
+
+
+def _numeric_amount(numeric_column, string_column):
+    """
+    An amount as NUMERIC: the mirror column, falling back to casting the
+    string for rows written before it existed (NULL if it does not parse).
+    """
+    return sql_func.coalesce(
+        numeric_column,
+        case((string_column.op("~")(_AMOUNT_PATTERN), sql_func.cast(string_column, Numeric)), else_=None),
+    )
+
+
+def _order_amount():
+    return _numeric_amount(Order.input_amount_numeric, Order.input_amount)
+
+
+def _fee_amount():
+    return _numeric_amount(FeeTransaction.amount_usdc_numeric, FeeTransaction.amount_usdc)
+
+
+def _position_amount():
+    return _numeric_amount(Position.token_amount_numeric, Position.token_amount)
+
+
+def _order_volume_usdc():
+    """Confirmed order volume in USDC (input_amount is in 6-decimal base units)."""
+    return sql_func.coalesce(sql_func.sum(_order_amount()), 0) / 1000000
+
+
+# ===================
+# Rollup Windows
+# ===================
+# Period queries read whole UTC days up to the rollup watermark from the
+# daily rollup tables and only the rows outside those days (the partial
+# first day and the days after the watermark) from orders/fee_transactions.
+
+def _day_start(day: date) -> datetime:
+    """Midnight UTC at the start of a day."""
+    return datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+
+
+def rollup_window(
+    since: Optional[datetime],
+    watermark: Optional[date],
+) -> Optional[tuple[Optional[date], date]]:
+    """
+    Whole rolled-up days inside a period starting at `since`.
+
+    Returns:
+        (first_day, last_day), inclusive (first_day is None when the period is
+        unbounded), or None if no rolled-up day lies wholly inside the period
+    """
+    if watermark is None:
+        return None
+    if since is None:
+        return None, watermark
+
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    since = since.astimezone(timezone.utc)
+    first_day = since.date()
+    if since != _day_start(first_day):
+        first_day += timedelta(days=1)
+    if first_day > watermark:
+        return None
+    return first_day, watermark
+
+
+def _raw_period(column, since: Optional[datetime], window) -> list:
+    """Conditions selecting the rows of a period that the rollup window does not cover."""
+    conditions = []
+    if since is not None:
+        conditions.append(column >= since)
+    if window is not None:
+        first_day, last_day = window
+        after = column >= _day_start(last_day + timedelta(days=1))
+        conditions.append(or_(column < _day_start(first_day), after) if first_day else after)
+    return conditions
+
+
+async def _get_rollup_window(session: AsyncSession, since: Optional[datetime]):
+    watermark = await session.scalar(
+        select(SystemConfig.value).where(SystemConfig.key == ROLLUP_WATERMARK_KEY)
+    )
+    return rollup_window(since, date.fromisoformat(watermark) if watermark else None)
+
+
+def _trade_facts(since: Optional[datetime], window):
+    """Confirmed order (platform, user_id, volume, trade_count) rows covering a period."""
+    raw = (
+        select(
+            Order.platform.label("platform"),
+            Order.user_id.label("user_id"),
+            (sql_func.sum(_order_amount()) / 1000000).label("volume"),
+            sql_func.count(_order_amount()).label("trade_count"),
+        )
+        .where(Order.status == OrderStatus.CONFIRMED, *_raw_period(Order.created_at, since, window))
+        .group_by(Order.platform, Order.user_id)
+    )
+    if window is None:
+        return raw.subquery()
+
+    first_day, last_day = window
+    rolled = select(
+        DailyTradeRollup.platform,
+        DailyTradeRollup.user_id,
+        DailyTradeRollup.volume_usdc,
+        DailyTradeRollup.trade_count,
+    ).where(DailyTradeRollup.day <= last_day)
+    if first_day:
+        rolled = rolled.where(DailyTradeRollup.day >= first_day)
+    return union_all(raw, rolled).subquery()
+
+
+def _fee_facts(since: Optional[datetime], window, tx_types: list[str]):
+    """Fee transaction (user_id, tx_type, amount, tx_count) rows covering a period."""
+    raw = (
+        select(
+            FeeTransaction.user_id.label("user_id"),
+            FeeTransaction.tx_type.label("tx_type"),
+            sql_func.sum(_fee_amount()).label("amount"),
+            sql_func.count(_fee_amount()).label("tx_count"),
+        )
+        .where(FeeTransaction.tx_type.in_(tx_types), *_raw_period(FeeTransaction.created_at, since, window))
+        .group_by(FeeTransaction.user_id, FeeTransaction.tx_type)
+    )
+    if window is None:
+        return raw.subquery()
+
+    first_day, last_day = window
+    rolled = select(
+        DailyFeeRollup.user_id,
+        DailyFeeRollup.tx_type,
+        DailyFeeRollup.amount_usdc,
+        DailyFeeRollup.tx_count,
+    ).where(DailyFeeRollup.tx_type.in_(tx_types), DailyFeeRollup.day <= last_day)
+    if first_day:
+        rolled = rolled.where(DailyFeeRollup.day >= first_day)
+    return union_all(raw, rolled).subquery()
+
+
+def _total(column):
+    return sql_func.coalesce(sql_func.sum(column), 0)
+
 
 async def get_analytics_stats(
     since: Optional[datetime] = None,
@@ -1413,60 +2232,40 @@ async def get_analytics_stats(
     Returns:
         Dict with user_count, new_users, trade_volume, fee_revenue
     """
-    async with get_session() as session:
-        # Count total users
-        total_users_query = select(sql_func.count(User.id))
-        total_users_result = await session.execute(total_users_query)
-        total_users = total_users_result.scalar() or 0
-
-        # Count new users in period
-        new_users_query = select(sql_func.count(User.id))
-        if since:
-            new_users_query = new_users_query.where(User.created_at >= since)
-        new_users_result = await session.execute(new_users_query)
-        new_users = new_users_result.scalar() or 0
-
-        # Get trade volume from confirmed orders
-        volume_query = select(Order).where(Order.status == OrderStatus.CONFIRMED)
-        if since:
-            volume_query = volume_query.where(Order.created_at >= since)
+    async with get_read_session() as session:
+        # Total and new users in one pass
+        new_users_expr = (
+            sql_func.count(User.id).filter(User.created_at >= since)
+            if since else sql_func.count(User.id)
+        )
+        user_row = (await session.execute(
+            select(sql_func.count(User.id), new_users_expr)
+        )).one()
+        total_users, new_users = user_row[0] or 0, user_row[1] or 0
+
+        window = await _get_rollup_window(session, since)
+
+        # Trade volume from confirmed orders
+        trades = _trade_facts(since, window)
+        volume_query = select(_total(trades.c.volume), _total(trades.c.trade_count))
         if platform:
-            volume_query = volume_query.where(Order.platform == platform)
-
-        volume_result = await session.execute(volume_query)
-        orders = list(volume_result.scalars().all())
+            volume_query = volume_query.where(trades.c.platform == platform)
 
-        trade_volume = Decimal("0")
-        trade_count = 0
-        for order in orders:
-            try:
-                trade_volume += Decimal(order.input_amount) / Decimal("1000000")
-                trade_count += 1
-            except:
-                pass
+        volume_row = (await session.execute(volume_query)).one()
+        trade_volume = Decimal(volume_row[0] or 0)
+        trade_count = volume_row[1] or 0
 
         # Calculate fee revenue as 1% of trade volume
         # Fee is 100 basis points (1%) on every trade
         fee_revenue = trade_volume * Decimal("0.01")
 
-        # Get referral payouts from fee_transactions
-        referral_query = select(FeeTransaction).where(
-            FeeTransaction.tx_type.in_(["referral_tier1", "referral_tier2", "referral_tier3"])
-        )
-        if since:
-            referral_query = referral_query.where(FeeTransaction.created_at >= since)
-
-        referral_result = await session.execute(referral_query)
-        referral_transactions = list(referral_result.scalars().all())
-
-        referral_payouts = Decimal("0")
-        referral_count = 0
-        for ref_tx in referral_transactions:
-            try:
-                referral_payouts += Decimal(ref_tx.amount_usdc)
-                referral_count += 1
-            except:
-                pass
+        # Referral payouts from fee_transactions
+        payouts = _fee_facts(since, window, _REFERRAL_TX_TYPES)
+        referral_row = (await session.execute(
+            select(_total(payouts.c.amount), _total(payouts.c.tx_count))
+        )).one()
+        referral_payouts = Decimal(referral_row[0] or 0)
+        referral_count = referral_row[1] or 0
 
         # Net revenue = fees collected - referral payouts
         net_revenue = fee_revenue - referral_payouts
@@ -1495,49 +2294,30 @@ async def get_analytics_by_platform(
     Returns:
         Dict with stats per platform
     """
-    async with get_session() as session:
-        results = {}
-
-        for plat in Platform:
-            # Get trade volume from confirmed orders for this platform
-            volume_query = select(Order).where(
-                Order.status == OrderStatus.CONFIRMED,
-                Order.platform == plat,
-            )
-            if since:
-                volume_query = volume_query.where(Order.created_at >= since)
-
-            volume_result = await session.execute(volume_query)
-            orders = list(volume_result.scalars().all())
-
-            trade_volume = Decimal("0")
-            trade_count = 0
-            for order in orders:
-                try:
-                    trade_volume += Decimal(order.input_amount) / Decimal("1000000")
-                    trade_count += 1
-                except:
-                    pass
-
-            # Calculate fee revenue as 1% of trade volume
-            fee_revenue = trade_volume * Decimal("0.01")
-
-            # Get unique users who traded on this platform
-            user_query = select(sql_func.count(sql_func.distinct(Order.user_id))).where(
-                Order.status == OrderStatus.CONFIRMED,
-                Order.platform == plat,
+    async with get_read_session() as session:
+        trades = _trade_facts(since, await _get_rollup_window(session, since))
+        query = (
+            select(
+                trades.c.platform,
+                _total(trades.c.volume),
+                _total(trades.c.trade_count),
+                sql_func.count(sql_func.distinct(trades.c.user_id)),
             )
-            if since:
-                user_query = user_query.where(Order.created_at >= since)
+            .group_by(trades.c.platform)
+        )
 
-            user_result = await session.execute(user_query)
-            active_users = user_result.scalar() or 0
+        rows = {row[0]: row for row in await session.execute(query)}
 
+        results = {}
+        for plat in Platform:
+            row = rows.get(plat)
+            trade_volume = Decimal(row[1] or 0) if row else Decimal("0")
             results[plat.value] = {
                 "trade_volume": trade_volume,
-                "trade_count": trade_count,
-                "active_users": active_users,
-                "fee_revenue": fee_revenue,
+                "trade_count": row[2] if row else 0,
+                "active_users": row[3] if row else 0,
+                # Fee revenue is 1% of trade volume
+                "fee_revenue": trade_volume * Decimal("0.01"),
             }
 
         return results
@@ -1557,55 +2337,37 @@ async def get_top_traders(
     Returns:
         List of dicts with user info and trading stats
     """
-    async with get_session() as session:
-        # Get all confirmed orders grouped by user
-        order_query = select(Order).where(Order.status == OrderStatus.CONFIRMED)
-        if since:
-            order_query = order_query.where(Order.created_at >= since)
-
-        order_result = await session.execute(order_query)
-        orders = list(order_result.scalars().all())
-
-        # Aggregate by user
-        user_stats = {}
-        for order in orders:
-            user_id = order.user_id
-            if user_id not in user_stats:
-                user_stats[user_id] = {
-                    "user_id": user_id,
-                    "volume": Decimal("0"),
-                    "trade_count": 0,
-                }
-            try:
-                user_stats[user_id]["volume"] += Decimal(order.input_amount) / Decimal("1000000")
-                user_stats[user_id]["trade_count"] += 1
-            except:
-                pass
-
-        # Sort by volume and take top N
-        sorted_traders = sorted(
-            user_stats.values(),
-            key=lambda x: x["volume"],
-            reverse=True
-        )[:limit]
-
-        # Get user details for top traders
+    async with get_read_session() as session:
+        trades = _trade_facts(since, await _get_rollup_window(session, since))
+        volume = _total(trades.c.volume).label("volume")
+        trade_count = _total(trades.c.trade_count).label("trade_count")
+
+        traders = (
+            select(trades.c.user_id, volume, trade_count)
+            .group_by(trades.c.user_id)
+            .order_by(volume.desc())
+            .limit(limit)
+            .subquery()
+        )
+
+        rows = await session.execute(
+            select(User, traders.c.volume, traders.c.trade_count)
+            .join(traders, traders.c.user_id == User.id)
+            .order_by(traders.c.volume.desc())
+        )
+
         result = []
-        for trader in sorted_traders:
-            user_result = await session.execute(
-                select(User).where(User.id == trader["user_id"])
-            )
-            user = user_result.scalar_one_or_none()
-            if user:
-                result.append({
-                    "user_id": user.id,
-                    "telegram_id": user.telegram_id,
-                    "username": user.username,
-                    "first_name": user.first_name,
-                    "volume": trader["volume"],
-                    "trade_count": trader["trade_count"],
-                    "fees_paid": trader["volume"] * Decimal("0.01"),
-                })
+        for user, trader_volume, trader_count in rows:
+            trader_volume = Decimal(trader_volume or 0)
+            result.append({
+                "user_id": user.id,
+                "telegram_id": user.telegram_id,
+                "username": user.username,
+                "first_name": user.first_name,
+                "volume": trader_volume,
+                "trade_count": trader_count,
+                "fees_paid": trader_volume * Decimal("0.01"),
+            })
 
         return result
 
@@ -1620,23 +2382,14 @@ async def get_user_trading_volume(user_id: str) -> Decimal:
     Returns:
         Total trading volume in USD
     """
-    async with get_session() as session:
-        volume_query = select(Order).where(
-            Order.user_id == user_id,
-            Order.status == OrderStatus.CONFIRMED,
+    async with get_read_session(user_id) as session:
+        result = await session.execute(
+            select(_order_volume_usdc()).where(
+                Order.user_id == user_id,
+                Order.status == OrderStatus.CONFIRMED,
+            )
         )
-
-        volume_result = await session.execute(volume_query)
-        orders = list(volume_result.scalars().all())
-
-        total_volume = Decimal("0")
-        for order in orders:
-            try:
-                total_volume += Decimal(order.input_amount) / Decimal("1000000")
-            except:
-                pass
-
-        return total_volume
+        return Decimal(result.scalar() or 0)
 
 
 async def get_top_referrers(
@@ -1653,81 +2406,354 @@ async def get_top_referrers(
     Returns:
         List of dicts with user info and referral stats
     """
-    async with get_session() as session:
-        # Get all referral transactions
-        referral_query = select(FeeTransaction).where(
-            FeeTransaction.tx_type.in_(["referral_tier1", "referral_tier2", "referral_tier3"])
+    async with get_read_session() as session:
+        payouts = _fee_facts(since, await _get_rollup_window(session, since), _REFERRAL_TX_TYPES)
+        total_earned = _total(payouts.c.amount).label("total_earned")
+
+        def tier_sum(tier: int):
+            return sql_func.coalesce(
+                sql_func.sum(payouts.c.amount).filter(payouts.c.tx_type == f"referral_tier{tier}"), 0
+            )
+
+        earners = (
+            select(
+                payouts.c.user_id,
+                total_earned,
+                tier_sum(1).label("tier1_earned"),
+                tier_sum(2).label("tier2_earned"),
+                tier_sum(3).label("tier3_earned"),
+                _total(payouts.c.tx_count).label("payout_count"),
+            )
+            .group_by(payouts.c.user_id)
+            .order_by(total_earned.desc())
+            .limit(limit)
+            .subquery()
         )
-        if since:
-            referral_query = referral_query.where(FeeTransaction.created_at >= since)
-
-        referral_result = await session.execute(referral_query)
-        transactions = list(referral_result.scalars().all())
-
-        # Aggregate by user (the recipient of referral earnings)
-        user_stats = {}
-        for tx in transactions:
-            user_id = tx.user_id
-            if user_id not in user_stats:
-                user_stats[user_id] = {
-                    "user_id": user_id,
-                    "total_earned": Decimal("0"),
-                    "tier1_earned": Decimal("0"),
-                    "tier2_earned": Decimal("0"),
-                    "tier3_earned": Decimal("0"),
-                    "referral_count": 0,
-                }
-            try:
-                amount = Decimal(tx.amount_usdc)
-                user_stats[user_id]["total_earned"] += amount
-                user_stats[user_id]["referral_count"] += 1
-
-                if tx.tx_type == "referral_tier1":
-                    user_stats[user_id]["tier1_earned"] += amount
-                elif tx.tx_type == "referral_tier2":
-                    user_stats[user_id]["tier2_earned"] += amount
-                elif tx.tx_type == "referral_tier3":
-                    user_stats[user_id]["tier3_earned"] += amount
-            except:
-                pass
-
-        # Sort by total earned and take top N
-        sorted_referrers = sorted(
-            user_stats.values(),
-            key=lambda x: x["total_earned"],
-            reverse=True
-        )[:limit]
-
-        # Get user details and referral counts
+
+        # Direct referrals (users who have this user as referred_by_id)
+        Referred = aliased(User)
+        direct_referrals = (
+            select(sql_func.count(Referred.id))
+            .where(Referred.referred_by_id == User.id)
+            .correlate(User)
+            .scalar_subquery()
+        )
+
+        rows = await session.execute(
+            select(
+                User,
+                earners.c.total_earned,
+                earners.c.tier1_earned,
+                earners.c.tier2_earned,
+                earners.c.tier3_earned,
+                earners.c.payout_count,
+                direct_referrals.label("direct_referrals"),
+            )
+            .join(earners, earners.c.user_id == User.id)
+            .order_by(earners.c.total_earned.desc())
+        )
+
         result = []
-        for referrer in sorted_referrers:
-            user_result = await session.execute(
-                select(User).where(User.id == referrer["user_id"])
+        for user, total, tier1, tier2, tier3, payout_count, direct_count in rows:
+            result.append({
+                "user_id": user.id,
+                "telegram_id": user.telegram_id,
+                "username": user.username,
+                "first_name": user.first_name,
+                "referral_code": user.referral_code,
+                "total_earned": Decimal(total or 0),
+                "tier1_earned": Decimal(tier1 or 0),
+                "tier2_earned": Decimal(tier2 or 0),
+                "tier3_earned": Decimal(tier3 or 0),
+                "payout_count": payout_count,
+                "direct_referrals": direct_count or 0,
+            })
+
+        return result
+
+
+# ===================
+# Daily Rollups
+# ===================
+
+async def get_rollup_watermark() -> Optional[date]:
+    """Last UTC day covered by the daily rollups (None before the first compaction)."""
+    value = await get_config(ROLLUP_WATERMARK_KEY)
+    return date.fromisoformat(value) if value else None
+
+
+async def get_first_activity_day() -> Optional[date]:
+    """UTC day of the oldest order or fee transaction."""
+    async with get_session() as session:
+        first = await session.scalar(
+            select(sql_func.least(
+                select(sql_func.min(Order.created_at)).scalar_subquery(),
+                select(sql_func.min(FeeTransaction.created_at)).scalar_subquery(),
+            ))
+        )
+    return first.astimezone(timezone.utc).date() if first else None
+
+
+async def rebuild_daily_rollups(day: date, advance_watermark: bool = False) -> None:
+    """
+    Recompute one UTC day of rollups from the raw rows, in one transaction.
+
+    Args:
+        day: The day to roll up
+        advance_watermark: Also record the day as the last rolled-up day
+    """
+    start, end = _day_start(day), _day_start(day + timedelta(days=1))
+    async with get_session() as session:
+        await session.execute(delete(DailyTradeRollup).where(DailyTradeRollup.day == day))
+        await session.execute(delete(DailyFeeRollup).where(DailyFeeRollup.day == day))
+
+        await session.execute(
+            insert(DailyTradeRollup).from_select(
+                ["day", "platform", "user_id", "partner_id", "volume_usdc", "trade_count"],
+                select(
+                    literal(day, Date),
+                    Order.platform,
+                    Order.user_id,
+                    User.partner_id,
+                    _order_volume_usdc(),
+                    sql_func.count(_order_amount()),
+                )
+                .outerjoin(User, User.id == Order.user_id)
+                .where(
+                    Order.status == OrderStatus.CONFIRMED,
+                    Order.created_at >= start,
+                    Order.created_at < end,
+                )
+                .group_by(Order.platform, Order.user_id, User.partner_id),
+            )
+        )
+        await session.execute(
+            insert(DailyFeeRollup).from_select(
+                ["day", "user_id", "chain_family", "tx_type", "amount_usdc", "tx_count"],
+                select(
+                    literal(day, Date),
+                    FeeTransaction.user_id,
+                    FeeTransaction.chain_family,
+                    FeeTransaction.tx_type,
+                    _total(_fee_amount()),
+                    sql_func.count(_fee_amount()),
+                )
+                .where(FeeTransaction.created_at >= start, FeeTransaction.created_at < end)
+                .group_by(FeeTransaction.user_id, FeeTransaction.chain_family, FeeTransaction.tx_type),
             )
-            user = user_result.scalar_one_or_none()
+        )
 
-            # Count direct referrals (users who have this user as referred_by_id)
-            direct_count_result = await session.execute(
-                select(sql_func.count(User.id)).where(User.referred_by_id == referrer["user_id"])
+        if advance_watermark:
+            await session.execute(
+                pg_insert(SystemConfig)
+                .values(
+                    key=ROLLUP_WATERMARK_KEY,
+                    value=day.isoformat(),
+                    description="Last UTC day covered by daily rollups",
+                )
+                .on_conflict_do_update(
+                    index_elements=[SystemConfig.key],
+                    set_={"value": day.isoformat(), "updated_at": sql_func.now()},
+                )
             )
-            direct_referrals = direct_count_result.scalar() or 0
-
-            if user:
-                result.append({
-                    "user_id": user.id,
-                    "telegram_id": user.telegram_id,
-                    "username": user.username,
-                    "first_name": user.first_name,
-                    "referral_code": user.referral_code,
-                    "total_earned": referrer["total_earned"],
-                    "tier1_earned": referrer["tier1_earned"],
-                    "tier2_earned": referrer["tier2_earned"],
-                    "tier3_earned": referrer["tier3_earned"],
-                    "payout_count": referrer["referral_count"],
-                    "direct_referrals": direct_referrals,
-                })
 
-        return result
+
+async def find_stale_rollup_days(first_day: date, last_day: date) -> list[date]:
+    """
+    Days in [first_day, last_day] whose rollups no longer match the raw rows
+    (late status changes, backfills, manual fixes).
+    """
+    start, end = _day_start(first_day), _day_start(last_day + timedelta(days=1))
+    order_day = sql_func.date(sql_func.timezone("UTC", Order.created_at))
+    fee_day = sql_func.date(sql_func.timezone("UTC", FeeTransaction.created_at))
+    micro = Decimal("0.000001")
+
+    async with get_session() as session:
+        raw_trades = await session.execute(
+            select(order_day, _order_volume_usdc(), sql_func.count(_order_amount()))
+            .where(Order.status == OrderStatus.CONFIRMED, Order.created_at >= start, Order.created_at < end)
+            .group_by(order_day)
+        )
+        rolled_trades = await session.execute(
+            select(DailyTradeRollup.day, _total(DailyTradeRollup.volume_usdc), _total(DailyTradeRollup.trade_count))
+            .where(DailyTradeRollup.day >= first_day, DailyTradeRollup.day <= last_day)
+            .group_by(DailyTradeRollup.day)
+        )
+        raw_fees = await session.execute(
+            select(fee_day, _total(_fee_amount()), sql_func.count(_fee_amount()))
+            .where(FeeTransaction.created_at >= start, FeeTransaction.created_at < end)
+            .group_by(fee_day)
+        )
+        rolled_fees = await session.execute(
+            select(DailyFeeRollup.day, _total(DailyFeeRollup.amount_usdc), _total(DailyFeeRollup.tx_count))
+            .where(DailyFeeRollup.day >= first_day, DailyFeeRollup.day <= last_day)
+            .group_by(DailyFeeRollup.day)
+        )
+
+        def totals(rows) -> dict:
+            return {
+                day: (Decimal(amount or 0).quantize(micro), count or 0)
+                for day, amount, count in rows
+                if amount or count
+            }
+
+        stale = set()
+        for raw, rolled in ((raw_trades, rolled_trades), (raw_fees, rolled_fees)):
+            raw_totals, rolled_totals = totals(raw), totals(rolled)
+            stale.update(
+                day for day in raw_totals.keys() | rolled_totals.keys()
+                if raw_totals.get(day) != rolled_totals.get(day)
+            )
+        return sorted(stale)
+
+
+# ===================
+# Price Alerts
+# ===================
+
+async def create_price_alert(
+    alert_id: str,
+    user_telegram_id: int,
+    platform: Platform,
+    market_id: str,
+    market_title: str,
+    outcome: str,
+    condition: str,
+    target_price: Decimal,
+    token_id: Optional[str] = None,
+) -> PriceAlertRecord:
+    """Persist a new price alert."""
+    async with get_session() as session:
+        record = PriceAlertRecord(
+            id=alert_id,
+            user_telegram_id=user_telegram_id,
+            platform=platform,
+            market_id=market_id,
+            market_title=market_title,
+            token_id=token_id,
+            outcome=outcome,
+            condition=condition,
+            target_price=target_price,
+        )
+        session.add(record)
+        await session.commit()
+        return record
+
+
+async def delete_price_alert(alert_id: str, user_telegram_id: int) -> bool:
+    """Delete a user's price alert."""
+    async with get_session() as session:
+        result = await session.execute(
+            delete(PriceAlertRecord).where(
+                PriceAlertRecord.id == alert_id,
+                PriceAlertRecord.user_telegram_id == user_telegram_id,
+            )
+        )
+        await session.commit()
+        return result.rowcount > 0
+
+
+async def get_active_price_alerts() -> list[PriceAlertRecord]:
+    """Get all untriggered price alerts (bulk load on startup)."""
+    async with get_session() as session:
+        result = await session.execute(
+            select(PriceAlertRecord).where(PriceAlertRecord.triggered == False)  # noqa: E712
+        )
+        return list(result.scalars().all())
+
+
+async def claim_triggered_price_alerts(
+    triggered: list[tuple[str, Optional[Decimal], datetime]],
+) -> set[str]:
+    """
+    Claim a batch of triggered alerts in one transaction.
+
+    Only alerts still untriggered are claimed (UPDATE ... WHERE triggered =
+    false RETURNING id), so when several evaluators see the same alert cross,
+    exactly one gets it back and notifies.
+
+    Args:
+        triggered: (alert_id, trigger price, triggered_at) tuples
+
+    Returns:
+        IDs of the alerts this call claimed
+    """
+    if not triggered:
+        return set()
+    table = PriceAlertRecord.__table__
+    async with get_session() as session:
+        result = await session.execute(
+            update(table)
+            .where(
+                table.c.id.in_([alert_id for alert_id, _, _ in triggered]),
+                table.c.triggered == False,  # noqa: E712
+            )
+            .values(triggered=True)
+            .returning(table.c.id)
+        )
+        claimed = set(result.scalars())
+        if claimed:
+            # Core executemany: one UPDATE statement for the claimed rows
+            await session.execute(
+                update(table)
+                .where(table.c.id == bindparam("alert_id"))
+                .values(triggered_price=bindparam("price"), triggered_at=bindparam("at")),
+                [
+                    {"alert_id": alert_id, "price": price, "at": at}
+                    for alert_id, price, at in triggered
+                    if alert_id in claimed
+                ],
+            )
+    return claimed
+
+
+async def add_arbitrage_subscriber(telegram_id: int) -> None:
+    """Subscribe a user to arbitrage alerts (no-op if already subscribed)."""
+    async with get_session() as session:
+        if await session.get(ArbitrageSubscriber, telegram_id) is None:
+            session.add(ArbitrageSubscriber(telegram_id=telegram_id))
+            await session.commit()
+
+
+async def remove_arbitrage_subscriber(telegram_id: int) -> None:
+    """Unsubscribe a user from arbitrage alerts."""
+    async with get_session() as session:
+        await session.execute(
+            delete(ArbitrageSubscriber).where(ArbitrageSubscriber.telegram_id == telegram_id)
+        )
+        await session.commit()
+
+
+async def get_arbitrage_subscribers() -> list[int]:
+    """Get telegram IDs of all arbitrage alert subscribers."""
+    async with get_session() as session:
+        result = await session.execute(select(ArbitrageSubscriber.telegram_id))
+        return list(result.scalars().all())
+
+
+async def get_market_matches() -> list[MarketMatch]:
+    """Get all confirmed cross-platform market matches."""
+    async with get_session() as session:
+        result = await session.execute(select(MarketMatch))
+        return list(result.scalars().all())
+
+
+# Rows per INSERT, keeping each statement well under asyncpg's 32767 bind parameters
+_MATCH_INSERT_CHUNK = 1000
+
+
+async def save_market_matches(matches: list[dict]) -> None:
+    """Insert a batch of market matches, ignoring pairs that already exist."""
+    if not matches:
+        return
+    async with get_session() as session:
+        for start in range(0, len(matches), _MATCH_INSERT_CHUNK):
+            await session.execute(
+                pg_insert(MarketMatch)
+                .values(matches[start:start + _MATCH_INSERT_CHUNK])
+                .on_conflict_do_nothing()
+            )
+        await session.commit()
 
 
 # ===================
@@ -2144,8 +3170,170 @@ async def get_acp_top_agents(limit: int = 10) -> list[dict]:
         ]
 
 
-async def get_all_user_telegram_ids() -> list[int]:
-    """Get all user telegram IDs (for broadcast messages)."""
+async def stream_user_telegram_ids(
+    batch_size: int = 1000,
+    after_telegram_id: Optional[int] = None,
+    reachable_only: bool = False,
+) -> AsyncIterator[int]:
+    """
+    Yield user telegram IDs in ascending order (for broadcasts and other fan-out jobs).
+
+    Each batch is its own keyset query (telegram_id > last ORDER BY telegram_id
+    LIMIT batch_size) in a short session, so no connection or snapshot is held
+    while the caller works through the IDs.
+
+    Args:
+        batch_size: Rows fetched per query
+        after_telegram_id: Resume after this ID (exclusive)
+        reachable_only: Skip users who blocked the bot
+    """
+    query = select(User.telegram_id).order_by(User.telegram_id).limit(batch_size)
+    if reachable_only:
+        query = query.where(User.bot_blocked_at.is_(None))
+
+    last_id = after_telegram_id
+    while True:
+        batch_query = query if last_id is None else query.where(User.telegram_id > last_id)
+        async with get_session() as session:
+            batch = list((await session.execute(batch_query)).scalars())
+        for telegram_id in batch:
+            yield telegram_id
+        if len(batch) < batch_size:
+            return
+        last_id = batch[-1]
+
+
+# ===================
+# Broadcasts
+# ===================
+
+async def create_broadcast(
+    admin_telegram_id: int,
+    text: str,
+    photo_file_id: Optional[str] = None,
+    status_message_id: Optional[int] = None,
+) -> Broadcast:
+    """Create a running broadcast job addressed to every reachable user."""
+    async with get_session() as session:
+        total = await session.scalar(
+            select(sql_func.count(User.id)).where(User.bot_blocked_at.is_(None))
+        )
+        broadcast = Broadcast(
+            admin_telegram_id=admin_telegram_id,
+            status_message_id=status_message_id,
+            text=text,
+            photo_file_id=photo_file_id,
+            total=total or 0,
+        )
+        session.add(broadcast)
+        await session.flush()
+        return broadcast
+
+
+async def get_broadcast(broadcast_id: int) -> Optional[Broadcast]:
+    """Get a broadcast job by ID."""
+    async with get_session() as session:
+        return await session.get(Broadcast, broadcast_id)
+
+
+async def get_running_broadcasts() -> list[Broadcast]:
+    """Broadcast jobs that were interrupted before completing."""
+    async with get_session() as session:
+        result = await session.execute(
+            select(Broadcast).where(Broadcast.status == "running").order_by(Broadcast.id)
+        )
+        return list(result.scalars().all())
+
+
+async def save_broadcast_progress(
+    broadcast_id: int,
+    last_telegram_id: Optional[int],
+    sent: int,
+    failed: int,
+    blocked: int,
+    status: str = "running",
+    blocked_telegram_ids: Optional[list[int]] = None,
+) -> None:
+    """Checkpoint a broadcast and mark users who blocked the bot, in one transaction."""
+    async with get_session() as session:
+        values = {
+            "last_telegram_id": last_telegram_id,
+            "sent": sent,
+            "failed": failed,
+            "blocked": blocked,
+            "status": status,
+        }
+        if status != "running":
+            values["completed_at"] = sql_func.now()
+        await session.execute(
+            update(Broadcast).where(Broadcast.id == broadcast_id).values(**values)
+        )
+        if blocked_telegram_ids:
+            await session.execute(
+                update(User)
+                .where(User.telegram_id.in_(blocked_telegram_ids))
+                .values(bot_blocked_at=sql_func.now())
+            )
+    for telegram_id in blocked_telegram_ids or ():
+        invalidate_identity(telegram_id=telegram_id)
+
+
+# ===================
+# Post-Trade Jobs
+# ===================
+
+async def enqueue_post_trade_jobs(jobs: list[tuple[str, str]]) -> None:
+    """Insert outbox jobs, given as (kind, JSON payload), in one transaction."""
+    async with get_session() as session:
+        session.add_all([PostTradeJob(kind=kind, payload=payload) for kind, payload in jobs])
+
+
+async def claim_post_trade_jobs(limit: int, lease_seconds: float) -> list[PostTradeJob]:
+    """
+    Claim due jobs for this worker.
+
+    Claimed jobs are marked running until now + lease_seconds; a running job
+    whose lease has expired (its worker died) is due again. SKIP LOCKED lets
+    several workers claim concurrently without waiting on each other.
+    """
+    due = (
+        select(PostTradeJob.id)
+        .where(PostTradeJob.status.in_(("pending", "running")))
+        .where(PostTradeJob.run_after <= sql_func.now())
+        .order_by(PostTradeJob.run_after)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
     async with get_session() as session:
-        result = await session.execute(select(User.telegram_id))
+        result = await session.execute(
+            update(PostTradeJob)
+            .where(PostTradeJob.id.in_(due))
+            .values(
+                status="running",
+                attempts=PostTradeJob.attempts + 1,
+                run_after=sql_func.now() + timedelta(seconds=lease_seconds),
+            )
+            .returning(PostTradeJob)
+            .execution_options(synchronize_session=False)
+        )
         return list(result.scalars().all())
+
+
+async def complete_post_trade_job(job_id: int) -> None:
+    """Remove a job that succeeded."""
+    async with get_session() as session:
+        await session.execute(delete(PostTradeJob).where(PostTradeJob.id == job_id))
+
+
+async def fail_post_trade_job(job_id: int, error: str, retry_in: Optional[float]) -> None:
+    """Record a failed attempt; retry after retry_in seconds, or give up if None."""
+    values = {"last_error": error[:2000]}
+    if retry_in is None:
+        values["status"] = "failed"
+    else:
+        values["status"] = "pending"
+        values["run_after"] = sql_func.now() + timedelta(seconds=retry_in)
+    async with get_session() as session:
+        await session.execute(
+            update(PostTradeJob).where(PostTradeJob.id == job_id).values(**values)
+        )
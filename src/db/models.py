@@ -3,7 +3,7 @@ SQLAlchemy database models for Spredd Markets Bot.
 Supports multi-platform trading with shared EVM wallets.
 """
 
-from datetime import datetime
+from datetime import date, datetime
 from decimal import Decimal
 from enum import Enum
 from typing import Optional
@@ -12,7 +12,9 @@ from sqlalchemy import (
     BigInteger,
     Boolean,
     Column,
+    Date,
     DateTime,
+    Float,
     ForeignKey,
     Index,
     Integer,
@@ -23,7 +25,7 @@ from sqlalchemy import (
     func,
 )
 from sqlalchemy.ext.asyncio import AsyncAttrs
-from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship, validates
 
 
 class Base(AsyncAttrs, DeclarativeBase):
@@ -31,6 +33,17 @@ class Base(AsyncAttrs, DeclarativeBase):
     pass
 
 
+def parse_amount(value) -> Optional[Decimal]:
+    """Parse a stored amount string for its NUMERIC mirror column (None if invalid)."""
+    if value is None:
+        return None
+    try:
+        amount = Decimal(str(value))
+    except (ArithmeticError, ValueError):
+        return None
+    return amount if amount.is_finite() else None
+
+
 # ===================
 # Enums
 # ===================
@@ -128,7 +141,7 @@ class User(Base):
 
     # Referral system
     referral_code: Mapped[Optional[str]] = mapped_column(String(32), unique=True, nullable=True, index=True)
-    referred_by_id: Mapped[Optional[str]] = mapped_column(String(36), ForeignKey("users.id"), nullable=True)
+    referred_by_id: Mapped[Optional[str]] = mapped_column(String(36), ForeignKey("users.id"), nullable=True, index=True)
 
     # Partner attribution (for revenue sharing)
     partner_id: Mapped[Optional[str]] = mapped_column(String(36), ForeignKey("partners.id"), nullable=True, index=True)
@@ -140,6 +153,9 @@ class User(Base):
     cm_qualification_sent: Mapped[bool] = mapped_column(Boolean, default=False)  # Qualification postback sent
     cm_qualified_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)  # First qualifying trade
 
+    # Set when a broadcast finds the user blocked the bot; cleared when they come back
+    bot_blocked_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
     # Timestamps
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
@@ -244,6 +260,7 @@ class Position(Base):
     
     # Amounts (stored as string for precision)
     token_amount: Mapped[str] = mapped_column(String(78))  # BigInt as string
+    token_amount_numeric: Mapped[Optional[Decimal]] = mapped_column(Numeric, nullable=True)  # Mirrors token_amount
     entry_price: Mapped[Decimal] = mapped_column(Numeric(18, 8))
     current_price: Mapped[Optional[Decimal]] = mapped_column(Numeric(18, 8), nullable=True)
     
@@ -272,10 +289,16 @@ class Position(Base):
     user: Mapped["User"] = relationship(back_populates="positions")
     
     __table_args__ = (
-        Index("ix_positions_user_status", "user_id", "status"),
+        # Serves status filters and keyset pages ordered by (created_at, id)
+        Index("ix_positions_user_status_created", "user_id", "status", "created_at", "id"),
         Index("ix_positions_market", "market_id"),
     )
 
+    @validates("token_amount")
+    def _mirror_token_amount(self, key: str, value: str) -> str:
+        self.token_amount_numeric = parse_amount(value)
+        return value
+
 
 class Order(Base):
     """Order history across all platforms."""
@@ -301,6 +324,7 @@ class Order(Base):
     # Amounts
     input_token: Mapped[str] = mapped_column(String(255))  # e.g., USDC address
     input_amount: Mapped[str] = mapped_column(String(78))
+    input_amount_numeric: Mapped[Optional[Decimal]] = mapped_column(Numeric, nullable=True)  # Mirrors input_amount
     output_token: Mapped[str] = mapped_column(String(255))
     expected_output: Mapped[str] = mapped_column(String(78))
     actual_output: Mapped[Optional[str]] = mapped_column(String(78), nullable=True)
@@ -337,8 +361,16 @@ class Order(Base):
     __table_args__ = (
         Index("ix_orders_user_status", "user_id", "status"),
         Index("ix_orders_tx", "tx_hash"),
+        Index("ix_orders_created_at", "created_at"),
+        # Order history pages span all statuses, ordered by (created_at, id)
+        Index("ix_orders_user_created", "user_id", "created_at", "id"),
     )
 
+    @validates("input_amount")
+    def _mirror_input_amount(self, key: str, value: str) -> str:
+        self.input_amount_numeric = parse_amount(value)
+        return value
+
 
 class MarketCache(Base):
     """Cached market data for quick lookups."""
@@ -463,6 +495,7 @@ class FeeTransaction(Base):
 
     # Amount in USDC
     amount_usdc: Mapped[str] = mapped_column(String(78))
+    amount_usdc_numeric: Mapped[Optional[Decimal]] = mapped_column(Numeric, nullable=True)  # Mirrors amount_usdc
 
     # For referral earnings, track the source user who generated the fee
     source_user_id: Mapped[Optional[str]] = mapped_column(String(36), ForeignKey("users.id"), nullable=True)
@@ -485,8 +518,16 @@ class FeeTransaction(Base):
         Index("ix_fee_tx_type", "tx_type"),
         Index("ix_fee_tx_order", "order_id"),
         Index("ix_fee_tx_chain", "chain_family"),
+        Index("ix_fee_tx_created_at", "created_at"),
+        # One referral credit per order and tier, so a retried fee job cannot pay twice
+        Index("ix_fee_tx_order_tier", "order_id", "tier", unique=True),
     )
 
+    @validates("amount_usdc")
+    def _mirror_amount_usdc(self, key: str, value: str) -> str:
+        self.amount_usdc_numeric = parse_amount(value)
+        return value
+
 
 # ===================
 # Partner Revenue Sharing
@@ -581,6 +622,189 @@ class PartnerGroup(Base):
     partner: Mapped["Partner"] = relationship(back_populates="groups")
 
 
+# ===================
+# Alerts
+# ===================
+
+class PriceAlertRecord(Base):
+    """User price alert. Loaded into the alerts service on startup."""
+
+    __tablename__ = "price_alerts"
+
+    id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    user_telegram_id: Mapped[int] = mapped_column(BigInteger)
+
+    # Market information
+    platform: Mapped[Platform] = mapped_column(SQLEnum(Platform))
+    market_id: Mapped[str] = mapped_column(String(255))
+    market_title: Mapped[str] = mapped_column(Text)
+    token_id: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+
+    # Condition
+    outcome: Mapped[str] = mapped_column(String(8))  # "yes" or "no"
+    condition: Mapped[str] = mapped_column(String(8))  # "above" or "below"
+    target_price: Mapped[Decimal] = mapped_column(Numeric(18, 8))
+
+    # Trigger state
+    triggered: Mapped[bool] = mapped_column(Boolean, default=False)
+    triggered_price: Mapped[Optional[Decimal]] = mapped_column(Numeric(18, 8), nullable=True)
+    triggered_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now()
+    )
+
+    __table_args__ = (
+        Index("ix_price_alerts_platform_market_triggered", "platform", "market_id", "triggered"),
+        Index("ix_price_alerts_user", "user_telegram_id"),
+    )
+
+
+class ArbitrageSubscriber(Base):
+    """User subscribed to arbitrage opportunity alerts."""
+
+    __tablename__ = "arbitrage_subscribers"
+
+    telegram_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now()
+    )
+
+
+class MarketMatch(Base):
+    """Confirmed equivalent markets on two platforms (arbitrage matching cache)."""
+
+    __tablename__ = "market_matches"
+
+    # Sides stored in canonical order: (platform_a, market_id_a) < (platform_b, market_id_b)
+    platform_a: Mapped[str] = mapped_column(String(20), primary_key=True)  # Platform value
+    market_id_a: Mapped[str] = mapped_column(String(255), primary_key=True)
+    platform_b: Mapped[str] = mapped_column(String(20), primary_key=True)
+    market_id_b: Mapped[str] = mapped_column(String(255), primary_key=True)
+
+    similarity: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    source: Mapped[str] = mapped_column(String(16))  # "dome" (older rows may be "title", which is ignored)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now()
+    )
+
+
+# ===================
+# Broadcasts
+# ===================
+
+class Broadcast(Base):
+    """Admin broadcast job. Progress is checkpointed so a restart resumes it."""
+
+    __tablename__ = "broadcasts"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    admin_telegram_id: Mapped[int] = mapped_column(BigInteger)
+    status_message_id: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)  # Admin's progress message
+
+    # Content
+    text: Mapped[str] = mapped_column(Text, default="")
+    photo_file_id: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+
+    # Progress (recipients are processed in telegram_id order)
+    status: Mapped[str] = mapped_column(String(16), default="running")  # running/completed/failed
+    total: Mapped[int] = mapped_column(Integer, default=0)
+    last_telegram_id: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
+    sent: Mapped[int] = mapped_column(Integer, default=0)
+    failed: Mapped[int] = mapped_column(Integer, default=0)
+    blocked: Mapped[int] = mapped_column(Integer, default=0)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now()
+    )
+    completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_broadcasts_status", "status"),
+    )
+
+
+# ===================
+# Post-Trade Jobs
+# ===================
+
+class PostTradeJob(Base):
+    """
+    Outbox row for work that follows a confirmed trade (referral fees,
+    partner volume, postbacks). Rows are deleted once the job succeeds.
+    """
+
+    __tablename__ = "post_trade_jobs"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    kind: Mapped[str] = mapped_column(String(32))  # referral_fees / partner_volume / trade_postback
+    payload: Mapped[str] = mapped_column(Text, default="{}")  # JSON
+
+    # pending: waiting for run_after; running: claimed until run_after (lease); failed: gave up
+    status: Mapped[str] = mapped_column(String(16), default="pending")
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    run_after: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now()
+    )
+
+    __table_args__ = (
+        Index("ix_post_trade_jobs_status_run_after", "status", "run_after"),
+    )
+
+
+# ===================
+# Daily Rollups
+# ===================
+
+class DailyTradeRollup(Base):
+    """
+    Confirmed order volume per UTC day, platform and user.
+    Written by the rollup compactor for closed days (src/services/rollups.py).
+    """
+
+    __tablename__ = "daily_trade_rollups"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    platform: Mapped[Platform] = mapped_column(SQLEnum(Platform), primary_key=True)
+    user_id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    partner_id: Mapped[Optional[str]] = mapped_column(String(36), nullable=True)  # User's partner when rolled up
+
+    volume_usdc: Mapped[Decimal] = mapped_column(Numeric, default=0)
+    trade_count: Mapped[int] = mapped_column(Integer, default=0)
+
+    __table_args__ = (
+        Index("ix_daily_trade_rollups_user", "user_id"),
+        Index("ix_daily_trade_rollups_partner_day", "partner_id", "day"),
+    )
+
+
+class DailyFeeRollup(Base):
+    """Fee transaction totals per UTC day, user, chain family and transaction type."""
+
+    __tablename__ = "daily_fee_rollups"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    user_id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    chain_family: Mapped[ChainFamily] = mapped_column(SQLEnum(ChainFamily), primary_key=True)
+    tx_type: Mapped[str] = mapped_column(String(32), primary_key=True)
+
+    amount_usdc: Mapped[Decimal] = mapped_column(Numeric, default=0)
+    tx_count: Mapped[int] = mapped_column(Integer, default=0)
+
+    __table_args__ = (
+        Index("ix_daily_fee_rollups_type_day", "tx_type", "day"),
+    )
+
+
 # ===================
 # System Configuration
 # ===================
@@ -13,7 +13,6 @@ from typing import Optional
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, CallbackQuery, WebAppInfo
 from telegram.ext import ContextTypes
 from telegram.constants import ParseMode
-from telegram.error import Forbidden
 
 from src.config import settings
 from src.db.database import (
@@ -22,7 +21,8 @@ from src.db.database import (
     update_user_platform,
     update_user_country,
     get_user_positions,
-    get_user_orders,
+    get_user_positions_page,
+    get_user_orders_page,
     get_or_create_referral_code,
     get_user_by_referral_code,
     set_user_referrer,
@@ -35,7 +35,7 @@ from src.db.database import (
     update_position,
     create_order,
     update_order,
-    get_orders_for_pnl,
+    get_realized_pnl,
     get_positions_for_pnl,
     # Partner functions
     create_partner,
@@ -49,7 +49,7 @@ from src.db.database import (
     update_partner_group,
     attribute_user_to_partner,
     set_user_proof_verified,
-    get_all_user_telegram_ids,
+    create_broadcast,
 )
 from src.utils.geo_blocking import (
     is_country_blocked,
@@ -68,7 +68,8 @@ from src.platforms import (
     PLATFORM_INFO,
 )
 from src.services.wallet import wallet_service, WalletInfo
-from src.services.fee import format_usdc, can_withdraw, MIN_WITHDRAWAL_USDC, process_trade_fee, calculate_fee
+from src.services.fee import format_usdc, can_withdraw, MIN_WITHDRAWAL_USDC, calculate_fee
+from src.services.post_trade import get_post_trade_pipeline
 from src.services.pnl_card import generate_pnl_card
 from src.utils.logging import get_logger
 
@@ -259,38 +260,50 @@ def format_expiration(close_time, show_time: bool = True) -> str:
 async def enrich_orderbook_prices(markets: list, platform) -> None:
     """Replace mid-prices with actual orderbook ask prices for display.
 
-    Fetches best_ask for YES outcome from the orderbook for each market
-    so users see the real price they'd pay, not the misleading mid-price.
+    Fetches best_ask for YES outcome from the orderbooks (one batched
+    request for all cache misses) so users see the real price they'd pay,
+    not the misleading mid-price.
     Only affects platforms that return mid-prices (e.g. Polymarket).
     Kalshi/Jupiter already return ask prices from their API.
     """
     from src.db.models import Outcome as OutcomeEnum
+    from src.platforms.base import OrderBookRequest
     from src.services.cache import cache
 
     # Only enrich Polymarket markets (others already use ask prices)
-    if not markets or not hasattr(platform, 'get_orderbook'):
+    if not markets or not hasattr(platform, 'get_orderbooks'):
         return
     platform_name = getattr(getattr(markets[0], 'platform', None), 'value', '')
     if platform_name != 'polymarket':
         return
 
-    async def fetch_ask(market):
+    # Serve what we can from cache, then fetch the rest in one batch
+    cached = await asyncio.gather(*[
+        cache.get_orderbook(platform_name, m.market_id, "yes") for m in markets
+    ])
+    misses = [m for m, ob in zip(markets, cached) if ob is None]
+    fetched = {}
+    if misses:
         try:
-            # Try cache first
-            ob = await cache.get_orderbook(platform_name, market.market_id, "yes")
-            if ob is None:
-                ob = await platform.get_orderbook(market.market_id, OutcomeEnum.YES)
-                if ob:
-                    await cache.set_orderbook(platform_name, market.market_id, "yes", ob)
-            if ob and ob.best_ask:
-                market.yes_price = ob.best_ask
-            if ob and ob.best_bid:
-                # no_price = 1 - yes_bid (what you'd pay to buy NO via selling YES)
-                market.no_price = max(Decimal("0.01"), Decimal("1") - ob.best_bid)
+            books = await platform.get_orderbooks([
+                OrderBookRequest(market_id=m.market_id, outcome=OutcomeEnum.YES, token_id=m.yes_token)
+                for m in misses
+            ])
         except Exception:
-            pass  # Keep original price as fallback
+            books = []  # Keep original prices as fallback
+        fetched = {m.market_id: ob for m, ob in zip(misses, books) if ob}
+        await asyncio.gather(*[
+            cache.set_orderbook(platform_name, market_id, "yes", ob)
+            for market_id, ob in fetched.items()
+        ])
 
-    await asyncio.gather(*[fetch_ask(m) for m in markets])
+    for market, ob in zip(markets, cached):
+        ob = ob or fetched.get(market.market_id)
+        if ob and ob.best_ask:
+            market.yes_price = ob.best_ask
+        if ob and ob.best_bid:
+            # no_price = 1 - yes_bid (what you'd pay to buy NO via selling YES)
+            market.no_price = max(Decimal("0.01"), Decimal("1") - ob.best_bid)
 
 
 def _prefetch_market_details(markets: list, platform_value: str, platform) -> None:
@@ -1523,29 +1536,13 @@ async def positions_command(update: Update, context: ContextTypes.DEFAULT_TYPE)
         await update.message.reply_text("Please /start first!")
         return
 
-    await show_positions(update.message, update.effective_user.id, page=0, is_callback=False)
+    await show_positions(update.message, update.effective_user.id, is_callback=False)
 
 
-async def show_positions(target, telegram_id: int, page: int = 0, is_callback: bool = False) -> None:
-    """Show user positions with pagination."""
-    POSITIONS_PER_PAGE = 5
-
-    user = await get_user_by_telegram_id(telegram_id)
-    if not user:
-        return
-
-    all_positions = await get_user_positions(
-        user_id=user.id,
-        platform=user.active_platform,
-        status=PositionStatus.OPEN,
-    )
-
-    platform_info = PLATFORM_INFO[user.active_platform]
-    platform = get_platform(user.active_platform)
-
-    # Filter out expired/resolved positions and auto-close them
+async def _settle_resolved_positions(positions: list, user, telegram_id: int, platform) -> list:
+    """Auto-close lost and auto-redeem won positions on resolved markets; return those still open."""
     active_positions = []
-    for pos in all_positions:
+    for pos in positions:
         try:
             # First check if we can find the market at all
             # Use include_closed=True to find recently closed markets (not yet resolved)
@@ -1667,9 +1664,52 @@ async def show_positions(target, telegram_id: int, page: int = 0, is_callback: b
             logger.warning(f"Could not verify position {pos.id} (keeping it visible): {e}")
             active_positions.append(pos)
 
-    all_positions = active_positions
+    return active_positions
+
+
+async def show_positions(
+    target,
+    telegram_id: int,
+    after: Optional[str] = None,
+    before: Optional[str] = None,
+    is_callback: bool = False,
+) -> None:
+    """Show user positions one keyset page at a time."""
+    POSITIONS_PER_PAGE = 5
+
+    user = await get_user_by_telegram_id(telegram_id)
+    if not user:
+        return
+
+    platform_info = PLATFORM_INFO[user.active_platform]
+    platform = get_platform(user.active_platform)
+
+    async def fetch(after: Optional[str] = None, before: Optional[str] = None):
+        return await get_user_positions_page(
+            user_id=user.id,
+            platform=user.active_platform,
+            status=PositionStatus.OPEN,
+            limit=POSITIONS_PER_PAGE,
+            after=after,
+            before=before,
+        )
 
-    if not all_positions:
+    try:
+        page = await fetch(after=after, before=before)
+    except ValueError:
+        page = await fetch()
+
+    # Only this page's positions are checked for resolution; if all of them
+    # were just settled, move on to older ones
+    positions = await _settle_resolved_positions(page.items, user, telegram_id, platform)
+    while not positions and page.next_cursor:
+        page = await fetch(after=page.next_cursor)
+        positions = await _settle_resolved_positions(page.items, user, telegram_id, platform)
+    if not positions and page.prev_cursor:
+        page = await fetch()
+        positions = await _settle_resolved_positions(page.items, user, telegram_id, platform)
+
+    if not positions:
         text = (
             f"📊 <b>No Open Positions</b>\n\n"
             f"You don't have any open positions on {platform_info['name']}.\n\n"
@@ -1681,19 +1721,7 @@ async def show_positions(target, telegram_id: int, page: int = 0, is_callback: b
             await target.reply_text(text, parse_mode=ParseMode.HTML)
         return
 
-    # Calculate pagination
-    total_positions = len(all_positions)
-    total_pages = (total_positions + POSITIONS_PER_PAGE - 1) // POSITIONS_PER_PAGE
-    page = max(0, min(page, total_pages - 1))
-    start_idx = page * POSITIONS_PER_PAGE
-    end_idx = start_idx + POSITIONS_PER_PAGE
-    positions = all_positions[start_idx:end_idx]
-
-    # Build header with page info
-    if total_pages > 1:
-        text = f"📊 <b>Your {platform_info['name']} Positions</b> (Page {page + 1}/{total_pages})\n\n"
-    else:
-        text = f"📊 <b>Your {platform_info['name']} Positions</b>\n\n"
+    text = f"📊 <b>Your {platform_info['name']} Positions</b>\n\n"
 
     # Helper to check if outcome name is custom (not just Yes/No)
     def get_display_outcome(outcome_str: str, market) -> str:
@@ -1714,7 +1742,7 @@ async def show_positions(target, telegram_id: int, page: int = 0, is_callback: b
 
         return outcome_str
 
-    for i, pos in enumerate(positions, start=start_idx + 1):
+    for i, pos in enumerate(positions, start=1):
         title = escape_html(pos.market_title[:40] + "..." if len(pos.market_title) > 40 else pos.market_title)
         outcome_str = pos.outcome.upper() if isinstance(pos.outcome, str) else pos.outcome.value.upper()
         entry = format_price(pos.entry_price)
@@ -1891,14 +1919,13 @@ async def show_positions(target, telegram_id: int, page: int = 0, is_callback: b
                 )
             ])
 
-    # Add pagination buttons
-    if total_pages > 1:
-        nav_buttons = []
-        if page > 0:
-            nav_buttons.append(InlineKeyboardButton("« Prev", callback_data=f"positions:{page - 1}"))
-        nav_buttons.append(InlineKeyboardButton(f"{page + 1}/{total_pages}", callback_data="noop"))
-        if page < total_pages - 1:
-            nav_buttons.append(InlineKeyboardButton("Next »", callback_data=f"positions:{page + 1}"))
+    # Add pagination buttons (cursors fit Telegram's 64-byte callback data)
+    nav_buttons = []
+    if page.prev_cursor:
+        nav_buttons.append(InlineKeyboardButton("« Prev", callback_data=f"positions:p:{page.prev_cursor}"))
+    if page.next_cursor:
+        nav_buttons.append(InlineKeyboardButton("Next »", callback_data=f"positions:n:{page.next_cursor}"))
+    if nav_buttons:
         buttons.append(nav_buttons)
 
     if is_callback:
@@ -1923,27 +1950,38 @@ async def orders_command(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         await update.message.reply_text("Please /start first!")
         return
 
-    await show_orders(update.message, update.effective_user.id, page=0, is_callback=False)
+    await show_orders(update.message, update.effective_user.id, is_callback=False)
 
 
-async def show_orders(target, telegram_id: int, page: int = 0, is_callback: bool = False) -> None:
-    """Show user orders with pagination."""
+async def show_orders(
+    target,
+    telegram_id: int,
+    after: Optional[str] = None,
+    before: Optional[str] = None,
+    is_callback: bool = False,
+) -> None:
+    """Show user orders one keyset page at a time."""
     ORDERS_PER_PAGE = 5
 
     user = await get_user_by_telegram_id(telegram_id)
     if not user:
         return
 
-    # Fetch up to 100 orders for pagination
-    all_orders = await get_user_orders(
-        user_id=user.id,
-        platform=user.active_platform,
-        limit=100,
-    )
+    try:
+        page = await get_user_orders_page(
+            user_id=user.id,
+            platform=user.active_platform,
+            limit=ORDERS_PER_PAGE,
+            after=after,
+            before=before,
+        )
+    except ValueError:
+        page = await get_user_orders_page(user_id=user.id, platform=user.active_platform, limit=ORDERS_PER_PAGE)
+    orders = page.items
 
     platform_info = PLATFORM_INFO[user.active_platform]
 
-    if not all_orders:
+    if not orders:
         text = (
             f"📋 <b>No Order History</b>\n\n"
             f"You haven't placed any orders on {platform_info['name']} yet."
@@ -1954,17 +1992,8 @@ async def show_orders(target, telegram_id: int, page: int = 0, is_callback: bool
             await target.reply_text(text, parse_mode=ParseMode.HTML)
         return
 
-    # Calculate pagination
-    total_orders = len(all_orders)
-    total_pages = (total_orders + ORDERS_PER_PAGE - 1) // ORDERS_PER_PAGE
-    page = max(0, min(page, total_pages - 1))
-    start_idx = page * ORDERS_PER_PAGE
-    end_idx = start_idx + ORDERS_PER_PAGE
-    orders = all_orders[start_idx:end_idx]
-
-    # Build header with page info
-    if total_pages > 1:
-        text = f"📋 <b>Orders on {platform_info['name']}</b> (Page {page + 1}/{total_pages})\n\n"
+    if page.prev_cursor or page.next_cursor:
+        text = f"📋 <b>Orders on {platform_info['name']}</b>\n\n"
     else:
         text = f"📋 <b>Recent Orders on {platform_info['name']}</b>\n\n"
 
@@ -1976,7 +2005,7 @@ async def show_orders(target, telegram_id: int, page: int = 0, is_callback: bool
         "cancelled": "🚫",
     }
 
-    for i, order in enumerate(orders, start=start_idx + 1):
+    for i, order in enumerate(orders, start=1):
         side = order.side.value.upper()
         outcome = order.outcome.value.upper()
         status = status_emoji.get(order.status.value, "❓")
@@ -2004,13 +2033,12 @@ async def show_orders(target, telegram_id: int, page: int = 0, is_callback: bool
 
     # Build pagination buttons
     buttons = []
-    if total_pages > 1:
-        nav_buttons = []
-        if page > 0:
-            nav_buttons.append(InlineKeyboardButton("« Prev", callback_data=f"orders:{page - 1}"))
-        nav_buttons.append(InlineKeyboardButton(f"{page + 1}/{total_pages}", callback_data="noop"))
-        if page < total_pages - 1:
-            nav_buttons.append(InlineKeyboardButton("Next »", callback_data=f"orders:{page + 1}"))
+    nav_buttons = []
+    if page.prev_cursor:
+        nav_buttons.append(InlineKeyboardButton("« Prev", callback_data=f"orders:p:{page.prev_cursor}"))
+    if page.next_cursor:
+        nav_buttons.append(InlineKeyboardButton("Next »", callback_data=f"orders:n:{page.next_cursor}"))
+    if nav_buttons:
         buttons.append(nav_buttons)
 
     if is_callback:
@@ -2043,34 +2071,17 @@ async def pnl_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
     day_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
     month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
 
-    # Get all orders for PnL calculation
-    all_orders = await get_orders_for_pnl(user.id, platform=user.active_platform)
-    day_orders = await get_orders_for_pnl(user.id, platform=user.active_platform, since=day_start)
-    month_orders = await get_orders_for_pnl(user.id, platform=user.active_platform, since=month_start)
+    # Realized PnL from orders (sell proceeds minus buy cost), summed in SQL
+    pnl_all = await get_realized_pnl(user.id, user.active_platform)
+    pnl_day = await get_realized_pnl(user.id, user.active_platform, since=day_start)
+    pnl_month = await get_realized_pnl(user.id, user.active_platform, since=month_start)
+    realized_day = pnl_day["realized_pnl"]
+    realized_month = pnl_month["realized_pnl"]
+    realized_all = pnl_all["realized_pnl"]
 
     # Get positions for unrealized PnL
     positions = await get_positions_for_pnl(user.id, platform=user.active_platform, include_open=True, include_closed=False)
 
-    # Calculate realized PnL from orders
-    # BUY orders = cost (negative), SELL orders = proceeds (positive)
-    def calculate_realized_pnl(orders):
-        total_cost = Decimal("0")
-        total_proceeds = Decimal("0")
-        for order in orders:
-            try:
-                amount = Decimal(order.input_amount) / Decimal(10**6)
-                if order.side.value == "buy":
-                    total_cost += amount
-                else:  # sell
-                    total_proceeds += amount
-            except Exception:
-                pass
-        return total_proceeds - total_cost
-
-    realized_day = calculate_realized_pnl(day_orders)
-    realized_month = calculate_realized_pnl(month_orders)
-    realized_all = calculate_realized_pnl(all_orders)
-
     # Calculate unrealized PnL from open positions
     unrealized_pnl = Decimal("0")
     total_invested = Decimal("0")
@@ -2128,17 +2139,17 @@ async def pnl_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
     # Today's PnL
     text += f"<b>📅 Today</b>\n"
     text += f"  Realized: {format_pnl(realized_day)}\n"
-    text += f"  Trades: {len(day_orders)}\n\n"
+    text += f"  Trades: {pnl_day['trade_count']}\n\n"
 
     # This Month's PnL
     text += f"<b>📆 This Month</b>\n"
     text += f"  Realized: {format_pnl(realized_month)}\n"
-    text += f"  Trades: {len(month_orders)}\n\n"
+    text += f"  Trades: {pnl_month['trade_count']}\n\n"
 
     # All-Time PnL
     text += f"<b>📈 All-Time</b>\n"
     text += f"  Realized: {format_pnl(realized_all)}\n"
-    text += f"  Trades: {len(all_orders)}\n\n"
+    text += f"  Trades: {pnl_all['trade_count']}\n\n"
 
     # Unrealized PnL
     text += f"<b>💼 Open Positions</b>\n"
@@ -2198,25 +2209,11 @@ async def handle_pnlcard_generate(query: CallbackQuery, platform_value: str, tel
     # Show generating message
     await query.edit_message_text("⏳ Generating your PnL card...")
 
-    # Get all orders for realized PnL calculation
-    all_orders = await get_orders_for_pnl(user.id, platform=platform)
-
-    # Calculate realized PnL and total invested
-    total_cost = Decimal("0")
-    total_proceeds = Decimal("0")
-
-    for order in all_orders:
-        try:
-            amount = Decimal(order.input_amount) / Decimal(10**6)
-            if order.side.value == "buy":
-                total_cost += amount
-            else:  # sell
-                total_proceeds += amount
-        except Exception:
-            pass
-
-    realized_pnl = total_proceeds - total_cost
-    trade_count = len(all_orders)
+    # Realized PnL and total invested (buy cost) across all orders
+    pnl = await get_realized_pnl(user.id, platform)
+    realized_pnl = pnl["realized_pnl"]
+    trade_count = pnl["trade_count"]
+    total_cost = pnl["total_cost"]
 
     # Generate the PnL card image
     try:
@@ -2825,19 +2822,24 @@ async def _route_category(query, parts: list[str], telegram_id: int, context) ->
     await handle_category_view(query, parts[1], telegram_id, page=page)
 
 
+def _page_cursors(parts: list[str]) -> dict:
+    """Map "<list>:n:<cursor>" / "<list>:p:<cursor>" callback data to after/before cursors.
+
+    Anything else ("positions:0", "positions:view", ...) opens the first page.
+    """
+    if len(parts) > 2 and parts[1] == "n":
+        return {"after": parts[2]}
+    if len(parts) > 2 and parts[1] == "p":
+        return {"before": parts[2]}
+    return {}
+
+
 async def _route_positions(query, parts: list[str], telegram_id: int, context) -> None:
-    page = 0
-    if len(parts) > 1 and parts[1] not in ("view", "refresh"):
-        try:
-            page = int(parts[1])
-        except ValueError:
-            page = 0
-    await show_positions(query, telegram_id, page=page, is_callback=True)
+    await show_positions(query, telegram_id, is_callback=True, **_page_cursors(parts))
 
 
 async def _route_orders(query, parts: list[str], telegram_id: int, context) -> None:
-    page = int(parts[1]) if len(parts) > 1 else 0
-    await show_orders(query, telegram_id, page=page, is_callback=True)
+    await show_orders(query, telegram_id, is_callback=True, **_page_cursors(parts))
 
 
 async def _route_sell(query, parts: list[str], telegram_id: int, context) -> None:
@@ -8138,28 +8140,25 @@ async def handle_buy_confirm(query, platform_value: str, market_id: str, outcome
         result = await platform.execute_trade(quote, private_key)
 
         if result.success:
-            # Update order as confirmed
-            await update_order(
-                order.id,
-                status=OrderStatus.CONFIRMED,
-                tx_hash=result.tx_hash,
-                executed_at=datetime.now(timezone.utc),
-            )
-
             # Check if order was actually filled (not just placed in orderbook)
             is_orderbook_order = result.error_message and "orderbook" in result.error_message.lower()
             actual_output = result.output_amount if result.output_amount else Decimal("0")
+            is_filled = actual_output > 0 and not is_orderbook_order
 
-            # Only process fees and create position if order was filled
-            if actual_output > 0 and not is_orderbook_order:
-                # Process trading fee and distribute to referrers
-                fee_result = await process_trade_fee(
-                    trader_telegram_id=telegram_id,
-                    order_id=order.id,
-                    trade_amount_usdc=str(amount),
-                    platform=platform_enum,
-                )
+            # Confirm the order; a filled one queues referral fees, partner volume
+            # and the postback in the same transaction (run in the background)
+            fee_amount = await get_post_trade_pipeline().confirm_trade(
+                order_id=order.id,
+                tx_hash=result.tx_hash,
+                user_id=user.id,
+                telegram_id=telegram_id,
+                trade_amount_usdc=str(amount),
+                platform=platform_enum,
+                queue_jobs=is_filled,
+            )
 
+            # Only create position if order was filled
+            if is_filled:
                 # Create position record (market_title already set above)
                 try:
                     # For Limitless, the exchange fee (3%) is deducted from output tokens
@@ -8191,21 +8190,9 @@ async def handle_buy_confirm(query, platform_value: str, market_id: str, outcome
                 except Exception as pos_error:
                     logger.warning("Failed to create position record", error=str(pos_error))
 
-                fee_amount = fee_result.get("fee", "0")
                 fee_display = format_usdc(fee_amount) if Decimal(fee_amount) > 0 else ""
                 fee_line = f"\n💸 Fee: {fee_display}" if fee_display else ""
 
-                # Check for marketing qualification postback (first trade over $5)
-                try:
-                    from src.services.postback import check_and_send_trade_postback
-                    await check_and_send_trade_postback(
-                        telegram_id=telegram_id,
-                        trade_amount=amount,
-                        fee_amount=Decimal(fee_amount) if fee_amount else Decimal("0"),
-                    )
-                except Exception as pb_error:
-                    logger.debug("Postback check failed", error=str(pb_error))
-
                 text = f"""
 ✅ <b>Order Executed!</b>
 
@@ -8545,20 +8532,16 @@ async def handle_sell_confirm(query, position_id: str, percent_str: str, telegra
         result = await platform.execute_trade(quote, private_key)
 
         if result.success:
-            # Update order as confirmed
-            await update_order(
-                order.id,
-                status=OrderStatus.CONFIRMED,
-                tx_hash=result.tx_hash,
-                executed_at=datetime.now(timezone.utc),
-            )
-
-            # Process trading fee
-            fee_result = await process_trade_fee(
-                trader_telegram_id=telegram_id,
+            # Confirm the order and queue referral fees and partner volume in the
+            # same transaction (run in the background)
+            fee_amount = await get_post_trade_pipeline().confirm_trade(
                 order_id=order.id,
+                tx_hash=result.tx_hash,
+                user_id=user.id,
+                telegram_id=telegram_id,
                 trade_amount_usdc=str(quote.expected_output) if quote.expected_output else "0",
                 platform=position.platform,
+                send_postback=False,
             )
 
             # Update position - use actual balance for remaining calculation
@@ -8578,7 +8561,6 @@ async def handle_sell_confirm(query, position_id: str, percent_str: str, telegra
                     token_amount=str(remaining_raw),
                 )
 
-            fee_amount = fee_result.get("fee", "0")
             fee_display = format_usdc(fee_amount) if Decimal(fee_amount) > 0 else ""
             fee_line = f"\n💸 Fee: {fee_display}" if fee_display else ""
 
@@ -9353,28 +9335,25 @@ async def handle_buy_with_pin(update: Update, context: ContextTypes.DEFAULT_TYPE
         result = await platform.execute_trade(quote, private_key)
 
         if result.success:
-            # Update order as confirmed
-            await update_order(
-                order.id,
-                status=OrderStatus.CONFIRMED,
-                tx_hash=result.tx_hash,
-                executed_at=datetime.now(timezone.utc),
-            )
-
             # Check if order was actually filled (not just placed in orderbook)
             is_orderbook_order = result.error_message and "orderbook" in result.error_message.lower()
             actual_output = result.output_amount if result.output_amount else Decimal("0")
+            is_filled = actual_output > 0 and not is_orderbook_order
 
-            # Only process fees and create position if order was filled
-            if actual_output > 0 and not is_orderbook_order:
-                # Process trading fee and distribute to referrers
-                fee_result = await process_trade_fee(
-                    trader_telegram_id=update.effective_user.id,
-                    order_id=order.id,
-                    trade_amount_usdc=str(amount),
-                    platform=platform_enum,
-                )
+            # Confirm the order; a filled one queues referral fees, partner volume
+            # and the postback in the same transaction (run in the background)
+            fee_amount = await get_post_trade_pipeline().confirm_trade(
+                order_id=order.id,
+                tx_hash=result.tx_hash,
+                user_id=user.id,
+                telegram_id=update.effective_user.id,
+                trade_amount_usdc=str(amount),
+                platform=platform_enum,
+                queue_jobs=is_filled,
+            )
 
+            # Only create position if order was filled
+            if is_filled:
                 # Create position record (market_title already set above)
                 try:
                     # For Limitless, the exchange fee (3%) is deducted from output tokens
@@ -9404,21 +9383,9 @@ async def handle_buy_with_pin(update: Update, context: ContextTypes.DEFAULT_TYPE
                 except Exception as pos_error:
                     logger.warning("Failed to create position record", error=str(pos_error))
 
-                fee_amount = fee_result.get("fee", "0")
                 fee_display = format_usdc(fee_amount) if Decimal(fee_amount) > 0 else ""
                 fee_line = f"\n💸 Fee: {fee_display}" if fee_display else ""
 
-                # Check for marketing qualification postback (first trade over $5)
-                try:
-                    from src.services.postback import check_and_send_trade_postback
-                    await check_and_send_trade_postback(
-                        telegram_id=update.effective_user.id,
-                        trade_amount=amount,
-                        fee_amount=Decimal(fee_amount) if fee_amount else Decimal("0"),
-                    )
-                except Exception as pb_error:
-                    logger.debug("Postback check failed", error=str(pb_error))
-
                 text = f"""
 ✅ <b>Order Executed!</b>
 
@@ -9603,20 +9570,16 @@ async def handle_sell_with_pin(update: Update, context: ContextTypes.DEFAULT_TYP
         result = await platform.execute_trade(quote, private_key)
 
         if result.success:
-            # Update order as confirmed
-            await update_order(
-                order.id,
-                status=OrderStatus.CONFIRMED,
-                tx_hash=result.tx_hash,
-                executed_at=datetime.now(timezone.utc),
-            )
-
-            # Process trading fee
-            fee_result = await process_trade_fee(
-                trader_telegram_id=update.effective_user.id,
+            # Confirm the order and queue referral fees and partner volume in the
+            # same transaction (run in the background)
+            fee_amount = await get_post_trade_pipeline().confirm_trade(
                 order_id=order.id,
+                tx_hash=result.tx_hash,
+                user_id=user.id,
+                telegram_id=update.effective_user.id,
                 trade_amount_usdc=str(quote.expected_output) if quote.expected_output else "0",
                 platform=position.platform,
+                send_postback=False,
             )
 
             # Update position - use actual balance for remaining calculation
@@ -9636,7 +9599,6 @@ async def handle_sell_with_pin(update: Update, context: ContextTypes.DEFAULT_TYP
                     token_amount=str(remaining_raw),
                 )
 
-            fee_amount = fee_result.get("fee", "0")
             fee_display = format_usdc(fee_amount) if Decimal(fee_amount) > 0 else ""
             fee_line = f"\n💸 Fee: {fee_display}" if fee_display else ""
 
@@ -12111,6 +12073,7 @@ async def setalert_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -
             outcome=outcome,
             condition=condition,
             target_price=target_price,
+            token_id=market.yes_token if outcome == "yes" else market.no_token,
         )
 
         price_cents = int(target_price * 100)
@@ -12515,16 +12478,15 @@ async def handle_arb_amount(
                 entry_price=str(quote.price),
             )
 
-            # Check for marketing qualification postback (first trade over $5)
+            # Queue marketing qualification postback (first trade over $5)
             try:
-                from src.services.postback import check_and_send_trade_postback
-                await check_and_send_trade_postback(
-                    telegram_id=telegram_id,
-                    trade_amount=amount,
-                    fee_amount=Decimal("0"),  # No fee tracking for arb trades yet
-                )
+                await get_post_trade_pipeline().enqueue([("trade_postback", {
+                    "telegram_id": telegram_id,
+                    "trade_amount_usdc": str(amount),
+                    "fee_usdc": "0",  # No fee tracking for arb trades yet
+                })])
             except Exception as pb_error:
-                logger.debug("Postback check failed", error=str(pb_error))
+                logger.debug("Postback enqueue failed", error=str(pb_error))
 
             # Show success
             output_amount = result.output_amount or quote.expected_output
@@ -12667,41 +12629,22 @@ async def handle_broadcast_message(update: Update, context: ContextTypes.DEFAULT
 
     context.user_data.pop("awaiting_broadcast", None)
 
-    user_ids = await get_all_user_telegram_ids()
-    total = len(user_ids)
-
-    await update.message.reply_text(f"📢 Broadcasting to {total} users...")
+    from src.services.broadcast import get_broadcast_engine
 
-    has_photo = update.message.photo
-    success = 0
-    failed = 0
-
-    for uid in user_ids:
-        try:
-            if has_photo:
-                photo_file_id = update.message.photo[-1].file_id
-                await context.bot.send_photo(
-                    chat_id=uid,
-                    photo=photo_file_id,
-                    caption=update.message.caption or "",
-                    parse_mode=ParseMode.HTML,
-                )
-            else:
-                await context.bot.send_message(
-                    chat_id=uid,
-                    text=update.message.text or "",
-                    parse_mode=ParseMode.HTML,
-                )
-            success += 1
-        except Forbidden:
-            failed += 1
-        except Exception as e:
-            logger.warning("Broadcast send failed", user_id=uid, error=str(e))
-            failed += 1
-        await asyncio.sleep(0.05)
-
-    await update.message.reply_text(
-        f"✅ Broadcast complete!\n\n"
-        f"Sent: {success}\n"
-        f"Failed: {failed} (blocked/deleted)",
+    if update.message.photo:
+        photo_file_id = update.message.photo[-1].file_id
+        content = update.message.caption or ""
+    else:
+        photo_file_id = None
+        content = update.message.text or ""
+
+    # Sent in the background; the status message is edited with progress
+    status_msg = await update.message.reply_text("📢 Starting broadcast...")
+    broadcast = await create_broadcast(
+        admin_telegram_id=update.effective_user.id,
+        text=content,
+        photo_file_id=photo_file_id,
+        status_message_id=status_msg.message_id,
     )
+    await status_msg.edit_text(f"📢 Broadcasting to {broadcast.total} users...")
+    get_broadcast_engine().start(context.bot, broadcast.id)
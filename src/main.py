@@ -101,6 +101,27 @@ async def post_shutdown(application: Application) -> None:
     except Exception as e:
         logger.warning("Alerts service shutdown error", error=str(e))
 
+    # Send what is still queued (alerts are already marked triggered), then stop
+    try:
+        from src.services.notifications import get_notification_dispatcher
+        await get_notification_dispatcher().stop()
+    except Exception as e:
+        logger.warning("Notification dispatcher shutdown error", error=str(e))
+
+    # Stop post-trade workers (pending jobs stay in the outbox)
+    try:
+        from src.services.post_trade import get_post_trade_pipeline
+        await get_post_trade_pipeline().stop()
+    except Exception as e:
+        logger.warning("Post-trade pipeline shutdown error", error=str(e))
+
+    # Stop rollup compactor
+    try:
+        from src.services.rollups import get_rollup_compactor
+        await get_rollup_compactor().stop()
+    except Exception as e:
+        logger.warning("Rollup compactor shutdown error", error=str(e))
+
     # Stop ACP service if running
     if settings.acp_enabled:
         try:
@@ -356,6 +377,27 @@ async def run_bot() -> None:
 
     app = create_application()
 
+    # Start notification dispatcher (alerts, arbitrage, position updates)
+    from src.services.notifications import get_notification_dispatcher
+    notification_dispatcher = get_notification_dispatcher()
+    notification_dispatcher.set_bot(app.bot)
+    await notification_dispatcher.start()
+
+    # Start post-trade jobs (fees, partner volume, postbacks)
+    from src.services.post_trade import get_post_trade_pipeline
+    await get_post_trade_pipeline().start()
+
+    # Keep analytics rollups up to date
+    from src.services.rollups import get_rollup_compactor
+    await get_rollup_compactor().start()
+
+    # Resume admin broadcasts interrupted by a restart
+    try:
+        from src.services.broadcast import get_broadcast_engine
+        await get_broadcast_engine().resume(app.bot)
+    except Exception as e:
+        logger.warning("Failed to resume broadcasts", error=str(e))
+
     # Initialize alerts service and set bot reference
     logger.info("Initializing alerts service...")
     try:
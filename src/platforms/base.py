@@ -3,6 +3,7 @@ Platform abstraction layer for prediction markets.
 All platforms implement this interface.
 """
 
+import asyncio
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from decimal import Decimal
@@ -10,6 +11,9 @@ from enum import Enum
 from typing import Any, Optional
 
 from src.db.models import Chain, Outcome, Platform
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
 
 
 class OrderSide(str, Enum):
@@ -188,6 +192,19 @@ class OrderBook:
         return None
 
 
+@dataclass
+class OrderBookRequest:
+    """A single orderbook to fetch as part of a batch.
+
+    token_id and slug are optional hints; platforms that can use them skip
+    the market lookup they would otherwise need to resolve the book.
+    """
+    market_id: str
+    outcome: Outcome
+    token_id: Optional[str] = None
+    slug: Optional[str] = None
+
+
 class PlatformError(Exception):
     """Base exception for platform errors."""
     def __init__(self, message: str, platform: Platform, code: Optional[str] = None):
@@ -232,6 +249,9 @@ class BasePlatform(ABC):
     # Collateral token
     collateral_symbol: str
     collateral_decimals: int
+
+    # Max in-flight requests for the default get_orderbooks implementation
+    orderbook_batch_concurrency: int = 8
     
     @abstractmethod
     async def initialize(self) -> None:
@@ -303,9 +323,59 @@ class BasePlatform(ABC):
         self,
         market_id: str,
         outcome: Outcome,
+        token_id: Optional[str] = None,
+        slug: Optional[str] = None,
     ) -> OrderBook:
-        """Get order book for a market outcome."""
+        """Get order book for a market outcome.
+
+        Args:
+            market_id: Market identifier
+            outcome: YES or NO
+            token_id: Optional outcome token, lets platforms skip a market lookup
+            slug: Optional slug for platforms that address books by slug
+        """
         pass
+
+    async def get_orderbooks(
+        self,
+        requests: list[OrderBookRequest],
+    ) -> list[Optional[OrderBook]]:
+        """Get many order books at once.
+
+        Platforms with a batch endpoint override this. The default fetches
+        each book via get_orderbook with at most orderbook_batch_concurrency
+        requests in flight, and fetches duplicate requests only once.
+
+        Args:
+            requests: Books to fetch
+
+        Returns:
+            Order books aligned with requests; None where a fetch failed
+        """
+        semaphore = asyncio.Semaphore(self.orderbook_batch_concurrency)
+        unique: dict[tuple[str, Outcome], OrderBookRequest] = {}
+        for req in requests:
+            unique.setdefault((req.market_id, req.outcome), req)
+
+        async def fetch(req: OrderBookRequest) -> Optional[OrderBook]:
+            async with semaphore:
+                try:
+                    return await self.get_orderbook(
+                        req.market_id, req.outcome, token_id=req.token_id, slug=req.slug,
+                    )
+                except Exception as e:
+                    logger.debug(
+                        "Batched orderbook fetch failed",
+                        platform=self.platform.value,
+                        market_id=req.market_id[:20],
+                        error=str(e),
+                    )
+                    return None
+
+        keys = list(unique.keys())
+        books = await asyncio.gather(*[fetch(unique[k]) for k in keys])
+        by_key = dict(zip(keys, books))
+        return [by_key[(req.market_id, req.outcome)] for req in requests]
     
     # ===================
     # Trading
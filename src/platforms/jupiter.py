@@ -487,6 +487,7 @@ class JupiterPlatform(BasePlatform):
         self,
         market_id: str,
         outcome: Outcome,
+        token_id: str = None,  # Accepted for API compatibility, not used
         slug: str = None,
     ) -> OrderBook:
         """Get order book for a market."""
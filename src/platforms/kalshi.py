@@ -900,6 +900,7 @@ class KalshiPlatform(BasePlatform):
         self,
         market_id: str,
         outcome: Outcome,
+        token_id: str = None,  # Accepted for API compatibility, not used
         slug: str = None,  # Accepted for API compatibility, not used
     ) -> OrderBook:
         """Get order book for a market."""
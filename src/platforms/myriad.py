@@ -835,13 +835,14 @@ class MyriadPlatform(BasePlatform):
         self,
         market_id: str,
         outcome: Outcome,
+        token_id: Optional[str] = None,  # Ignored - for API compatibility
         slug: Optional[str] = None,  # Ignored - for API compatibility
     ) -> OrderBook:
         """
         Get order book for a market outcome.
 
         Note: Myriad uses AMM, so we derive orderbook from current prices.
-        The slug parameter is ignored (used by other platforms like Limitless).
+        The token_id and slug parameters are ignored (used by other platforms like Limitless).
         """
         market = await self.get_market(market_id)
         if not market:
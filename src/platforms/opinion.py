@@ -23,6 +23,7 @@ from src.platforms.base import (
     Quote,
     TradeResult,
     OrderBook,
+    OrderBookRequest,
     PlatformError,
     MarketNotFoundError,
     RateLimitError,
@@ -595,28 +596,11 @@ class OpinionPlatform(BasePlatform):
     # Orderbook Price Enrichment
     # ===================
 
-    async def _fetch_orderbook_price(self, market: Market) -> tuple[str, Decimal | None, Decimal | None]:
-        """Fetch best bid/ask prices for a single market from orderbook."""
-        try:
-            if not market.yes_token:
-                return (market.market_id, None, None)
-
-            # Fetch YES orderbook
-            yes_orderbook = await self.get_orderbook(market.market_id, Outcome.YES)
-            yes_price = yes_orderbook.best_ask  # Price to buy YES
-
-            # Calculate NO price as 1 - YES price (for binary markets)
-            no_price = Decimal("1") - yes_price if yes_price else None
-
-            return (market.market_id, yes_price, no_price)
-        except Exception as e:
-            logger.debug("Failed to fetch orderbook price", market_id=market.market_id, error=str(e))
-            return (market.market_id, None, None)
-
     async def _enrich_markets_with_orderbook_prices(self, markets: list[Market], max_markets: int = 30) -> list[Market]:
         """
         Enrich markets with real orderbook prices.
-        Fetches orderbooks in parallel for efficiency.
+        Fetches YES orderbooks as one batch, addressed by token so no
+        per-market lookup is needed.
 
         Args:
             markets: List of markets to enrich
@@ -627,19 +611,20 @@ class OpinionPlatform(BasePlatform):
             return markets
 
         # Only fetch orderbooks for the first N markets to limit API calls
-        markets_to_enrich = markets[:max_markets]
+        markets_to_enrich = [m for m in markets[:max_markets] if m.yes_token]
 
-        # Fetch orderbook prices in parallel
-        tasks = [self._fetch_orderbook_price(m) for m in markets_to_enrich]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        orderbooks = await self.get_orderbooks([
+            OrderBookRequest(market_id=m.market_id, outcome=Outcome.YES, token_id=m.yes_token)
+            for m in markets_to_enrich
+        ])
 
         # Build a map of market_id -> (yes_price, no_price)
         price_map: dict[str, tuple[Decimal | None, Decimal | None]] = {}
-        for result in results:
-            if isinstance(result, tuple) and len(result) == 3:
-                market_id, yes_price, no_price = result
-                if yes_price is not None:
-                    price_map[market_id] = (yes_price, no_price)
+        for market, orderbook in zip(markets_to_enrich, orderbooks):
+            yes_price = orderbook.best_ask if orderbook else None  # Price to buy YES
+            if yes_price is not None:
+                # Calculate NO price as 1 - YES price (for binary markets)
+                price_map[market.market_id] = (yes_price, Decimal("1") - yes_price)
 
         # Update market prices
         enriched_count = 0
@@ -1038,18 +1023,28 @@ class OpinionPlatform(BasePlatform):
         self,
         market_id: str,
         outcome: Outcome,
+        token_id: str = None,
         slug: str = None,  # Accepted for API compatibility, not used
     ) -> OrderBook:
-        """Get order book from Opinion SDK or API."""
-        # Use _get_market_raw to avoid infinite recursion:
-        # get_orderbook -> get_market -> enrich -> _fetch_orderbook_price -> get_orderbook
-        market = await self._get_market_raw(market_id)
-        if not market:
-            raise MarketNotFoundError(f"Market {market_id} not found", Platform.OPINION)
+        """Get order book from Opinion SDK or API.
 
-        token_id = market.yes_token if outcome == Outcome.YES else market.no_token
+        Args:
+            market_id: The market identifier
+            outcome: YES or NO
+            token_id: Optional outcome token ID; skips the market lookup when given
+            slug: Ignored (for API compatibility with other platforms)
+        """
+        market = None
         if not token_id:
-            raise PlatformError(f"Token not found for {outcome.value}", Platform.OPINION)
+            # Use _get_market_raw to avoid infinite recursion:
+            # get_orderbook -> get_market -> enrich -> get_orderbooks -> get_orderbook
+            market = await self._get_market_raw(market_id)
+            if not market:
+                raise MarketNotFoundError(f"Market {market_id} not found", Platform.OPINION)
+
+            token_id = market.yes_token if outcome == Outcome.YES else market.no_token
+            if not token_id:
+                raise PlatformError(f"Token not found for {outcome.value}", Platform.OPINION)
 
         try:
             bids = []
@@ -1151,7 +1146,9 @@ class OpinionPlatform(BasePlatform):
         except Exception as e:
             logger.warning("Failed to get Opinion orderbook, using market prices", error=str(e), market_id=market_id)
             # Return empty orderbook with market prices
-            fallback_price = market.yes_price if outcome == Outcome.YES else market.no_price
+            fallback_price = None
+            if market:
+                fallback_price = market.yes_price if outcome == Outcome.YES else market.no_price
             return OrderBook(
                 market_id=market_id,
                 outcome=outcome,
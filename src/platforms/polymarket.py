@@ -23,6 +23,7 @@ from src.platforms.base import (
     Quote,
     TradeResult,
     OrderBook,
+    OrderBookRequest,
     PlatformError,
     MarketNotFoundError,
     RateLimitError,
@@ -204,6 +205,11 @@ class PolymarketPlatform(BasePlatform):
         self.CACHE_TTL = 120  # 2 minutes (shorter for rapid 5-min markets)
         # Market detail cache: conditionId -> Market (for rapid market lookups)
         self._market_detail_cache: dict[str, Market] = {}
+        # Token catalog: conditionId -> (yes_token, no_token), filled as markets are parsed
+        # so orderbook fetches can resolve tokens without a get_market round trip
+        self._token_catalog: dict[str, tuple[Optional[str], Optional[str]]] = {}
+        self.TOKEN_CATALOG_MAX = 20000
+        self.BOOKS_BATCH_SIZE = 100  # Tokens per POST /books request
 
     async def initialize(self) -> None:
         """Initialize Polymarket API clients."""
@@ -829,6 +835,7 @@ class PolymarketPlatform(BasePlatform):
 
         # Get condition ID (market identifier)
         market_id = m.get("conditionId") or data.get("conditionId") or str(m.get("id") or data.get("id"))
+        self._remember_tokens(market_id, yes_token, no_token)
 
         # Volume - try multiple fields
         volume = m.get("volume") or m.get("volumeNum") or data.get("volume") or data.get("volume24hr") or 0
@@ -1538,34 +1545,40 @@ class PolymarketPlatform(BasePlatform):
     # ===================
     # Order Book
     # ===================
-    
-    async def get_orderbook(
-        self,
-        market_id: str,
-        outcome: Outcome,
-        token_id: str = None,
-        slug: str = None,  # Accepted for API compatibility, not used
-    ) -> OrderBook:
-        """Get order book from CLOB API.
-
-        Args:
-            market_id: The market identifier
-            outcome: YES or NO
-            token_id: Optional token ID to use (for sells with stored position token)
-            slug: Ignored (for API compatibility with other platforms)
-        """
-        # Use provided token_id if given, otherwise get from market
-        if not token_id:
-            market = await self.get_market(market_id)
-            if not market:
-                raise MarketNotFoundError(f"Market {market_id} not found", Platform.POLYMARKET)
 
-            token_id = market.yes_token if outcome == Outcome.YES else market.no_token
-            if not token_id:
-                raise PlatformError(f"Token not found for {outcome.value}", Platform.POLYMARKET)
+    def _remember_tokens(self, market_id: str, yes_token: Optional[str], no_token: Optional[str]) -> None:
+        """Record a market's outcome tokens in the token catalog."""
+        if not market_id or not (yes_token or no_token):
+            return
+        if market_id not in self._token_catalog and len(self._token_catalog) >= self.TOKEN_CATALOG_MAX:
+            # Evict the oldest entry (dicts keep insertion order)
+            self._token_catalog.pop(next(iter(self._token_catalog)))
+        self._token_catalog[market_id] = (yes_token, no_token)
+
+    def _catalog_token_id(self, market_id: str, outcome: Outcome) -> Optional[str]:
+        """Resolve an outcome token from already-seen market data, without any request."""
+        tokens = self._token_catalog.get(market_id)
+        if tokens is None:
+            return None
+        return tokens[0] if outcome == Outcome.YES else tokens[1]
+
+    async def _resolve_token_id(self, market_id: str, outcome: Outcome) -> str:
+        """Resolve an outcome token, falling back to a market lookup on catalog miss."""
+        token_id = self._catalog_token_id(market_id, outcome)
+        if token_id:
+            return token_id
+
+        market = await self.get_market(market_id)
+        if not market:
+            raise MarketNotFoundError(f"Market {market_id} not found", Platform.POLYMARKET)
 
-        data = await self._clob_request("GET", f"/book?token_id={token_id}")
+        token_id = market.yes_token if outcome == Outcome.YES else market.no_token
+        if not token_id:
+            raise PlatformError(f"Token not found for {outcome.value}", Platform.POLYMARKET)
+        return token_id
 
+    def _parse_clob_book(self, data: dict, market_id: str, outcome: Outcome) -> OrderBook:
+        """Parse a CLOB book payload into an OrderBook."""
         bids = []
         asks = []
 
@@ -1592,7 +1605,77 @@ class PolymarketPlatform(BasePlatform):
             bids=bids,
             asks=asks,
         )
-    
+
+    async def get_orderbook(
+        self,
+        market_id: str,
+        outcome: Outcome,
+        token_id: str = None,
+        slug: str = None,  # Accepted for API compatibility, not used
+    ) -> OrderBook:
+        """Get order book from CLOB API.
+
+        Args:
+            market_id: The market identifier
+            outcome: YES or NO
+            token_id: Optional token ID to use (for sells with stored position token)
+            slug: Ignored (for API compatibility with other platforms)
+        """
+        # Use provided token_id if given, otherwise resolve from catalog / market
+        if not token_id:
+            token_id = await self._resolve_token_id(market_id, outcome)
+
+        data = await self._clob_request("GET", f"/book?token_id={token_id}")
+        return self._parse_clob_book(data, market_id, outcome)
+
+    async def get_orderbooks(
+        self,
+        requests: list[OrderBookRequest],
+    ) -> list[Optional[OrderBook]]:
+        """Get many order books via the CLOB multi-book endpoint (POST /books).
+
+        Tokens are taken from the request or the token catalog; only misses
+        fall back to a market lookup, resolved concurrently with at most
+        orderbook_batch_concurrency lookups in flight.
+        """
+        semaphore = asyncio.Semaphore(self.orderbook_batch_concurrency)
+
+        async def resolve(market_id: str, outcome: Outcome) -> Optional[str]:
+            async with semaphore:
+                try:
+                    return await self._resolve_token_id(market_id, outcome)
+                except Exception as e:
+                    logger.debug("Orderbook token not resolved", market_id=market_id[:20], error=str(e))
+                    return None
+
+        misses = list(dict.fromkeys(
+            (req.market_id, req.outcome) for req in requests if not req.token_id
+        ))
+        resolved = dict(zip(misses, await asyncio.gather(*[resolve(*key) for key in misses])))
+        token_ids: list[Optional[str]] = [
+            req.token_id or resolved[(req.market_id, req.outcome)] for req in requests
+        ]
+
+        unique_tokens = list(dict.fromkeys(t for t in token_ids if t))
+        books_by_token: dict[str, dict] = {}
+        for i in range(0, len(unique_tokens), self.BOOKS_BATCH_SIZE):
+            chunk = unique_tokens[i:i + self.BOOKS_BATCH_SIZE]
+            try:
+                data = await self._clob_request("POST", "/books", json=[{"token_id": t} for t in chunk])
+            except Exception as e:
+                logger.warning("Batch orderbook fetch failed", count=len(chunk), error=str(e))
+                continue
+            for book in data if isinstance(data, list) else []:
+                asset_id = book.get("asset_id")
+                if asset_id:
+                    books_by_token[str(asset_id)] = book
+
+        results: list[Optional[OrderBook]] = []
+        for req, token_id in zip(requests, token_ids):
+            book = books_by_token.get(token_id) if token_id else None
+            results.append(self._parse_clob_book(book, req.market_id, req.outcome) if book else None)
+        return results
+
     # ===================
     # Trading
     # ===================
@@ -4,17 +4,34 @@ Monitors market prices and sends Telegram notifications.
 """
 
 import asyncio
+import heapq
 import json
+import time
+from bisect import bisect_right, insort
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from decimal import Decimal
+from operator import itemgetter
 from typing import Any, Optional
 from uuid import uuid4
 
 from src.config import settings
-from src.db.models import Platform
+from src.db.database import (
+    add_arbitrage_subscriber,
+    create_price_alert,
+    delete_price_alert,
+    claim_triggered_price_alerts,
+    get_active_price_alerts,
+    get_arbitrage_subscribers,
+    remove_arbitrage_subscriber,
+)
+from src.db.models import Outcome, Platform
 from src.platforms import get_platform
+from src.platforms.base import OrderBookRequest
 from src.services.dome import dome_client
+from src.services.market_matching import extract_match_key, match_cache, match_catalogs
+from src.services.notifications import get_notification_dispatcher
+from src.services.websocket_manager import PriceUpdate, price_cache
 from src.utils.logging import get_logger
 
 logger = get_logger(__name__)
@@ -31,6 +48,7 @@ class PriceAlert:
     outcome: str  # "yes" or "no"
     condition: str  # "above" or "below"
     target_price: Decimal
+    token_id: Optional[str] = None  # Outcome token, used to match live price ticks
     current_price: Optional[Decimal] = None
     triggered: bool = False
     created_at: datetime = field(default_factory=datetime.utcnow)
@@ -45,6 +63,92 @@ class PriceAlert:
             return current_price <= self.target_price
 
 
+class AlertIndex:
+    """
+    Untriggered price alerts indexed by (platform, token_id) and threshold.
+
+    "above" alerts are kept sorted by ascending target and "below" alerts by
+    descending target, so a tick only has to pop the prefix of each list
+    whose thresholds it crossed: O(log n + k) for k triggered alerts.
+    """
+
+    def __init__(self):
+        # key -> [(target, alert_id)] ascending
+        self._above: dict[tuple[str, str], list[tuple[Decimal, str]]] = {}
+        # key -> [(-target, alert_id)] ascending, i.e. target descending
+        self._below: dict[tuple[str, str], list[tuple[Decimal, str]]] = {}
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _side(self, alert: PriceAlert) -> tuple[dict, tuple[Decimal, str]]:
+        if alert.condition == "above":
+            return self._above, (alert.target_price, alert.id)
+        return self._below, (-alert.target_price, alert.id)
+
+    def add(self, alert: PriceAlert) -> None:
+        """Index an alert. Alerts without a token ID cannot be matched to ticks."""
+        if not alert.token_id:
+            return
+        side, entry = self._side(alert)
+        insort(side.setdefault((alert.platform.value, alert.token_id), []), entry)
+        self._size += 1
+
+    def remove(self, alert: PriceAlert) -> None:
+        """Remove an alert if it is indexed."""
+        if not alert.token_id:
+            return
+        side, entry = self._side(alert)
+        key = (alert.platform.value, alert.token_id)
+        entries = side.get(key)
+        if entries and entry in entries:
+            entries.remove(entry)
+            self._size -= 1
+            if not entries:
+                del side[key]
+
+    def covers(self, platform: str, token_id: str) -> bool:
+        """Whether any alert is indexed for a token."""
+        key = (platform, token_id)
+        return key in self._above or key in self._below
+
+    def pop_crossed(self, platform: str, token_id: str, price: Decimal) -> list[str]:
+        """Remove and return IDs of alerts whose threshold the price crossed."""
+        key = (platform, token_id)
+        crossed: list[str] = []
+        for side, bound in ((self._above, price), (self._below, -price)):
+            entries = side.get(key)
+            if not entries:
+                continue
+            i = bisect_right(entries, bound, key=itemgetter(0))
+            if i:
+                crossed.extend(alert_id for _, alert_id in entries[:i])
+                del entries[:i]
+                if not entries:
+                    del side[key]
+        self._size -= len(crossed)
+        return crossed
+
+
+def alert_price(
+    best_bid: Optional[Decimal],
+    best_ask: Optional[Decimal],
+    last: Optional[Decimal] = None,
+) -> Optional[Decimal]:
+    """
+    Price an alert is checked against, for live ticks and the REST fallback
+    alike: bid/ask midpoint, else last price or one side.
+    """
+    if best_bid is not None and best_ask is not None:
+        return (best_bid + best_ask) / 2
+    return last or best_ask or best_bid
+
+
+def _tick_price(update: PriceUpdate) -> Optional[Decimal]:
+    return alert_price(update.best_bid, update.best_ask, update.last_trade_price)
+
+
 @dataclass
 class ArbitrageOpportunity:
     """Cross-platform arbitrage opportunity."""
@@ -63,6 +167,60 @@ class ArbitrageOpportunity:
     detected_at: datetime = field(default_factory=datetime.utcnow)
 
 
+@dataclass
+class ArbitragePair:
+    """Matched market pair watched on live prices."""
+    platform_a: Platform
+    market_a: Any  # Market
+    platform_b: Platform
+    market_b: Any  # Market
+
+    @property
+    def key(self) -> tuple[str, str, str, str]:
+        return (self.platform_a.value, self.market_a.market_id, self.platform_b.value, self.market_b.market_id)
+
+    def tokens(self) -> list[tuple[str, str]]:
+        """(platform, YES token) of both legs."""
+        return [(self.platform_a.value, self.market_a.yes_token), (self.platform_b.value, self.market_b.yes_token)]
+
+
+class ArbitragePairRegistry:
+    """Matched pairs indexed by the YES token of each leg, for per-tick re-evaluation."""
+
+    def __init__(self):
+        self._pairs: dict[tuple, ArbitragePair] = {}
+        self._by_token: dict[tuple[str, str], set[tuple]] = {}
+
+    def __len__(self) -> int:
+        return len(self._pairs)
+
+    def replace(self, pairs: list[ArbitragePair]) -> tuple[list[ArbitragePair], list[ArbitragePair]]:
+        """Swap in the latest matched pairs. Returns (added, removed)."""
+        latest = {pair.key: pair for pair in pairs}
+        removed = [pair for key, pair in self._pairs.items() if key not in latest]
+        added = [pair for key, pair in latest.items() if key not in self._pairs]
+
+        for pair in removed:
+            del self._pairs[pair.key]
+            for token in pair.tokens():
+                keys = self._by_token.get(token)
+                if keys:
+                    keys.discard(pair.key)
+                    if not keys:
+                        del self._by_token[token]
+
+        for pair in added:
+            for token in pair.tokens():
+                self._by_token.setdefault(token, set()).add(pair.key)
+
+        # Retained pairs pick up refreshed market data
+        self._pairs.update(latest)
+        return added, removed
+
+    def pairs_for_token(self, platform: str, token_id: str) -> list[ArbitragePair]:
+        return [self._pairs[key] for key in self._by_token.get((platform, token_id), ())]
+
+
 class AlertsService:
     """
     Service for managing price alerts and arbitrage monitoring.
@@ -70,23 +228,32 @@ class AlertsService:
 
     def __init__(self):
         self._alerts: dict[str, PriceAlert] = {}
+        self._alert_index = AlertIndex()
+        self._tick_listener_registered = False
+        self._triggered_pending: list[PriceAlert] = []  # Awaiting batched DB write
         self._arbitrage_cache: dict[str, ArbitrageOpportunity] = {}
+        self._pair_registry = ArbitragePairRegistry()
         self._monitoring_task: Optional[asyncio.Task] = None
         self._arbitrage_task: Optional[asyncio.Task] = None
-        self._bot = None  # Set by main.py
+        self._persist_task: Optional[asyncio.Task] = None
         self._running = False
 
         # Arbitrage settings
         self.min_arbitrage_spread = Decimal("0.03")  # 3% minimum
-        self.arbitrage_check_interval = 60  # seconds
+        self.arbitrage_check_interval = 300  # seconds between full rematching passes
+        self.arbitrage_live_pairs = 200  # top matched pairs re-evaluated on every tick
+        self.arbitrage_market_limit = 5000  # markets per platform considered for matching
+        self.arbitrage_fetch_budget = 20.0  # seconds per scan spent fetching orderbooks
+        self.arbitrage_fetch_wave = 50  # candidate pairs priced per wave
         self.price_check_interval = 30  # seconds
+        self.persist_interval = 1  # seconds between claiming triggered alerts (notifications follow the claim)
 
-        # In-memory alert subscriptions for arbitrage
+        # Arbitrage alert subscribers (mirrors arbitrage_subscribers table)
         self._arbitrage_subscribers: set[int] = set()  # telegram_ids
 
     def set_bot(self, bot) -> None:
         """Set the Telegram bot instance for sending notifications."""
-        self._bot = bot
+        get_notification_dispatcher().set_bot(bot)
 
     # ===================
     # Price Alerts
@@ -101,6 +268,7 @@ class AlertsService:
         outcome: str,
         condition: str,
         target_price: Decimal,
+        token_id: Optional[str] = None,
     ) -> PriceAlert:
         """
         Create a new price alert.
@@ -113,6 +281,7 @@ class AlertsService:
             outcome: "yes" or "no"
             condition: "above" or "below"
             target_price: Price threshold (0-1)
+            token_id: Outcome token ID; enables evaluation on live price ticks
 
         Returns:
             Created PriceAlert
@@ -126,9 +295,24 @@ class AlertsService:
             outcome=outcome,
             condition=condition,
             target_price=target_price,
+            token_id=token_id,
+        )
+
+        await create_price_alert(
+            alert_id=alert.id,
+            user_telegram_id=user_telegram_id,
+            platform=platform,
+            market_id=market_id,
+            market_title=market_title,
+            outcome=outcome,
+            condition=condition,
+            target_price=target_price,
+            token_id=token_id,
         )
 
         self._alerts[alert.id] = alert
+        self._alert_index.add(alert)
+        await self._watch_alert(alert)
 
         logger.info(
             "Price alert created",
@@ -144,11 +328,49 @@ class AlertsService:
         """Delete an alert by ID."""
         alert = self._alerts.get(alert_id)
         if alert and alert.user_telegram_id == user_telegram_id:
+            await delete_price_alert(alert_id, user_telegram_id)
             del self._alerts[alert_id]
+            if not alert.triggered:
+                self._alert_index.remove(alert)
+                self._unwatch_alert(alert)
             logger.info("Price alert deleted", alert_id=alert_id)
             return True
         return False
 
+    async def load_alerts(self) -> None:
+        """Bulk load untriggered alerts and arbitrage subscribers from the database."""
+        records = await get_active_price_alerts()
+        for record in records:
+            alert = PriceAlert(
+                id=record.id,
+                user_telegram_id=record.user_telegram_id,
+                platform=record.platform,
+                market_id=record.market_id,
+                market_title=record.market_title,
+                outcome=record.outcome,
+                condition=record.condition,
+                target_price=record.target_price,
+                token_id=record.token_id,
+                created_at=record.created_at,
+            )
+            self._alerts[alert.id] = alert
+            self._alert_index.add(alert)
+
+        # One live-feed subscription per alert, matching create_alert/_unwatch_alert
+        await asyncio.gather(
+            *(self._watch_alert(alert) for alert in self._alerts.values()),
+            return_exceptions=True,
+        )
+
+        self._arbitrage_subscribers = set(await get_arbitrage_subscribers())
+
+        logger.info(
+            "Alerts loaded",
+            price_alerts=len(records),
+            indexed=len(self._alert_index),
+            arbitrage_subscribers=len(self._arbitrage_subscribers),
+        )
+
     async def get_user_alerts(self, user_telegram_id: int) -> list[PriceAlert]:
         """Get all alerts for a user."""
         return [
@@ -156,8 +378,132 @@ class AlertsService:
             if a.user_telegram_id == user_telegram_id and not a.triggered
         ]
 
+    async def _watch_market(
+        self,
+        platform: Platform,
+        market_id: str,
+        yes_token: Optional[str] = None,
+        no_token: Optional[str] = None,
+    ) -> None:
+        """Make sure the live price feed covers a market's tokens."""
+        try:
+            if platform == Platform.POLYMARKET:
+                from src.services.polymarket_ws import polymarket_ws_manager
+                await polymarket_ws_manager.subscribe_market(
+                    market_id=market_id,
+                    yes_token=yes_token or no_token,
+                    no_token=no_token if yes_token else None,
+                )
+            else:
+                from src.services.price_poller import POLLED_PLATFORMS, price_poller
+                if platform.value in POLLED_PLATFORMS:
+                    price_poller.subscribe(
+                        platform=platform.value,
+                        market_id=market_id,
+                        yes_token=yes_token,
+                        no_token=no_token,
+                    )
+        except Exception as e:
+            logger.warning("Failed to subscribe market to live prices", market_id=market_id, error=str(e))
+
+    def _unwatch_market(
+        self,
+        platform: Platform,
+        market_id: str,
+        yes_token: Optional[str] = None,
+        no_token: Optional[str] = None,
+    ) -> None:
+        """Release a subscription taken by _watch_market (called with the same tokens)."""
+        try:
+            if platform == Platform.POLYMARKET:
+                from src.services.polymarket_ws import polymarket_ws_manager
+                if yes_token or no_token:
+                    polymarket_ws_manager.release_market(
+                        yes_token or no_token,
+                        no_token if yes_token else None,
+                    )
+            else:
+                from src.services.price_poller import price_poller
+                price_poller.unsubscribe(platform.value, market_id)
+        except Exception as e:
+            logger.warning("Failed to release live price subscription", market_id=market_id, error=str(e))
+
+    async def _watch_alert(self, alert: PriceAlert) -> None:
+        """Make sure the live price feed covers an alert's token."""
+        if not alert.token_id:
+            return
+        await self._watch_market(
+            alert.platform,
+            alert.market_id,
+            yes_token=alert.token_id if alert.outcome == "yes" else None,
+            no_token=alert.token_id if alert.outcome == "no" else None,
+        )
+
+    def _unwatch_alert(self, alert: PriceAlert) -> None:
+        """Release an alert's live feed subscription."""
+        if alert.token_id:
+            self._unwatch_market(
+                alert.platform,
+                alert.market_id,
+                yes_token=alert.token_id if alert.outcome == "yes" else None,
+                no_token=alert.token_id if alert.outcome == "no" else None,
+            )
+
+    def _on_price_tick(self, update: PriceUpdate) -> None:
+        """Evaluate indexed alerts against a live tick. Registered as a PriceCache tick listener."""
+        if not self._alert_index.covers(update.platform, update.token_id):
+            return
+        price = _tick_price(update)
+        if price is None:
+            return
+
+        for alert_id in self._alert_index.pop_crossed(update.platform, update.token_id, price):
+            alert = self._alerts.get(alert_id)
+            if not alert or alert.triggered:
+                continue
+            alert.current_price = price
+            self._mark_triggered(alert)
+
+    def _mark_triggered(self, alert: PriceAlert) -> None:
+        """
+        Mark an alert triggered in memory and queue it to be claimed.
+
+        The notification goes out from _persist_triggered, only if this process
+        wins the claim (another evaluator may have the same alert loaded).
+        """
+        alert.triggered = True
+        alert.triggered_at = datetime.utcnow()
+        self._alert_index.remove(alert)
+        self._unwatch_alert(alert)
+        self._triggered_pending.append(alert)
+
+    async def _persist_triggered(self) -> None:
+        """Claim queued triggered alerts in one batch, notify the ones claimed, drop all from memory."""
+        if not self._triggered_pending:
+            return
+        batch, self._triggered_pending = self._triggered_pending, []
+        try:
+            claimed = await claim_triggered_price_alerts([
+                (alert.id, alert.current_price, alert.triggered_at) for alert in batch
+            ])
+        except Exception:
+            self._triggered_pending = batch + self._triggered_pending
+            raise
+        for alert in batch:
+            self._alerts.pop(alert.id, None)
+            if alert.id in claimed:
+                self._send_alert_notification(alert)
+            else:
+                logger.info("Alert already claimed by another evaluator", alert_id=alert.id)
+
     async def _check_alerts(self) -> None:
-        """Check all active alerts against current prices."""
+        """
+        Check active alerts not covered by the live feed against REST prices.
+
+        Prices come from the outcome's order book through alert_price, as for
+        live ticks; the market's listed price stands in for the last price
+        only when the book has no two-sided quote.
+        """
         if not self._alerts:
             return
 
@@ -166,6 +512,9 @@ class AlertsService:
         for alert in list(self._alerts.values()):
             if alert.triggered:
                 continue
+            # Alerts whose token is receiving live ticks are evaluated in _on_price_tick
+            if alert.token_id and await price_cache.get_price(alert.platform.value, alert.token_id):
+                continue
             key = (alert.platform, alert.market_id)
             alerts_by_market.setdefault(key, []).append(alert)
 
@@ -173,18 +522,29 @@ class AlertsService:
         for (platform, market_id), alerts in alerts_by_market.items():
             try:
                 platform_client = get_platform(platform)
-                market = await platform_client.get_market(market_id)
-
-                if not market:
-                    continue
+                outcomes = sorted({alert.outcome for alert in alerts})
+                tokens = {alert.outcome: alert.token_id for alert in alerts if alert.token_id}
+                books = await platform_client.get_orderbooks([
+                    OrderBookRequest(market_id=market_id, outcome=Outcome(outcome), token_id=tokens.get(outcome))
+                    for outcome in outcomes
+                ])
+                quotes = {
+                    outcome: (book.best_bid, book.best_ask) if book else (None, None)
+                    for outcome, book in zip(outcomes, books)
+                }
+
+                market = None
+                if any(bid is None or ask is None for bid, ask in quotes.values()):
+                    market = await platform_client.get_market(market_id)
 
                 for alert in alerts:
-                    price = market.yes_price if alert.outcome == "yes" else market.no_price
+                    last = None
+                    if market:
+                        last = market.yes_price if alert.outcome == "yes" else market.no_price
+                    price = alert_price(*quotes[alert.outcome], last)
 
                     if price and alert.check(price):
-                        alert.triggered = True
-                        alert.triggered_at = datetime.utcnow()
-                        await self._send_alert_notification(alert)
+                        self._mark_triggered(alert)
 
             except Exception as e:
                 logger.error(
@@ -194,12 +554,8 @@ class AlertsService:
                     error=str(e),
                 )
 
-    async def _send_alert_notification(self, alert: PriceAlert) -> None:
-        """Send Telegram notification for triggered alert."""
-        if not self._bot:
-            logger.warning("Bot not set, cannot send alert notification")
-            return
-
+    def _send_alert_notification(self, alert: PriceAlert) -> None:
+        """Queue Telegram notification for triggered alert."""
         try:
             direction = "📈" if alert.condition == "above" else "📉"
             current_cents = int(alert.current_price * 100) if alert.current_price else "?"
@@ -216,14 +572,15 @@ Target: {alert.condition} {target_cents}¢
 Platform: {alert.platform.value.title()}
 """
 
-            await self._bot.send_message(
-                chat_id=alert.user_telegram_id,
-                text=message,
-                parse_mode="HTML",
+            get_notification_dispatcher().notify(
+                alert.user_telegram_id,
+                message,
+                kind="alert",
+                dedup_key=f"alert:{alert.id}",
             )
 
             logger.info(
-                "Alert notification sent",
+                "Alert notification queued",
                 alert_id=alert.id,
                 user=alert.user_telegram_id,
             )
@@ -241,11 +598,13 @@ Platform: {alert.platform.value.title()}
 
     async def subscribe_arbitrage(self, user_telegram_id: int) -> None:
         """Subscribe user to arbitrage alerts."""
+        await add_arbitrage_subscriber(user_telegram_id)
         self._arbitrage_subscribers.add(user_telegram_id)
         logger.info("User subscribed to arbitrage alerts", user=user_telegram_id)
 
     async def unsubscribe_arbitrage(self, user_telegram_id: int) -> None:
         """Unsubscribe user from arbitrage alerts."""
+        await remove_arbitrage_subscriber(user_telegram_id)
         self._arbitrage_subscribers.discard(user_telegram_id)
         logger.info("User unsubscribed from arbitrage alerts", user=user_telegram_id)
 
@@ -272,7 +631,6 @@ Platform: {alert.platform.value.title()}
             from src.platforms.limitless import limitless_platform
             from src.platforms.opinion import opinion_platform
             from src.platforms.myriad import myriad_platform
-            from src.db.models import Outcome
 
             # Platform instances for orderbook fetching
             platform_instances = {
@@ -284,12 +642,13 @@ Platform: {alert.platform.value.title()}
             }
 
             # Fetch all markets in parallel
+            limit = self.arbitrage_market_limit
             results = await asyncio.gather(
-                polymarket_platform.get_markets(limit=50, active_only=True),
-                kalshi_platform.get_markets(limit=50, active_only=True),
-                limitless_platform.get_markets(limit=50, active_only=True),
-                opinion_platform.get_markets(limit=50, active_only=True),
-                myriad_platform.get_markets(limit=50, active_only=True),
+                polymarket_platform.get_markets(limit=limit, active_only=True),
+                kalshi_platform.get_markets(limit=limit, active_only=True),
+                limitless_platform.get_markets(limit=limit, active_only=True),
+                opinion_platform.get_markets(limit=limit, active_only=True),
+                myriad_platform.get_markets(limit=limit, active_only=True),
                 return_exceptions=True,
             )
 
@@ -319,172 +678,199 @@ Platform: {alert.platform.value.title()}
                 myriad=len(platform_markets[Platform.MYRIAD]),
             )
 
-            # Extract key identifiers from titles for matching
-            def extract_match_key(title: str) -> set[str]:
-                """Extract meaningful words for matching."""
-                title_lower = title.lower()
-                # Remove common prediction market phrases
-                for phrase in ["will", "win", "beat", "defeat", "vs", "vs.", "to win", "winner", "over", "under"]:
-                    title_lower = title_lower.replace(phrase, " ")
-
-                words = set(title_lower.split())
-                # Remove stop words and short words
-                stop_words = {"the", "a", "an", "to", "in", "on", "at", "be", "or", "and", "?", "of", "for", "-", "by"}
-                return {w for w in words if w not in stop_words and len(w) > 2}
-
-            # Helper to fetch real orderbook prices for a market
-            async def get_orderbook_prices(platform: Platform, market) -> tuple[Decimal | None, Decimal | None]:
+            # Helper to fetch real orderbook prices for many markets of one platform
+            async def get_orderbook_prices(
+                platform: Platform, markets: list,
+            ) -> dict[str, tuple[Decimal | None, Decimal | None]]:
                 """
-                Fetch real orderbook prices for a market.
-                Returns (best_ask, best_bid) - what you pay to buy, what you get to sell.
+                Fetch real orderbook prices for markets in one batch.
+                Live books from the price cache are used where available.
+                Returns market_id -> (best_ask, best_bid) - what you pay to buy, what you get to sell.
                 """
-                try:
-                    platform_instance = platform_instances.get(platform)
-                    if not platform_instance:
-                        return market.yes_price, market.yes_price
+                prices = {m.market_id: (m.yes_price, m.yes_price) for m in markets}
+
+                to_fetch = []
+                for market in markets:
+                    live = (
+                        await price_cache.get_price(platform.value, market.yes_token)
+                        if market.yes_token else None
+                    )
+                    if live and live.best_ask is not None and live.best_bid is not None:
+                        prices[market.market_id] = (live.best_ask, live.best_bid)
+                    else:
+                        to_fetch.append(market)
+
+                platform_instance = platform_instances.get(platform)
+                if not platform_instance or not to_fetch:
+                    return prices
 
+                requests = []
+                for market in to_fetch:
                     # Get slug for platforms that need it (Limitless, Myriad)
                     slug = None
                     if market.raw_data and isinstance(market.raw_data, dict):
                         slug = market.raw_data.get("slug") or market.event_id
+                    requests.append(OrderBookRequest(
+                        market_id=market.market_id,
+                        outcome=Outcome.YES,
+                        token_id=market.yes_token,
+                        slug=slug,
+                    ))
 
-                    orderbook = await platform_instance.get_orderbook(market.market_id, Outcome.YES, slug=slug)
+                try:
+                    orderbooks = await platform_instance.get_orderbooks(requests)
+                except Exception as e:
+                    logger.debug(f"Orderbook batch failed for {platform.value}", error=str(e)[:50])
+                    return prices
 
+                for market, orderbook in zip(to_fetch, orderbooks):
                     if orderbook:
-                        best_ask = orderbook.best_ask or market.yes_price
-                        best_bid = orderbook.best_bid or market.yes_price
-                        return best_ask, best_bid
-
-                    return market.yes_price, market.yes_price
-                except Exception as e:
-                    logger.debug(f"Orderbook fetch failed for {platform.value}:{market.market_id[:10]}", error=str(e)[:50])
-                    return market.yes_price, market.yes_price
+                        prices[market.market_id] = (
+                            orderbook.best_ask or market.yes_price,
+                            orderbook.best_bid or market.yes_price,
+                        )
+                return prices
 
             # Pre-compute match keys for all markets
-            market_keys: dict[Platform, list[tuple]] = {}
+            market_keys: dict[Platform, tuple[list, list]] = {}
             for platform, markets in platform_markets.items():
-                market_keys[platform] = [
-                    (m, extract_match_key(m.title))
-                    for m in markets
-                    if m.yes_price is not None
-                ]
+                priced = [m for m in markets if m.yes_price is not None]
+                market_keys[platform] = (priced, [extract_match_key(m.title) for m in priced])
+
+            try:
+                await match_cache.load()
+            except Exception as e:
+                logger.warning("Failed to load market match cache", error=str(e))
+
+            def market_refs(platform: Platform, market) -> list[tuple[str, str]]:
+                """Identifiers a market can appear under in the match cache."""
+                refs = [(platform.value, market.market_id)]
+                # Dome matches identify Polymarket markets by slug
+                raw = market.raw_data.get("market") if isinstance(market.raw_data, dict) else None
+                if isinstance(raw, dict) and raw.get("slug"):
+                    refs.append((platform.value, raw["slug"]))
+                return refs
 
             # First pass: find candidate pairs based on title similarity
+            # (vectorized blocking + scoring, so full catalogs can be compared
+            # each cycle) plus previously confirmed matches
             candidate_pairs = []
             seen_pairs = set()
 
             for i, platform_a in enumerate(platforms_list):
                 for platform_b in platforms_list[i + 1:]:  # Only compare each pair once
-                    markets_a = market_keys.get(platform_a, [])
-                    markets_b = market_keys.get(platform_b, [])
+                    markets_a, keys_a = market_keys.get(platform_a, ([], []))
+                    markets_b, keys_b = market_keys.get(platform_b, ([], []))
+                    if not markets_a or not markets_b:
+                        continue
 
-                    for market_a, keys_a in markets_a:
-                        if not keys_a:
+                    # At least 40% Jaccard similarity AND 3+ common words.
+                    # Matching is CPU-bound, so keep it off the event loop.
+                    # Title matches are heuristic, so they are recomputed each
+                    # cycle rather than stored in the confirmed match cache.
+                    matches = await asyncio.to_thread(match_catalogs, keys_a, keys_b)
+                    matched_markets = [
+                        (markets_a[match.index_a], markets_b[match.index_b])
+                        for match in matches
+                    ]
+
+                    lookup_b = {ref: m for m in markets_b for ref in market_refs(platform_b, m)}
+                    for market_a in markets_a:
+                        for ref in market_refs(platform_a, market_a):
+                            for other in match_cache.matches_for(ref):
+                                if other in lookup_b:
+                                    matched_markets.append((market_a, lookup_b[other]))
+
+                    for market_a, market_b in matched_markets:
+                        # Skip if we've seen this pair
+                        pair_key = (market_a.market_id, market_b.market_id)
+                        if pair_key in seen_pairs:
                             continue
+                        seen_pairs.add(pair_key)
 
-                        for market_b, keys_b in markets_b:
-                            if not keys_b:
-                                continue
-
-                            # Calculate Jaccard similarity
-                            common = keys_a & keys_b
-                            union = keys_a | keys_b
-                            similarity = len(common) / len(union) if union else 0
-
-                            # Require at least 40% similarity AND 3+ common words
-                            if similarity < 0.4 or len(common) < 3:
-                                continue
-
-                            # Skip if we've seen this pair
-                            pair_key = (market_a.market_id, market_b.market_id)
-                            if pair_key in seen_pairs:
-                                continue
-                            seen_pairs.add(pair_key)
+                        # Quick check: if mid-prices are too close, skip orderbook fetch
+                        mid_spread = abs(market_a.yes_price - market_b.yes_price)
+                        if mid_spread < Decimal("0.02"):  # Less than 2% spread in mid-price
+                            continue
 
-                            # Quick check: if mid-prices are too close, skip orderbook fetch
-                            mid_spread = abs(market_a.yes_price - market_b.yes_price)
-                            if mid_spread < Decimal("0.02"):  # Less than 2% spread in mid-price
-                                continue
+                        candidate_pairs.append((platform_a, market_a, platform_b, market_b))
 
-                            candidate_pairs.append((platform_a, market_a, platform_b, market_b))
+            try:
+                await match_cache.flush()
+            except Exception as e:
+                logger.warning("Failed to save market matches", error=str(e))
 
             logger.info(f"Found {len(candidate_pairs)} candidate arbitrage pairs, fetching orderbooks...")
 
-            # Second pass: fetch real orderbook prices for candidates
-            for platform_a, market_a, platform_b, market_b in candidate_pairs[:20]:  # Limit to top 20 to avoid API spam
+            # Second pass: fetch real orderbook prices for candidates in priority
+            # order (largest mid-price divergence, then deepest liquidity first).
+            # Each wave is one batch per platform; stop when the time budget is spent.
+            def pair_priority(pair: tuple) -> tuple:
+                _, market_a, _, market_b = pair
+                divergence = abs(market_a.yes_price - market_b.yes_price)
+                liquidity = min(market_a.liquidity or 0, market_b.liquidity or 0)
+                return (-divergence, -liquidity)
+
+            queue = [(pair_priority(pair), n, pair) for n, pair in enumerate(candidate_pairs)]
+            heapq.heapify(queue)
+
+            # Highest-priority pairs with live feeds on both legs are also
+            # re-evaluated on every tick between scans
+            live_candidates = [item for item in queue if self._is_live_pair(item[2])]
+            await self._update_live_pairs([
+                item[2] for item in heapq.nsmallest(self.arbitrage_live_pairs, live_candidates)
+            ])
+
+            book_prices: dict[Platform, dict[str, tuple[Decimal | None, Decimal | None]]] = {}
+            evaluated_pairs = []
+            deadline = time.monotonic() + self.arbitrage_fetch_budget
+
+            while queue:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+
+                wave = [heapq.heappop(queue)[2] for _ in range(min(self.arbitrage_fetch_wave, len(queue)))]
+                legs: dict[Platform, dict[str, Any]] = {}
+                for platform_a, market_a, platform_b, market_b in wave:
+                    for platform, market in ((platform_a, market_a), (platform_b, market_b)):
+                        if market.market_id not in book_prices.get(platform, {}):
+                            legs.setdefault(platform, {})[market.market_id] = market
+
+                leg_platforms = list(legs.keys())
                 try:
-                    # Fetch orderbooks for both markets
-                    (ask_a, bid_a), (ask_b, bid_b) = await asyncio.gather(
-                        get_orderbook_prices(platform_a, market_a),
-                        get_orderbook_prices(platform_b, market_b),
+                    batch_results = await asyncio.wait_for(
+                        asyncio.gather(*[
+                            get_orderbook_prices(p, list(legs[p].values())) for p in leg_platforms
+                        ]),
+                        timeout=remaining,
                     )
+                except asyncio.TimeoutError:
+                    break
+
+                for platform, prices in zip(leg_platforms, batch_results):
+                    book_prices.setdefault(platform, {}).update(prices)
+                evaluated_pairs.extend(wave)
+
+            if len(evaluated_pairs) < len(candidate_pairs):
+                logger.info(
+                    "Arbitrage orderbook budget exhausted",
+                    evaluated=len(evaluated_pairs),
+                    skipped=len(candidate_pairs) - len(evaluated_pairs),
+                )
 
-                    if not all([ask_a, bid_a, ask_b, bid_b]):
-                        continue
-
-                    # Calculate real arbitrage spread
-                    # Option 1: Buy on A (pay ask_a), sell on B (get bid_b)
-                    spread_a_to_b = bid_b - ask_a
-                    # Option 2: Buy on B (pay ask_b), sell on A (get bid_a)
-                    spread_b_to_a = bid_a - ask_b
-
-                    # Pick the better direction
-                    if spread_a_to_b > spread_b_to_a:
-                        buy_platform, sell_platform = platform_a, platform_b
-                        buy_market, sell_market = market_a, market_b
-                        buy_price, sell_price = ask_a, bid_b  # Buy at ask, sell at bid
-                        spread_decimal = spread_a_to_b
-                    else:
-                        buy_platform, sell_platform = platform_b, platform_a
-                        buy_market, sell_market = market_b, market_a
-                        buy_price, sell_price = ask_b, bid_a
-                        spread_decimal = spread_b_to_a
-
-                    spread_cents = int(spread_decimal * 100)
-
-                    # Skip if spread is too small (must be > 3% to cover fees)
-                    if spread_decimal < self.min_arbitrage_spread:
-                        continue
+            for platform_a, market_a, platform_b, market_b in evaluated_pairs:
+                try:
+                    ask_a, bid_a = book_prices[platform_a][market_a.market_id]
+                    ask_b, bid_b = book_prices[platform_b][market_b.market_id]
 
-                    # Calculate profit potential after fees (~4% round-trip)
-                    estimated_fees = Decimal("0.04")
-                    profit_potential = spread_decimal - estimated_fees
-                    profit_percent = (profit_potential * 100) if profit_potential > 0 else Decimal("0")
-
-                    # Create unique ID
-                    opp_id = f"{buy_market.market_id[:6]}-{sell_market.market_id[:6]}"
-
-                    opp = ArbitrageOpportunity(
-                        id=opp_id,
-                        market_title=buy_market.title[:80],
-                        buy_platform=buy_platform,
-                        sell_platform=sell_platform,
-                        buy_market_id=buy_market.market_id,
-                        sell_market_id=sell_market.market_id,
-                        buy_price=buy_price,
-                        sell_price=sell_price,
-                        spread_cents=spread_cents,
-                        profit_potential=profit_percent,
-                        buy_title=buy_market.title[:50],
-                        sell_title=sell_market.title[:50],
+                    opp = self._evaluate_pair(
+                        platform_a, market_a, ask_a, bid_a,
+                        platform_b, market_b, ask_b, bid_b,
                     )
-
-                    # Check cache for significant changes
-                    cached = self._arbitrage_cache.get(opp_id)
-                    if not cached or abs(cached.spread_cents - spread_cents) >= 2:
-                        self._arbitrage_cache[opp_id] = opp
+                    if opp and self._is_new_opportunity(opp):
                         opportunities.append(opp)
 
-                    logger.info(
-                        "Arbitrage opportunity found",
-                        buy_platform=buy_platform.value,
-                        sell_platform=sell_platform.value,
-                        buy_price=str(buy_price),
-                        sell_price=str(sell_price),
-                        spread_cents=spread_cents,
-                        title=buy_market.title[:40],
-                    )
-
                 except Exception as e:
                     logger.warning("Error processing arbitrage pair", error=str(e)[:100])
                     continue
@@ -497,6 +883,127 @@ Platform: {alert.platform.value.title()}
             logger.error("Failed to find arbitrage opportunities", error=str(e))
             return []
 
+    def _evaluate_pair(
+        self,
+        platform_a: Platform,
+        market_a,
+        ask_a: Optional[Decimal],
+        bid_a: Optional[Decimal],
+        platform_b: Platform,
+        market_b,
+        ask_b: Optional[Decimal],
+        bid_b: Optional[Decimal],
+    ) -> Optional[ArbitrageOpportunity]:
+        """Build an opportunity from both legs' YES ask/bid if the spread clears the minimum."""
+        if not all([ask_a, bid_a, ask_b, bid_b]):
+            return None
+
+        # Calculate real arbitrage spread
+        # Option 1: Buy on A (pay ask_a), sell on B (get bid_b)
+        spread_a_to_b = bid_b - ask_a
+        # Option 2: Buy on B (pay ask_b), sell on A (get bid_a)
+        spread_b_to_a = bid_a - ask_b
+
+        # Pick the better direction
+        if spread_a_to_b > spread_b_to_a:
+            buy_platform, sell_platform = platform_a, platform_b
+            buy_market, sell_market = market_a, market_b
+            buy_price, sell_price = ask_a, bid_b  # Buy at ask, sell at bid
+            spread_decimal = spread_a_to_b
+        else:
+            buy_platform, sell_platform = platform_b, platform_a
+            buy_market, sell_market = market_b, market_a
+            buy_price, sell_price = ask_b, bid_a
+            spread_decimal = spread_b_to_a
+
+        # Skip if spread is too small (must be > 3% to cover fees)
+        if spread_decimal < self.min_arbitrage_spread:
+            return None
+
+        # Calculate profit potential after fees (~4% round-trip)
+        estimated_fees = Decimal("0.04")
+        profit_potential = spread_decimal - estimated_fees
+        profit_percent = (profit_potential * 100) if profit_potential > 0 else Decimal("0")
+
+        opp = ArbitrageOpportunity(
+            id=f"{buy_market.market_id[:6]}-{sell_market.market_id[:6]}",
+            market_title=buy_market.title[:80],
+            buy_platform=buy_platform,
+            sell_platform=sell_platform,
+            buy_market_id=buy_market.market_id,
+            sell_market_id=sell_market.market_id,
+            buy_price=buy_price,
+            sell_price=sell_price,
+            spread_cents=int(spread_decimal * 100),
+            profit_potential=profit_percent,
+            buy_title=buy_market.title[:50],
+            sell_title=sell_market.title[:50],
+        )
+        return opp
+
+    def _is_new_opportunity(self, opp: ArbitrageOpportunity) -> bool:
+        """True (and cached) unless the same opportunity was seen with a similar spread."""
+        cached = self._arbitrage_cache.get(opp.id)
+        if cached and abs(cached.spread_cents - opp.spread_cents) < 2:
+            return False
+
+        self._arbitrage_cache[opp.id] = opp
+        logger.info(
+            "Arbitrage opportunity found",
+            buy_platform=opp.buy_platform.value,
+            sell_platform=opp.sell_platform.value,
+            buy_price=str(opp.buy_price),
+            sell_price=str(opp.sell_price),
+            spread_cents=opp.spread_cents,
+            title=opp.market_title[:40],
+        )
+        return True
+
+    # ===================
+    # Live Arbitrage Pairs
+    # ===================
+
+    def _is_live_pair(self, pair: tuple) -> bool:
+        """Both legs have a YES token on a platform with a live price feed."""
+        from src.services.price_poller import POLLED_PLATFORMS
+
+        platform_a, market_a, platform_b, market_b = pair
+        live = {Platform.POLYMARKET.value, *POLLED_PLATFORMS}
+        return (
+            platform_a.value in live and platform_b.value in live
+            and bool(market_a.yes_token) and bool(market_b.yes_token)
+        )
+
+    async def _update_live_pairs(self, pairs: list[tuple]) -> None:
+        """Replace the pairs watched on live prices, moving feed subscriptions along."""
+        added, removed = self._pair_registry.replace([ArbitragePair(*pair) for pair in pairs])
+        for pair in removed:
+            self._unwatch_market(pair.platform_a, pair.market_a.market_id, yes_token=pair.market_a.yes_token)
+            self._unwatch_market(pair.platform_b, pair.market_b.market_id, yes_token=pair.market_b.yes_token)
+        for pair in added:
+            await self._watch_market(pair.platform_a, pair.market_a.market_id, yes_token=pair.market_a.yes_token)
+            await self._watch_market(pair.platform_b, pair.market_b.market_id, yes_token=pair.market_b.yes_token)
+        if added or removed:
+            logger.info("Live arbitrage pairs updated", pairs=len(self._pair_registry), added=len(added), removed=len(removed))
+
+    def _on_arbitrage_tick(self, update: PriceUpdate) -> None:
+        """Re-evaluate the pairs a tick's token belongs to. Registered as a PriceCache tick listener."""
+        if not self._arbitrage_subscribers:
+            return
+
+        for pair in self._pair_registry.pairs_for_token(update.platform, update.token_id):
+            book_a = price_cache.peek_price(pair.platform_a.value, pair.market_a.yes_token)
+            book_b = price_cache.peek_price(pair.platform_b.value, pair.market_b.yes_token)
+            if not book_a or not book_b:
+                continue
+
+            opp = self._evaluate_pair(
+                pair.platform_a, pair.market_a, book_a.best_ask, book_a.best_bid,
+                pair.platform_b, pair.market_b, book_b.best_ask, book_b.best_bid,
+            )
+            if opp and self._is_new_opportunity(opp):
+                self._send_arbitrage_notification(opp)
+
     async def _check_arbitrage(self) -> None:
         """Check for arbitrage opportunities and notify subscribers."""
         if not self._arbitrage_subscribers:
@@ -505,11 +1012,11 @@ Platform: {alert.platform.value.title()}
         opportunities = await self.find_arbitrage_opportunities()
 
         for opp in opportunities:
-            await self._send_arbitrage_notification(opp)
+            self._send_arbitrage_notification(opp)
 
-    async def _send_arbitrage_notification(self, opp: ArbitrageOpportunity) -> None:
-        """Send arbitrage alert to all subscribers with trade buttons."""
-        if not self._bot or not self._arbitrage_subscribers:
+    def _send_arbitrage_notification(self, opp: ArbitrageOpportunity) -> None:
+        """Queue arbitrage alert for all subscribers with trade buttons."""
+        if not self._arbitrage_subscribers:
             return
 
         try:
@@ -586,27 +1093,20 @@ Platform: {alert.platform.value.title()}
             ]
             reply_markup = InlineKeyboardMarkup(keyboard)
 
-            for telegram_id in list(self._arbitrage_subscribers):
-                try:
-                    await self._bot.send_message(
-                        chat_id=telegram_id,
-                        text=message,
-                        parse_mode="HTML",
-                        reply_markup=reply_markup,
-                    )
-                except Exception as e:
-                    logger.warning(
-                        "Failed to send arbitrage alert to user",
-                        user=telegram_id,
-                        error=str(e),
-                    )
+            queued = get_notification_dispatcher().notify_many(
+                list(self._arbitrage_subscribers),
+                message,
+                kind="arbitrage",
+                reply_markup=reply_markup,
+                dedup_key=f"arbitrage:{opp.id}:{opp.spread_cents}",
+            )
 
             logger.info(
-                "Arbitrage alert sent",
+                "Arbitrage alert queued",
                 opportunity_id=opp.id,
                 spread_cents=opp.spread_cents,
                 profit_potential=str(opp.profit_potential),
-                subscribers=len(self._arbitrage_subscribers),
+                subscribers=queued,
             )
 
         except Exception as e:
@@ -623,12 +1123,26 @@ Platform: {alert.platform.value.title()}
 
         self._running = True
 
-        # Start price alert monitoring
+        try:
+            await self.load_alerts()
+        except Exception as e:
+            logger.error("Failed to load alerts from database", error=str(e))
+
+        # Evaluate indexed alerts and live arbitrage pairs on every price tick
+        if not self._tick_listener_registered:
+            price_cache.add_tick_listener(self._on_price_tick)
+            price_cache.add_tick_listener(self._on_arbitrage_tick)
+            self._tick_listener_registered = True
+
+        # Start REST fallback for alerts without live prices
         self._monitoring_task = asyncio.create_task(self._price_monitoring_loop())
 
         # Start arbitrage monitoring
         self._arbitrage_task = asyncio.create_task(self._arbitrage_monitoring_loop())
 
+        # Write triggered state back in batches
+        self._persist_task = asyncio.create_task(self._persist_loop())
+
         logger.info("Alert monitoring started")
 
     async def stop_monitoring(self) -> None:
@@ -649,6 +1163,18 @@ Platform: {alert.platform.value.title()}
             except asyncio.CancelledError:
                 pass
 
+        if self._persist_task:
+            self._persist_task.cancel()
+            try:
+                await self._persist_task
+            except asyncio.CancelledError:
+                pass
+
+        try:
+            await self._persist_triggered()
+        except Exception as e:
+            logger.error("Failed to persist triggered alerts", error=str(e))
+
         logger.info("Alert monitoring stopped")
 
     async def _price_monitoring_loop(self) -> None:
@@ -671,6 +1197,15 @@ Platform: {alert.platform.value.title()}
 
             await asyncio.sleep(self.arbitrage_check_interval)
 
+    async def _persist_loop(self) -> None:
+        """Background loop for writing triggered alerts to the database."""
+        while self._running:
+            await asyncio.sleep(self.persist_interval)
+            try:
+                await self._persist_triggered()
+            except Exception as e:
+                logger.error("Failed to persist triggered alerts", error=str(e))
+
 
 # Singleton instance
 alerts_service = AlertsService()
@@ -0,0 +1,253 @@
+"""
+Background admin broadcasts.
+
+A broadcast is a row in the broadcasts table. The engine streams reachable
+users in telegram_id order from a server-side cursor and sends them in
+chunks with a pool of workers sharing the notification dispatcher's rate
+limiter (so broadcasts and alerts together stay under Telegram's global
+limit).
+
+After every chunk the last telegram_id and counters are checkpointed, and
+users who blocked the bot are marked so later broadcasts skip them. A
+restart resumes running broadcasts from their checkpoint; at most the
+interrupted chunk is sent twice.
+"""
+
+import asyncio
+import time
+from typing import Optional
+
+from src.services.notifications import (
+    TelegramRateLimiter,
+    get_notification_dispatcher,
+    retry_after_seconds,
+)
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class BroadcastEngine:
+    """Runs broadcast jobs as background tasks with checkpointed progress."""
+
+    def __init__(
+        self,
+        rate_limiter: TelegramRateLimiter,
+        workers: int = 16,
+        chunk_size: int = 500,
+        progress_interval: float = 10.0,
+        max_attempts: int = 3,
+    ):
+        self.rate_limiter = rate_limiter
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.progress_interval = progress_interval
+        self.max_attempts = max_attempts
+        self._jobs: dict[int, asyncio.Task] = {}
+
+    def start(self, bot, broadcast_id: int) -> None:
+        """Run a broadcast in the background."""
+        if broadcast_id in self._jobs:
+            return
+        task = asyncio.create_task(self._run(bot, broadcast_id))
+        self._jobs[broadcast_id] = task
+        task.add_done_callback(lambda _: self._jobs.pop(broadcast_id, None))
+
+    async def resume(self, bot) -> int:
+        """Resume broadcasts interrupted by a restart. Returns number resumed."""
+        from src.db.database import get_running_broadcasts
+
+        broadcasts = await get_running_broadcasts()
+        for broadcast in broadcasts:
+            logger.info(
+                "Resuming broadcast",
+                broadcast_id=broadcast.id,
+                after_telegram_id=broadcast.last_telegram_id,
+            )
+            self.start(bot, broadcast.id)
+        return len(broadcasts)
+
+    def is_running(self, broadcast_id: int) -> bool:
+        return broadcast_id in self._jobs
+
+    # ===================
+    # Job
+    # ===================
+
+    async def _run(self, bot, broadcast_id: int) -> None:
+        from src.db.database import (
+            get_broadcast,
+            save_broadcast_progress,
+            stream_user_telegram_ids,
+        )
+
+        broadcast = await get_broadcast(broadcast_id)
+        if not broadcast:
+            return
+
+        counts = {"sent": broadcast.sent, "failed": broadcast.failed, "blocked": broadcast.blocked}
+        last_id = broadcast.last_telegram_id
+        started = time.monotonic()
+        last_report = started
+
+        async def process(chat_ids: list[int]) -> None:
+            nonlocal last_id, last_report
+            blocked = await self._send_chunk(bot, broadcast, chat_ids, counts)
+            last_id = chat_ids[-1]
+            await save_broadcast_progress(
+                broadcast_id,
+                last_id,
+                status="running",
+                blocked_telegram_ids=blocked,
+                **counts,
+            )
+            if time.monotonic() - last_report >= self.progress_interval:
+                last_report = time.monotonic()
+                await self._report(bot, broadcast, counts, started)
+
+        try:
+            chunk: list[int] = []
+            async for chat_id in stream_user_telegram_ids(
+                batch_size=self.chunk_size,
+                after_telegram_id=last_id,
+                reachable_only=True,
+            ):
+                chunk.append(chat_id)
+                if len(chunk) >= self.chunk_size:
+                    await process(chunk)
+                    chunk = []
+            if chunk:
+                await process(chunk)
+
+            await save_broadcast_progress(broadcast_id, last_id, status="completed", **counts)
+            await self._report(bot, broadcast, counts, started, done=True)
+            logger.info("Broadcast completed", broadcast_id=broadcast_id, **counts)
+
+        except asyncio.CancelledError:
+            # Left as running so the next start resumes it
+            raise
+        except Exception as e:
+            logger.error("Broadcast failed", broadcast_id=broadcast_id, error=str(e))
+            try:
+                await save_broadcast_progress(broadcast_id, last_id, status="failed", **counts)
+            except Exception:
+                pass
+            await self._report(bot, broadcast, counts, started, error=str(e))
+
+    async def _send_chunk(self, bot, broadcast, chat_ids: list[int], counts: dict) -> list[int]:
+        """Send one chunk with the worker pool. Returns chat IDs that blocked the bot."""
+        queue: asyncio.Queue[int] = asyncio.Queue()
+        for chat_id in chat_ids:
+            queue.put_nowait(chat_id)
+        blocked: list[int] = []
+
+        async def worker():
+            while True:
+                try:
+                    chat_id = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                result = await self._send_one(bot, broadcast, chat_id)
+                counts[result] += 1
+                if result == "blocked":
+                    blocked.append(chat_id)
+
+        await asyncio.gather(*(worker() for _ in range(min(self.workers, len(chat_ids)))))
+        return blocked
+
+    async def _send_one(self, bot, broadcast, chat_id: int) -> str:
+        """Send the broadcast to one chat. Returns "sent", "failed" or "blocked"."""
+        from telegram.constants import ParseMode
+        from telegram.error import BadRequest, Forbidden, RetryAfter
+
+        for _ in range(self.max_attempts):
+            await self.rate_limiter.acquire(chat_id)
+            try:
+                if broadcast.photo_file_id:
+                    await bot.send_photo(
+                        chat_id=chat_id,
+                        photo=broadcast.photo_file_id,
+                        caption=broadcast.text,
+                        parse_mode=ParseMode.HTML,
+                    )
+                else:
+                    await bot.send_message(
+                        chat_id=chat_id,
+                        text=broadcast.text,
+                        parse_mode=ParseMode.HTML,
+                    )
+                return "sent"
+            except RetryAfter as e:
+                wait = retry_after_seconds(e)
+                self.rate_limiter.pause(wait)
+                logger.warning("Broadcast rate limited, pausing sends", retry_after=wait)
+            except Forbidden:
+                return "blocked"
+            except BadRequest as e:
+                if "chat not found" in str(e).lower():
+                    return "blocked"
+                logger.warning("Broadcast send failed", user_id=chat_id, error=str(e))
+                return "failed"
+            except Exception as e:
+                logger.warning("Broadcast send failed", user_id=chat_id, error=str(e))
+                return "failed"
+        return "failed"
+
+    async def _report(
+        self,
+        bot,
+        broadcast,
+        counts: dict,
+        started: float,
+        done: bool = False,
+        error: Optional[str] = None,
+    ) -> None:
+        """Edit the admin's status message with live progress."""
+        if not broadcast.status_message_id:
+            return
+
+        processed = sum(counts.values())
+        elapsed = max(time.monotonic() - started, 1e-6)
+        if error:
+            header = f"❌ Broadcast stopped: {error[:100]}"
+        elif done:
+            header = "✅ Broadcast complete!"
+        else:
+            header = f"📢 Broadcasting... {processed}/{broadcast.total}"
+
+        text = (
+            f"{header}\n\n"
+            f"Sent: {counts['sent']}\n"
+            f"Failed: {counts['failed']}\n"
+            f"Blocked: {counts['blocked']} (skipped next time)\n"
+            f"Rate: {counts['sent'] / elapsed:.1f} msg/s"
+        )
+        try:
+            await bot.edit_message_text(
+                chat_id=broadcast.admin_telegram_id,
+                message_id=broadcast.status_message_id,
+                text=text,
+            )
+        except Exception as e:
+            logger.debug("Broadcast progress update failed", error=str(e))
+
+
+def _create_broadcast_engine() -> BroadcastEngine:
+    from src.config import settings
+    return BroadcastEngine(
+        get_notification_dispatcher().rate_limiter,
+        workers=settings.broadcast_workers,
+        chunk_size=settings.broadcast_chunk_size,
+    )
+
+
+# Global broadcast engine (created on first use so settings load lazily)
+_broadcast_engine: Optional[BroadcastEngine] = None
+
+
+def get_broadcast_engine() -> BroadcastEngine:
+    """Get the global broadcast engine."""
+    global _broadcast_engine
+    if _broadcast_engine is None:
+        _broadcast_engine = _create_broadcast_engine()
+    return _broadcast_engine
@@ -444,11 +444,25 @@ class DomeAPIClient:
                     ))
                 result[identifier] = matched_list
 
+            self._record_matches(result, set(polymarket_slugs or []))
             return result
         except Exception as e:
             logger.error("Failed to get matching markets", error=str(e))
             return {}
 
+    def _record_matches(self, matches: dict[str, list[MatchedMarket]], polymarket_slugs: set[str]) -> None:
+        """Add Dome's Polymarket <-> Kalshi matches to the shared match cache."""
+        from src.services.market_matching import match_cache
+
+        for identifier, matched in matches.items():
+            poly = [m.identifier for m in matched if m.platform == "POLYMARKET" and m.identifier]
+            if identifier in polymarket_slugs:
+                poly.append(identifier)
+            kalshi = [t for m in matched if m.platform == "KALSHI" for t in (m.market_tickers or [])]
+            for slug in poly:
+                for ticker in kalshi:
+                    match_cache.add(("polymarket", slug), ("kalshi", ticker), None, source="dome")
+
     async def find_arbitrage_opportunities(
         self,
         min_diff_percent: Decimal = Decimal("3.0"),
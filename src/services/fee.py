@@ -13,16 +13,16 @@ Chain-Specific Tracking:
 - Polymarket/Opinion/Limitless/Myriad (EVM): Fees tracked as EVM USDC
 """
 
+import time
 from decimal import Decimal, ROUND_DOWN
 from typing import Optional
 
 from src.db.database import (
     get_referral_chain,
-    add_referral_earnings,
-    get_user_by_telegram_id,
+    credit_referral_earnings,
     update_partner_volume,
     get_effective_revenue_share,
-    get_config,
+    get_all_config,
     set_config,
 )
 from src.db.models import ChainFamily, Platform
@@ -50,22 +50,49 @@ TIER_CONFIG_KEYS = {
 MIN_WITHDRAWAL_USDC = Decimal("5.00")
 
 
+# Commission rates are read on every trade, so the config rows are cached
+# briefly. Changes made through this module invalidate the cache at once.
+RATE_CACHE_TTL = 60.0
+
+_rate_config: Optional[dict[str, str]] = None
+_rate_config_loaded_at = 0.0
+
+
+async def _get_rate_config() -> dict[str, str]:
+    """System config (tier and per-user rates), cached for RATE_CACHE_TTL seconds."""
+    global _rate_config, _rate_config_loaded_at
+    if _rate_config is None or time.monotonic() - _rate_config_loaded_at > RATE_CACHE_TTL:
+        _rate_config = await get_all_config()
+        _rate_config_loaded_at = time.monotonic()
+    return _rate_config
+
+
+def invalidate_rate_cache() -> None:
+    """Drop cached commission rates so the next read goes to the database."""
+    global _rate_config
+    _rate_config = None
+
+
+def _percent_to_rate(value: Optional[str]) -> Optional[Decimal]:
+    """Convert a stored percentage (e.g. "25") to a rate (0.25)."""
+    if value is None:
+        return None
+    try:
+        return Decimal(value) / Decimal("100")
+    except Exception:
+        return None
+
+
 async def get_tier_commissions() -> dict[int, Decimal]:
     """
     Get current tier commission rates from database config.
     Falls back to defaults if not configured.
     """
+    config = await _get_rate_config()
     commissions = {}
     for tier, key in TIER_CONFIG_KEYS.items():
-        value = await get_config(key)
-        if value is not None:
-            try:
-                # Convert percentage (e.g., "25") to decimal (0.25)
-                commissions[tier] = Decimal(value) / Decimal("100")
-            except Exception:
-                commissions[tier] = DEFAULT_TIER_COMMISSIONS[tier]
-        else:
-            commissions[tier] = DEFAULT_TIER_COMMISSIONS[tier]
+        rate = _percent_to_rate(config.get(key))
+        commissions[tier] = rate if rate is not None else DEFAULT_TIER_COMMISSIONS[tier]
     return commissions
 
 
@@ -86,6 +113,7 @@ async def set_tier_commission(tier: int, percent: Decimal) -> bool:
     key = TIER_CONFIG_KEYS[tier]
     description = f"Tier {tier} referral commission percentage"
     await set_config(key, str(percent), description)
+    invalidate_rate_cache()
     return True
 
 
@@ -112,13 +140,8 @@ async def get_user_custom_rate(user_id: str) -> Optional[Decimal]:
     Returns:
         Decimal rate (e.g., 0.50 for 50%) or None if not set
     """
-    value = await get_config(_user_rate_key(user_id))
-    if value is not None:
-        try:
-            return Decimal(value) / Decimal("100")
-        except Exception:
-            return None
-    return None
+    config = await _get_rate_config()
+    return _percent_to_rate(config.get(_user_rate_key(user_id)))
 
 
 async def set_user_custom_rate(user_id: str, percent: Decimal) -> bool:
@@ -135,6 +158,7 @@ async def set_user_custom_rate(user_id: str, percent: Decimal) -> bool:
     key = _user_rate_key(user_id)
     description = f"Custom Tier 1 rate for user {user_id}"
     await set_config(key, str(percent), description)
+    invalidate_rate_cache()
     return True
 
 
@@ -146,7 +170,9 @@ async def clear_user_custom_rate(user_id: str) -> bool:
         True if a rate was removed, False if none existed
     """
     from src.db.database import delete_config
-    return await delete_config(_user_rate_key(user_id))
+    removed = await delete_config(_user_rate_key(user_id))
+    invalidate_rate_cache()
+    return removed
 
 
 def get_chain_family_for_platform(platform: Platform) -> ChainFamily:
@@ -220,13 +246,16 @@ async def distribute_referral_fees(
     if fee_amount <= 0:
         return distributions
 
-    # Get the referral chain for this user
+    # Get the referral chain for this user (one query)
     referral_chain = await get_referral_chain(trader_user_id)
+    if not referral_chain:
+        return distributions
 
-    # Get current tier commission rates (may be customized via admin)
+    # Get current tier commission rates (may be customized via admin; cached)
     tier_commissions = await get_tier_commissions()
 
     total_distributed = Decimal("0")
+    credits: list[tuple[int, str, Decimal]] = []
 
     for tier, referrer in enumerate(referral_chain, start=1):
         if tier > 3:
@@ -236,10 +265,8 @@ async def distribute_referral_fees(
         custom_rate = None
         if tier == 1:
             custom_rate = await get_user_custom_rate(referrer.id)
-            if custom_rate is not None:
-                commission_rate = custom_rate
-            else:
-                commission_rate = tier_commissions.get(tier, Decimal("0"))
+        if custom_rate is not None:
+            commission_rate = custom_rate
         else:
             commission_rate = tier_commissions.get(tier, Decimal("0"))
 
@@ -248,15 +275,7 @@ async def distribute_referral_fees(
         )
 
         if commission > 0:
-            await add_referral_earnings(
-                user_id=referrer.id,
-                amount_usdc=str(commission),
-                source_user_id=trader_user_id,
-                order_id=order_id,
-                tier=tier,
-                chain_family=chain_family,
-            )
-
+            credits.append((tier, referrer.id, commission))
             distributions[f"tier{tier}"] = {
                 "user_id": referrer.id,
                 "username": referrer.username,
@@ -265,111 +284,68 @@ async def distribute_referral_fees(
             }
             total_distributed += commission
 
-            logger.info(
-                "Distributed referral commission",
-                tier=tier,
-                referrer_id=referrer.id,
-                amount=str(commission),
-                chain=chain_family.value,
-                trader_id=trader_user_id,
-                custom_rate=float(custom_rate * 100) if custom_rate is not None else None,
-            )
+    # All balances and fee transactions in one transaction
+    credited = await credit_referral_earnings(
+        source_user_id=trader_user_id,
+        order_id=order_id,
+        chain_family=chain_family,
+        credits=credits,
+    )
+    if not credited:
+        distributions["already_credited"] = True
+        return distributions
+
+    logger.info(
+        "Distributed referral commissions",
+        trader_id=trader_user_id,
+        chain=chain_family.value,
+        tiers=len(credits),
+        total=str(total_distributed),
+    )
 
     distributions["total_distributed"] = str(total_distributed)
     return distributions
 
 
-async def process_trade_fee(
-    trader_telegram_id: int,
-    order_id: str,
+async def track_partner_volume(
+    user_id: str,
     trade_amount_usdc: str,
-    platform: Platform,
-) -> dict:
+    fee_usdc: str,
+    job_id: Optional[int] = None,
+) -> Optional[tuple[str, int, Optional[str]]]:
     """
-    Process the complete fee for a trade including referral distributions.
+    Add a trade to the volume of the partner the user is attributed to.
 
     Args:
-        trader_telegram_id: Telegram ID of the trader
-        order_id: The order ID
-        trade_amount_usdc: The trade amount in USDC
-        platform: The trading platform (determines chain for fee tracking)
+        job_id: Post-trade job being run; it is completed together with the
+            update so the trade is counted once (see update_partner_volume)
 
     Returns:
-        Dictionary with fee details and distributions
+        (partner_id, share_bps, group_id) if the user has a partner, else None
     """
-    # Get user
-    user = await get_user_by_telegram_id(trader_telegram_id)
-    if not user:
-        logger.warning("User not found for fee processing", telegram_id=trader_telegram_id)
-        return {
-            "fee": "0",
-            "net_amount": trade_amount_usdc,
-            "distributions": {},
-        }
-
-    # Calculate fee
-    fee = calculate_fee(trade_amount_usdc)
-    net_amount = calculate_net_amount(trade_amount_usdc)
-
-    # Determine chain family from platform
-    chain_family = get_chain_family_for_platform(platform)
-
-    # Distribute to referrers
-    distributions = await distribute_referral_fees(
-        trader_user_id=user.id,
-        order_id=order_id,
-        fee_usdc=fee,
-        chain_family=chain_family,
-    )
-
-    # Track partner revenue if user is attributed to a partner
-    partner_id = None
-    partner_share_bps = None
-    partner_group_id = None
-
     # Get effective revenue share (checks group-specific first, then partner default)
-    share_bps, p_id, group_id = await get_effective_revenue_share(user.id)
-    if share_bps is not None and p_id is not None:
-        try:
-            await update_partner_volume(
-                partner_id=p_id,
-                volume_usdc=Decimal(trade_amount_usdc),
-                fee_usdc=Decimal(fee),
-            )
-            partner_id = p_id
-            partner_share_bps = share_bps
-            partner_group_id = group_id
-            logger.info(
-                "Partner revenue tracked",
-                partner_id=p_id,
-                group_id=group_id,
-                share_bps=share_bps,
-                volume=trade_amount_usdc,
-                fee=fee,
-            )
-        except Exception as e:
-            logger.error("Failed to track partner revenue", error=str(e), partner_id=p_id)
+    share_bps, partner_id, group_id = await get_effective_revenue_share(user_id)
+    if share_bps is None or partner_id is None:
+        return None
 
+    counted = await update_partner_volume(
+        partner_id=partner_id,
+        volume_usdc=Decimal(trade_amount_usdc),
+        fee_usdc=Decimal(fee_usdc),
+        job_id=job_id,
+    )
+    if not counted:
+        logger.info("Partner volume already tracked", partner_id=partner_id, job_id=job_id)
+        return partner_id, share_bps, group_id
     logger.info(
-        "Processed trade fee",
-        trader_id=user.id,
-        trade_amount=trade_amount_usdc,
-        fee=fee,
-        net_amount=net_amount,
-        platform=platform.value,
-        chain=chain_family.value,
-        referral_distributed=distributions["total_distributed"],
+        "Partner revenue tracked",
         partner_id=partner_id,
+        group_id=group_id,
+        share_bps=share_bps,
+        volume=trade_amount_usdc,
+        fee=fee_usdc,
     )
-
-    return {
-        "fee": fee,
-        "net_amount": net_amount,
-        "distributions": distributions,
-        "partner_id": partner_id,
-        "partner_share_bps": partner_share_bps,
-        "partner_group_id": partner_group_id,
-    }
+    return partner_id, share_bps, group_id
 
 
 def can_withdraw(claimable_usdc: str) -> bool:
@@ -0,0 +1,291 @@
+"""
+Cross-platform market matching.
+
+Titles are reduced to word sets (extract_match_key) and pairs of markets on
+different platforms are matched when their Jaccard similarity is high enough
+and they share a minimum number of words.
+
+Titles are turned into binary hashed word vectors (scipy sparse rows) so a
+whole catalog pair is scored with sparse matrix products instead of Python
+set operations:
+
+- Blocking: words are ordered by rarity, and two sets with Jaccard >= t must
+  share at least one word among the first |x| - ceil(t * |x|) + 1 rarest
+  words of each. The product of the two "prefix" matrices gives exactly the
+  candidate pairs, without materializing pairs that only share common words.
+- Scoring: shared word counts for all candidates come from one element-wise
+  product of the full vectors; Jaccard is computed with array arithmetic.
+
+Confirmed matches are kept in a persistent MatchCache so known pairs survive
+restarts and title rewording.
+"""
+
+import math
+import zlib
+from collections import Counter
+from dataclasses import dataclass
+from typing import Iterable, Optional, Sequence
+
+import numpy as np
+from scipy import sparse
+
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Phrases stripped from titles before splitting into words
+STOP_PHRASES = ["will", "win", "beat", "defeat", "vs", "vs.", "to win", "winner", "over", "under"]
+STOP_WORDS = {"the", "a", "an", "to", "in", "on", "at", "be", "or", "and", "?", "of", "for", "-", "by"}
+
+# Default match thresholds (used by the arbitrage scanner)
+MIN_SIMILARITY = 0.4
+MIN_COMMON_WORDS = 3
+
+# Hashed vector width; large enough that collisions within a catalog pair are rare
+N_FEATURES = 2 ** 20
+
+
+def extract_match_key(title: str) -> frozenset[str]:
+    """Extract meaningful words from a market title for matching."""
+    title_lower = title.lower()
+    # Remove common prediction market phrases
+    for phrase in STOP_PHRASES:
+        title_lower = title_lower.replace(phrase, " ")
+
+    words = set(title_lower.split())
+    # Remove stop words and short words
+    return frozenset(w for w in words if w not in STOP_WORDS and len(w) > 2)
+
+
+@dataclass(frozen=True)
+class CandidatePair:
+    """Indexes of two matched markets in their catalogs, with their similarity."""
+    index_a: int
+    index_b: int
+    similarity: float
+    common: int
+
+
+def _hash_word(word: str) -> int:
+    # crc32 rather than hash() so vectors are stable across processes
+    return zlib.crc32(word.encode()) % N_FEATURES
+
+
+def vectorize(keys: Sequence[Iterable[str]]) -> sparse.csr_matrix:
+    """Binary hashed word vectors, one CSR row per key."""
+    rows: list[int] = []
+    cols: list[int] = []
+    for row, key in enumerate(keys):
+        for word in key:
+            rows.append(row)
+            cols.append(_hash_word(word))
+    matrix = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.int32), (rows, cols)),
+        shape=(len(keys), N_FEATURES),
+    )
+    matrix.sum_duplicates()
+    matrix.data[:] = 1
+    return matrix
+
+
+def _prefix_length(size: int, threshold: float, min_common: int) -> int:
+    """Number of rarest words a set must be probed with to find every match.
+
+    Jaccard >= threshold needs ceil(threshold * size) shared words, and
+    min_common shared words are required anyway; whichever is larger decides
+    how many of the rarest words can be skipped.
+    """
+    required = max(math.ceil(threshold * size), min_common)
+    return max(size - required + 1, 0)
+
+
+def rank_words(*catalogs: Iterable[frozenset[str]]) -> dict[str, int]:
+    """Global word order for prefix filtering: rarest words first."""
+    counts: Counter[str] = Counter()
+    for keys in catalogs:
+        for key in keys:
+            counts.update(key)
+    return {word: rank for rank, (word, _) in enumerate(sorted(counts.items(), key=lambda x: (x[1], x[0])))}
+
+
+def prefix_keys(
+    keys: Sequence[frozenset[str]],
+    word_rank: dict[str, int],
+    min_similarity: float = MIN_SIMILARITY,
+    min_common: int = MIN_COMMON_WORDS,
+) -> list[list[str]]:
+    """The rarest words of each key that any match must share."""
+    prefixes = []
+    for key in keys:
+        ordered = sorted(key, key=lambda w: word_rank.get(w, -1))
+        prefixes.append(ordered[:_prefix_length(len(ordered), min_similarity, min_common)])
+    return prefixes
+
+
+def score_pairs(
+    vectors_a: sparse.csr_matrix,
+    vectors_b: sparse.csr_matrix,
+    rows: np.ndarray,
+    cols: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Vectorized (jaccard, common word count) for pairs (rows[k], cols[k])."""
+    if not len(rows):
+        return np.empty(0), np.empty(0, dtype=np.int64)
+    common = np.asarray(vectors_a[rows].multiply(vectors_b[cols]).sum(axis=1)).ravel()
+    sizes_a = np.diff(vectors_a.indptr)[rows]
+    sizes_b = np.diff(vectors_b.indptr)[cols]
+    union = sizes_a + sizes_b - common
+    similarity = np.divide(common, union, out=np.zeros(len(common)), where=union > 0)
+    return similarity, common
+
+
+def match_catalogs(
+    keys_a: Sequence[frozenset[str]],
+    keys_b: Sequence[frozenset[str]],
+    min_similarity: float = MIN_SIMILARITY,
+    min_common: int = MIN_COMMON_WORDS,
+) -> list[CandidatePair]:
+    """
+    Find all pairs (i, j) with Jaccard(keys_a[i], keys_b[j]) >= min_similarity
+    and at least min_common shared words.
+    """
+    if not keys_a or not keys_b:
+        return []
+
+    # Blocking: pairs sharing a prefix word
+    word_rank = rank_words(keys_a, keys_b)
+    prefix_a = vectorize(prefix_keys(keys_a, word_rank, min_similarity, min_common))
+    prefix_b = vectorize(prefix_keys(keys_b, word_rank, min_similarity, min_common))
+    candidates = (prefix_a @ prefix_b.T).tocoo()
+
+    # Scoring: exact overlap on the full vectors
+    similarity, common = score_pairs(vectorize(keys_a), vectorize(keys_b), candidates.row, candidates.col)
+    keep = np.flatnonzero((common >= min_common) & (similarity >= min_similarity))
+    return [
+        CandidatePair(int(candidates.row[k]), int(candidates.col[k]), float(similarity[k]), int(common[k]))
+        for k in keep
+    ]
+
+
+def similarity_matrix(
+    keys_a: Sequence[Iterable[str]],
+    keys_b: Sequence[Iterable[str]],
+    min_similarity: float = MIN_SIMILARITY,
+) -> sparse.csr_matrix:
+    """All pairwise Jaccard similarities >= min_similarity as a sparse matrix.
+
+    Computes one sparse product of the full vectors, so it is best suited to
+    small catalogs; use match_catalogs for full platform catalogs.
+    """
+    vectors_a = vectorize(keys_a)
+    vectors_b = vectorize(keys_b)
+    overlap = (vectors_a @ vectors_b.T).tocoo()
+    sizes_a = np.diff(vectors_a.indptr)
+    sizes_b = np.diff(vectors_b.indptr)
+    similarity = overlap.data / (sizes_a[overlap.row] + sizes_b[overlap.col] - overlap.data)
+    keep = similarity >= min_similarity
+    return sparse.csr_matrix(
+        (similarity[keep], (overlap.row[keep], overlap.col[keep])),
+        shape=overlap.shape,
+    )
+
+
+# ===================
+# Confirmed Match Cache
+# ===================
+
+MarketRef = tuple[str, str]  # (platform value, market identifier)
+
+
+class MatchCache:
+    """
+    Confirmed cross-platform matches, persisted in the market_matches table.
+
+    Pairs are stored with their two (platform, market_id) sides in canonical
+    order. New matches are queued and written in batches by flush().
+
+    Only matches from an authoritative source are kept. Title-similarity
+    matches are heuristic and are recomputed from the current catalogs each
+    cycle instead, so a false positive disappears once the titles or the
+    threshold no longer produce it.
+    """
+
+    CONFIRMED_SOURCES = ("dome",)
+
+    def __init__(self):
+        self._pairs: dict[tuple[MarketRef, MarketRef], str] = {}  # pair -> source
+        self._by_market: dict[MarketRef, set[MarketRef]] = {}
+        self._pending: list[dict] = []
+        self._loaded = False
+
+    def __len__(self) -> int:
+        return len(self._pairs)
+
+    @staticmethod
+    def _canonical(a: MarketRef, b: MarketRef) -> tuple[MarketRef, MarketRef]:
+        return (a, b) if a <= b else (b, a)
+
+    def _remember(self, a: MarketRef, b: MarketRef, source: str) -> bool:
+        pair = self._canonical(a, b)
+        if pair in self._pairs:
+            return False
+        self._pairs[pair] = source
+        self._by_market.setdefault(a, set()).add(b)
+        self._by_market.setdefault(b, set()).add(a)
+        return True
+
+    def add(self, a: MarketRef, b: MarketRef, similarity: Optional[float], source: str) -> None:
+        """Record a confirmed match; new pairs are queued for the next flush."""
+        if source not in self.CONFIRMED_SOURCES:
+            raise ValueError(f"Match source {source!r} is not authoritative")
+        if not self._remember(a, b, source):
+            return
+        (platform_a, market_a), (platform_b, market_b) = self._canonical(a, b)
+        self._pending.append({
+            "platform_a": platform_a,
+            "market_id_a": market_a,
+            "platform_b": platform_b,
+            "market_id_b": market_b,
+            "similarity": similarity,
+            "source": source,
+        })
+
+    def matches_for(self, market: MarketRef) -> set[MarketRef]:
+        """Markets confirmed to match the given market."""
+        return self._by_market.get(market, set())
+
+    async def load(self) -> None:
+        """Load all confirmed matches from the database (once)."""
+        if self._loaded:
+            return
+        from src.db.database import get_market_matches
+
+        for row in await get_market_matches():
+            # Rows from heuristic sources (older title matches) are not reused
+            if row.source not in self.CONFIRMED_SOURCES:
+                continue
+            self._remember(
+                (row.platform_a, row.market_id_a),
+                (row.platform_b, row.market_id_b),
+                row.source,
+            )
+        self._loaded = True
+        logger.info("Market match cache loaded", pairs=len(self._pairs))
+
+    async def flush(self) -> int:
+        """Write queued matches in one batch. Returns number of pairs written."""
+        if not self._pending:
+            return 0
+        from src.db.database import save_market_matches
+
+        batch, self._pending = self._pending, []
+        try:
+            await save_market_matches(batch)
+        except Exception:
+            self._pending = batch + self._pending
+            raise
+        return len(batch)
+
+
+# Global match cache instance
+match_cache = MatchCache()
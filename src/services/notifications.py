@@ -0,0 +1,339 @@
+"""
+Queued Telegram notification dispatcher.
+
+Alert, arbitrage and position notifications are enqueued instead of being
+sent inline by the code that detects them. A pool of workers drains the
+queue while respecting Telegram's limits:
+
+- global: ~30 messages/second per bot (we stay a little below)
+- per chat: ~1 message/second
+
+A RetryAfter from Telegram pauses every worker for the requested time and
+the message is re-queued. Identical notifications for the same chat within
+the dedup window are dropped at enqueue time.
+"""
+
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Any, Optional
+
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class TelegramRateLimiter:
+    """
+    Reservation-based limiter for the global and per-chat send rates.
+
+    Each acquire reserves the next free slot for both the bot and the chat
+    and sleeps until it, so concurrent workers are spaced out without a
+    shared lock. pause() holds every sender back after a RetryAfter.
+    """
+
+    def __init__(self, global_rate: float = 25.0, per_chat_interval: float = 1.0):
+        self.global_interval = 1.0 / global_rate
+        self.per_chat_interval = per_chat_interval
+        self._next_global = 0.0
+        self._next_chat: dict[int, float] = {}
+
+    def pause(self, seconds: float) -> None:
+        """Hold all sends for the given number of seconds."""
+        self._next_global = max(self._next_global, time.monotonic() + seconds)
+
+    async def acquire(self, chat_id: int) -> None:
+        """Wait until a message may be sent to chat_id."""
+        now = time.monotonic()
+        slot = max(now, self._next_global, self._next_chat.get(chat_id, 0.0))
+        self._next_global = max(self._next_global, slot) + self.global_interval
+        self._next_chat[chat_id] = slot + self.per_chat_interval
+
+        if len(self._next_chat) > 10000:
+            self._next_chat = {c: t for c, t in self._next_chat.items() if t > now}
+
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+def retry_after_seconds(error) -> float:
+    """Seconds to wait from a telegram RetryAfter (int or timedelta depending on version)."""
+    retry_after = error.retry_after
+    if isinstance(retry_after, timedelta):
+        return retry_after.total_seconds()
+    return float(retry_after)
+
+
+@dataclass
+class Notification:
+    """One queued Telegram message."""
+    chat_id: int
+    text: str
+    kind: str = "generic"  # alert / arbitrage / position
+    parse_mode: Optional[str] = "HTML"
+    reply_markup: Any = None
+    dedup_key: Optional[str] = None
+    attempts: int = 0
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+class NotificationDispatcher:
+    """Queue + worker pool that sends notifications within Telegram's rate limits."""
+
+    def __init__(
+        self,
+        rate_limiter: TelegramRateLimiter,
+        workers: int = 8,
+        queue_size: int = 10000,
+        dedup_window: float = 60.0,
+        max_attempts: int = 3,
+        stats_interval: float = 60.0,
+    ):
+        self.rate_limiter = rate_limiter
+        self.workers = workers
+        self.dedup_window = dedup_window
+        self.max_attempts = max_attempts
+        self.stats_interval = stats_interval
+
+        self._bot = None
+        self._queue: asyncio.Queue[Notification] = asyncio.Queue(maxsize=queue_size)
+        self._tasks: list[asyncio.Task] = []
+        self._recent: dict[str, float] = {}  # dedup key -> expiry
+        self._running = False
+
+        # Metrics
+        self._counts = {"sent": 0, "failed": 0, "retried": 0, "deduplicated": 0, "dropped": 0}
+        self._queue_latency: deque[float] = deque(maxlen=1000)  # enqueue -> sent
+        self._send_latency: deque[float] = deque(maxlen=1000)  # API call only
+
+    def set_bot(self, bot) -> None:
+        """Set the Telegram bot used to send messages."""
+        self._bot = bot
+
+    async def start(self) -> None:
+        """Start the worker pool."""
+        if self._running:
+            return
+        self._running = True
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        if self.stats_interval > 0:
+            self._tasks.append(asyncio.create_task(self._log_stats()))
+        logger.info("Notification dispatcher started", workers=self.workers)
+
+    async def stop(self, drain_timeout: float = 10.0) -> None:
+        """Give queued messages a chance to go out, then stop the workers."""
+        if not self._running:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=drain_timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Notification queue not drained on shutdown", pending=self._queue.qsize())
+        self._running = False
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        logger.info("Notification dispatcher stopped")
+
+    # ===================
+    # Enqueueing
+    # ===================
+
+    def _is_duplicate(self, key: str) -> bool:
+        now = time.monotonic()
+        if len(self._recent) > 10000:
+            self._recent = {k: t for k, t in self._recent.items() if t > now}
+        if self._recent.get(key, 0.0) > now:
+            return True
+        self._recent[key] = now + self.dedup_window
+        return False
+
+    def notify(
+        self,
+        chat_id: int,
+        text: str,
+        kind: str = "generic",
+        parse_mode: Optional[str] = "HTML",
+        reply_markup: Any = None,
+        dedup_key: Optional[str] = None,
+    ) -> bool:
+        """
+        Queue a message for a chat. Never blocks.
+
+        Args:
+            chat_id: Telegram chat ID
+            text: Message text
+            kind: Notification type, for logs and metrics
+            parse_mode: Telegram parse mode
+            reply_markup: Optional inline keyboard
+            dedup_key: Identifies the event; defaults to the message text
+
+        Returns:
+            True if queued, False if deduplicated or the queue is full
+        """
+        if self._is_duplicate(f"{chat_id}:{dedup_key or text}"):
+            self._counts["deduplicated"] += 1
+            return False
+
+        try:
+            self._queue.put_nowait(Notification(
+                chat_id=chat_id,
+                text=text,
+                kind=kind,
+                parse_mode=parse_mode,
+                reply_markup=reply_markup,
+                dedup_key=dedup_key,
+            ))
+        except asyncio.QueueFull:
+            self._counts["dropped"] += 1
+            logger.warning("Notification queue full, dropping message", kind=kind, chat_id=chat_id)
+            return False
+        return True
+
+    def notify_many(
+        self,
+        chat_ids,
+        text: str,
+        kind: str = "generic",
+        parse_mode: Optional[str] = "HTML",
+        reply_markup: Any = None,
+        dedup_key: Optional[str] = None,
+    ) -> int:
+        """Queue the same message for several chats. Returns number queued."""
+        return sum(
+            self.notify(chat_id, text, kind, parse_mode, reply_markup, dedup_key)
+            for chat_id in chat_ids
+        )
+
+    # ===================
+    # Sending
+    # ===================
+
+    async def _worker(self) -> None:
+        while self._running:
+            notification = await self._queue.get()
+            try:
+                await self._send(notification)
+            except Exception as e:
+                logger.error("Notification worker error", error=str(e))
+            finally:
+                self._queue.task_done()
+
+    async def _send(self, notification: Notification) -> None:
+        from telegram.error import Forbidden, NetworkError, RetryAfter
+
+        if not self._bot:
+            self._counts["failed"] += 1
+            logger.warning("Bot not set, cannot send notification", kind=notification.kind)
+            return
+
+        await self.rate_limiter.acquire(notification.chat_id)
+        notification.attempts += 1
+        started = time.monotonic()
+        try:
+            await self._bot.send_message(
+                chat_id=notification.chat_id,
+                text=notification.text,
+                parse_mode=notification.parse_mode,
+                reply_markup=notification.reply_markup,
+            )
+        except RetryAfter as e:
+            wait = retry_after_seconds(e)
+            self.rate_limiter.pause(wait)
+            logger.warning("Telegram rate limit hit, pausing sends", retry_after=wait)
+            # Being rate limited is not the message's fault; don't count the attempt
+            notification.attempts -= 1
+            self._retry(notification)
+            return
+        except Forbidden:
+            # User blocked the bot; retrying will not help
+            self._counts["failed"] += 1
+            logger.info("Notification recipient blocked the bot", chat_id=notification.chat_id)
+            return
+        except NetworkError as e:
+            logger.warning("Notification send failed", kind=notification.kind, error=str(e))
+            self._retry(notification)
+            return
+        except Exception as e:
+            self._counts["failed"] += 1
+            logger.warning(
+                "Failed to send notification",
+                kind=notification.kind,
+                chat_id=notification.chat_id,
+                error=str(e),
+            )
+            return
+
+        finished = time.monotonic()
+        self._counts["sent"] += 1
+        self._send_latency.append(finished - started)
+        self._queue_latency.append(finished - notification.enqueued_at)
+
+    def _retry(self, notification: Notification) -> None:
+        if notification.attempts >= self.max_attempts:
+            self._counts["failed"] += 1
+            logger.warning("Giving up on notification", kind=notification.kind, chat_id=notification.chat_id)
+            return
+        try:
+            self._queue.put_nowait(notification)
+            self._counts["retried"] += 1
+        except asyncio.QueueFull:
+            self._counts["dropped"] += 1
+
+    # ===================
+    # Metrics
+    # ===================
+
+    @staticmethod
+    def _latency_stats(samples: deque) -> dict:
+        if not samples:
+            return {"avg": None, "p95": None}
+        ordered = sorted(samples)
+        return {
+            "avg": round(sum(ordered) / len(ordered), 3),
+            "p95": round(ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)], 3),
+        }
+
+    def stats(self) -> dict:
+        """Return queue depth, delivery counts and latency (seconds)."""
+        return {
+            "active": self._running,
+            "queue_depth": self._queue.qsize(),
+            **self._counts,
+            "queue_latency": self._latency_stats(self._queue_latency),
+            "send_latency": self._latency_stats(self._send_latency),
+        }
+
+    async def _log_stats(self) -> None:
+        """Log stats periodically (the bot process has no HTTP endpoint of its own)."""
+        while self._running:
+            await asyncio.sleep(self.stats_interval)
+            logger.info("Notification dispatcher stats", **self.stats())
+
+
+def _create_dispatcher() -> NotificationDispatcher:
+    from src.config import settings
+    return NotificationDispatcher(
+        TelegramRateLimiter(
+            global_rate=settings.notification_global_rate,
+            per_chat_interval=settings.notification_per_chat_interval,
+        ),
+        workers=settings.notification_workers,
+        queue_size=settings.notification_queue_size,
+        dedup_window=settings.notification_dedup_window,
+        stats_interval=settings.notification_stats_interval,
+    )
+
+
+# Global dispatcher instance (created on first use so settings load lazily)
+_dispatcher: Optional[NotificationDispatcher] = None
+
+
+def get_notification_dispatcher() -> NotificationDispatcher:
+    """Get the global notification dispatcher."""
+    global _dispatcher
+    if _dispatcher is None:
+        _dispatcher = _create_dispatcher()
+    return _dispatcher
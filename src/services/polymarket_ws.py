@@ -326,6 +326,9 @@ class PolymarketWebSocketManager:
     def __init__(self):
         self._client: Optional[PolymarketWebSocketClient] = None
         self._started = False
+        # Tokens are reference counted across subscribe_market callers
+        self._token_refs: dict[str, int] = {}
+        self._unsubscribe_tasks: set[asyncio.Task] = set()
 
     @property
     def is_connected(self) -> bool:
@@ -364,6 +367,9 @@ class PolymarketWebSocketManager:
         """
         Subscribe to real-time updates for a market.
 
+        Subscriptions are reference counted per token; each subscribe_market
+        needs a matching unsubscribe_market (or release_market).
+
         Args:
             market_id: Market identifier
             yes_token: YES outcome token ID
@@ -383,6 +389,8 @@ class PolymarketWebSocketManager:
         if no_token:
             tokens.append(no_token)
 
+        for token in tokens:
+            self._token_refs[token] = self._token_refs.get(token, 0) + 1
         await self._client.subscribe(tokens)
 
         logger.debug(
@@ -396,15 +404,38 @@ class PolymarketWebSocketManager:
         yes_token: str,
         no_token: Optional[str] = None,
     ) -> None:
-        """Unsubscribe from a market's updates."""
-        if not self._client:
-            return
-
-        tokens = [yes_token]
-        if no_token:
-            tokens.append(no_token)
+        """Release a market subscription; tokens nothing else holds are unsubscribed."""
+        released = self._release([yes_token, no_token])
+        if released and self._client:
+            await self._client.unsubscribe(released)
 
-        await self._client.unsubscribe(tokens)
+    def release_market(
+        self,
+        yes_token: str,
+        no_token: Optional[str] = None,
+    ) -> None:
+        """unsubscribe_market for synchronous callers; the unsubscribe is sent in the background."""
+        released = self._release([yes_token, no_token])
+        if released and self._client:
+            task = asyncio.create_task(self._client.unsubscribe(released))
+            self._unsubscribe_tasks.add(task)
+            task.add_done_callback(self._unsubscribe_tasks.discard)
+
+    def _release(self, tokens: list[Optional[str]]) -> list[str]:
+        """Drop one reference per token. Returns the tokens no longer referenced."""
+        released = []
+        for token in tokens:
+            if not token or token not in self._token_refs:
+                continue
+            self._token_refs[token] -= 1
+            if self._token_refs[token] <= 0:
+                del self._token_refs[token]
+                released.append(token)
+        return released
+
+    def subscription_count(self) -> int:
+        """Number of tokens currently subscribed through the manager."""
+        return len(self._token_refs)
 
     async def get_live_price(
         self,
@@ -0,0 +1,271 @@
+"""
+Post-trade pipeline.
+
+Work that follows a confirmed trade (referral fees, partner volume and the
+marketing postback) is written to the post_trade_jobs outbox table and done
+by background workers, so the user's confirmation only waits for the trade
+itself. Each piece is its own job so a failing postback does not redo fees.
+
+Jobs survive restarts: a job claimed by a worker that dies is claimed again
+once its lease expires. Failures are retried with exponential backoff and
+the job is kept with status "failed" after max_attempts.
+
+Jobs for a trade are written in the same transaction that marks its order
+confirmed (confirm_trade), so a crash cannot confirm a trade and lose them.
+
+Jobs run at least once, so handlers must tolerate a repeat: referral credits
+are unique per (order, tier) and the postback is sent once per user. Partner
+volume deletes its job in the transaction that counts it (handlers get the
+job id as payload["job_id"]) and skips the update if the job is gone.
+"""
+
+import asyncio
+import json
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Awaitable, Callable, Optional
+
+from src.db.models import Platform
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+JobHandler = Callable[[dict], Awaitable[None]]
+
+
+# ===================
+# Job Handlers
+# ===================
+
+async def _referral_fees(payload: dict) -> None:
+    from src.services.fee import distribute_referral_fees, get_chain_family_for_platform
+
+    await distribute_referral_fees(
+        trader_user_id=payload["user_id"],
+        order_id=payload["order_id"],
+        fee_usdc=payload["fee_usdc"],
+        chain_family=get_chain_family_for_platform(Platform(payload["platform"])),
+    )
+
+
+async def _partner_volume(payload: dict) -> None:
+    from src.services.fee import track_partner_volume
+
+    await track_partner_volume(
+        payload["user_id"],
+        payload["trade_amount_usdc"],
+        payload["fee_usdc"],
+        job_id=payload.get("job_id"),
+    )
+
+
+async def _trade_postback(payload: dict) -> None:
+    from src.services.postback import check_and_send_trade_postback
+
+    await check_and_send_trade_postback(
+        telegram_id=payload["telegram_id"],
+        trade_amount=Decimal(payload["trade_amount_usdc"]),
+        fee_amount=Decimal(payload["fee_usdc"]),
+    )
+
+
+HANDLERS: dict[str, JobHandler] = {
+    "referral_fees": _referral_fees,
+    "partner_volume": _partner_volume,
+    "trade_postback": _trade_postback,
+}
+
+
+class PostTradePipeline:
+    """Durable post-trade job queue drained by a pool of workers."""
+
+    def __init__(
+        self,
+        handlers: dict[str, JobHandler],
+        workers: int = 4,
+        batch_size: int = 10,
+        poll_interval: float = 5.0,
+        lease_seconds: float = 300.0,
+        max_attempts: int = 8,
+        retry_base: float = 5.0,
+    ):
+        self.handlers = handlers
+        self.workers = workers
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+
+        self._tasks: list[asyncio.Task] = []
+        self._wakeup = asyncio.Event()
+        self._running = False
+        self._counts = {"enqueued": 0, "completed": 0, "retried": 0, "failed": 0}
+
+    async def start(self) -> None:
+        """Start the worker pool (jobs left from before a restart are picked up)."""
+        if self._running:
+            return
+        self._running = True
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        logger.info("Post-trade pipeline started", workers=self.workers)
+
+    async def stop(self) -> None:
+        """Stop the workers. Unfinished jobs stay in the outbox for the next start."""
+        if not self._running:
+            return
+        self._running = False
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        logger.info("Post-trade pipeline stopped")
+
+    # ===================
+    # Enqueueing
+    # ===================
+
+    async def enqueue(self, jobs: list[tuple[str, dict]]) -> None:
+        """Write jobs to the outbox in one transaction and wake the workers."""
+        from src.db.database import enqueue_post_trade_jobs
+
+        await enqueue_post_trade_jobs([(kind, json.dumps(payload)) for kind, payload in jobs])
+        self._counts["enqueued"] += len(jobs)
+        self._wakeup.set()
+
+    async def confirm_trade(
+        self,
+        order_id: str,
+        tx_hash: Optional[str],
+        user_id: str,
+        telegram_id: int,
+        trade_amount_usdc: str,
+        platform: Platform,
+        send_postback: bool = True,
+        queue_jobs: bool = True,
+    ) -> str:
+        """
+        Mark an order confirmed and queue its fee distribution, partner volume
+        and postback in the same transaction.
+
+        Args:
+            queue_jobs: False for an order that was not filled (no fees are due)
+
+        Returns:
+            The trading fee in USDC (for the confirmation message)
+        """
+        from src.db.database import update_order
+        from src.db.models import OrderStatus
+        from src.services.fee import calculate_fee
+
+        fee = calculate_fee(trade_amount_usdc)
+        jobs = []
+        if queue_jobs:
+            payload = {
+                "user_id": user_id,
+                "telegram_id": telegram_id,
+                "order_id": order_id,
+                "trade_amount_usdc": trade_amount_usdc,
+                "fee_usdc": fee,
+                "platform": platform.value,
+            }
+            jobs = [("referral_fees", payload), ("partner_volume", payload)]
+            if send_postback:
+                jobs.append(("trade_postback", payload))
+
+        await update_order(
+            order_id,
+            status=OrderStatus.CONFIRMED,
+            tx_hash=tx_hash,
+            executed_at=datetime.now(timezone.utc),
+            post_trade_jobs=[(kind, json.dumps(p)) for kind, p in jobs],
+        )
+        if jobs:
+            self._counts["enqueued"] += len(jobs)
+            self._wakeup.set()
+        return fee
+
+    # ===================
+    # Workers
+    # ===================
+
+    async def _worker(self) -> None:
+        from src.db.database import claim_post_trade_jobs
+
+        while self._running:
+            # Cleared before claiming so an enqueue during the claim is not missed
+            self._wakeup.clear()
+            try:
+                jobs = await claim_post_trade_jobs(self.batch_size, self.lease_seconds)
+            except Exception as e:
+                logger.error("Failed to claim post-trade jobs", error=str(e))
+                jobs = []
+
+            if not jobs:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            for job in jobs:
+                await self._run(job)
+
+    async def _run(self, job) -> None:
+        from src.db.database import complete_post_trade_job, fail_post_trade_job
+
+        handler = self.handlers.get(job.kind)
+        try:
+            if handler is None:
+                raise ValueError(f"No handler for job kind {job.kind!r}")
+            await handler({**json.loads(job.payload), "job_id": job.id})
+        except Exception as e:
+            retry_in: Optional[float] = None
+            if handler is not None and job.attempts < self.max_attempts:
+                retry_in = self.retry_base * 2 ** (job.attempts - 1)
+            self._counts["retried" if retry_in is not None else "failed"] += 1
+            logger.warning(
+                "Post-trade job failed",
+                job_id=job.id,
+                kind=job.kind,
+                attempt=job.attempts,
+                retry_in=retry_in,
+                error=str(e),
+            )
+            try:
+                await fail_post_trade_job(job.id, str(e), retry_in)
+            except Exception as db_error:
+                # The lease expires and the job is claimed again
+                logger.error("Failed to record post-trade job failure", job_id=job.id, error=str(db_error))
+            return
+
+        try:
+            await complete_post_trade_job(job.id)
+            self._counts["completed"] += 1
+        except Exception as e:
+            logger.error("Failed to complete post-trade job", job_id=job.id, error=str(e))
+
+    def stats(self) -> dict:
+        """Return job counts since startup."""
+        return {"active": self._running, **self._counts}
+
+
+def _create_pipeline() -> PostTradePipeline:
+    from src.config import settings
+    return PostTradePipeline(
+        HANDLERS,
+        workers=settings.post_trade_workers,
+        max_attempts=settings.post_trade_max_attempts,
+    )
+
+
+# Global pipeline instance (created on first use so settings load lazily)
+_pipeline: Optional[PostTradePipeline] = None
+
+
+def get_post_trade_pipeline() -> PostTradePipeline:
+    """Get the global post-trade pipeline."""
+    global _pipeline
+    if _pipeline is None:
+        _pipeline = _create_pipeline()
+    return _pipeline
@@ -215,7 +215,7 @@ async def store_click_id(telegram_id: int, click_id: str) -> bool:
     Returns:
         True if this is a new click_id attribution
     """
-    from src.db.database import async_session_factory
+    from src.db.database import async_session_factory, invalidate_identity
     from src.db.models import User
     from sqlalchemy import select
 
@@ -247,6 +247,7 @@ async def store_click_id(telegram_id: int, click_id: str) -> bool:
             # Store click_id
             user.cm_click_id = click_id
             await session.commit()
+            invalidate_identity(telegram_id=telegram_id)
 
             logger.info(
                 "Stored click_id for user",
@@ -260,6 +261,7 @@ async def store_click_id(telegram_id: int, click_id: str) -> bool:
                 if success:
                     user.cm_registration_sent = True
                     await session.commit()
+                    invalidate_identity(telegram_id=telegram_id)
 
             return True
 
@@ -290,7 +292,7 @@ async def check_and_send_trade_postback(
     Returns:
         True if qualification postback was sent
     """
-    from src.db.database import async_session_factory
+    from src.db.database import async_session_factory, invalidate_identity
     from src.db.models import User
     from sqlalchemy import select
 
@@ -331,6 +333,7 @@ async def check_and_send_trade_postback(
                 user.cm_qualification_sent = True
                 user.cm_qualified_at = datetime.now(timezone.utc)
                 await session.commit()
+                invalidate_identity(telegram_id=telegram_id)
 
                 logger.info(
                     "Trade postback sent",
@@ -0,0 +1,326 @@
+"""
+In-memory price history for live-fed tokens.
+
+Every tick that reaches the PriceCache (Polymarket WebSocket, REST poller) is
+appended to a fixed-size per-token ring buffer backed by NumPy arrays. Chart
+endpoints aggregate the buffer into OHLC candles on the fly instead of asking
+Dome or the platform API for every view.
+"""
+
+import time
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Optional
+
+import numpy as np
+
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Supported candle intervals (label -> seconds)
+CANDLE_INTERVALS = {
+    "1m": 60,
+    "5m": 300,
+    "1h": 3600,
+}
+
+
+@dataclass
+class Candle:
+    """OHLC candle built from live ticks."""
+    timestamp: int  # Bucket start (unix seconds)
+    open: Decimal
+    high: Decimal
+    low: Decimal
+    close: Decimal
+    ticks: int
+
+
+class TickRingBuffer:
+    """Fixed-size ring buffer of (timestamp, bid, ask, last) ticks for one token.
+
+    Missing values are stored as NaN. Ticks closer together than
+    min_spacing seconds overwrite the newest slot, so a chatty feed cannot
+    flush the buffer in a few seconds. Ticks older than the newest one are
+    dropped, keeping the buffer chronological.
+    """
+
+    def __init__(self, capacity: int, min_spacing: float = 1.0):
+        self.capacity = capacity
+        self.min_spacing = min_spacing
+        self._ts = np.zeros(capacity, dtype=np.float64)
+        self._bid = np.full(capacity, np.nan, dtype=np.float32)
+        self._ask = np.full(capacity, np.nan, dtype=np.float32)
+        self._last = np.full(capacity, np.nan, dtype=np.float32)
+        self._next = 0  # Slot the next tick is written to
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def oldest_timestamp(self) -> Optional[float]:
+        if not self._count:
+            return None
+        return float(self._ts[(self._next - self._count) % self.capacity])
+
+    @property
+    def newest_timestamp(self) -> Optional[float]:
+        if not self._count:
+            return None
+        return float(self._ts[(self._next - 1) % self.capacity])
+
+    def append(
+        self,
+        timestamp: float,
+        bid: Optional[float],
+        ask: Optional[float],
+        last: Optional[float],
+    ) -> None:
+        """Append a tick (or overwrite the newest one if it is too recent)."""
+        newest = self.newest_timestamp
+        if newest is not None and timestamp < newest:
+            return
+        if newest is not None and timestamp - newest < self.min_spacing:
+            slot = (self._next - 1) % self.capacity
+        else:
+            slot = self._next
+            self._next = (self._next + 1) % self.capacity
+            self._count = min(self._count + 1, self.capacity)
+
+        self._ts[slot] = timestamp
+        self._bid[slot] = np.nan if bid is None else bid
+        self._ask[slot] = np.nan if ask is None else ask
+        self._last[slot] = np.nan if last is None else last
+
+    def extend(
+        self,
+        timestamps: np.ndarray,
+        bids: np.ndarray,
+        asks: np.ndarray,
+        lasts: np.ndarray,
+    ) -> None:
+        """Append many ticks at once (missing values as NaN).
+
+        Equivalent to calling append for each tick in order, but vectorized,
+        for bulk loads such as warming from the tick store.
+        """
+        if not len(timestamps):
+            return
+        newest = self.newest_timestamp
+
+        # append drops a tick older than the newest kept one, i.e. older than
+        # anything before it
+        prior_max = np.maximum.accumulate(np.r_[-np.inf if newest is None else newest, timestamps[:-1]])
+        keep = timestamps >= prior_max
+        ts, bid, ask, last = timestamps[keep], bids[keep], asks[keep], lasts[keep]
+        if not len(ts):
+            return
+
+        # A tick within min_spacing of the previous one overwrites its slot, so
+        # each run of close ticks ends up as its last tick
+        previous = np.r_[-np.inf if newest is None else newest, ts[:-1]]
+        new_slot = ts - previous >= self.min_spacing
+        run_ends = np.r_[np.flatnonzero(new_slot[1:]), len(ts) - 1]
+        if new_slot[0]:
+            added = run_ends[-self.capacity:]
+            overwrite = None
+        else:
+            # The first run overwrites the current newest slot
+            added = run_ends[1:][-self.capacity:]
+            overwrite = run_ends[0]
+
+        if overwrite is not None:
+            slot = (self._next - 1) % self.capacity
+            self._ts[slot], self._bid[slot] = ts[overwrite], bid[overwrite]
+            self._ask[slot], self._last[slot] = ask[overwrite], last[overwrite]
+        if len(added):
+            slots = (self._next + np.arange(len(added))) % self.capacity
+            self._ts[slots] = ts[added]
+            self._bid[slots] = bid[added]
+            self._ask[slots] = ask[added]
+            self._last[slots] = last[added]
+            self._next = int((self._next + len(added)) % self.capacity)
+            self._count = min(self._count + len(added), self.capacity)
+
+    def snapshot(
+        self,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Return (timestamps, bids, asks, lasts) in chronological order, optionally clipped."""
+        if not self._count:
+            empty = np.empty(0)
+            return empty, empty, empty, empty
+
+        order = (np.arange(self._count) + self._next - self._count) % self.capacity
+        ts = self._ts[order]
+        bid, ask, last = self._bid[order], self._ask[order], self._last[order]
+
+        mask = np.ones(len(ts), dtype=bool)
+        if start is not None:
+            mask &= ts >= start
+        if end is not None:
+            mask &= ts <= end
+        return ts[mask], bid[mask], ask[mask], last[mask]
+
+
+def tick_prices(bid: np.ndarray, ask: np.ndarray, last: np.ndarray) -> np.ndarray:
+    """Price series for candles: bid/ask midpoint, else whichever side or last trade exists."""
+    mid = (bid.astype(np.float64) + ask) / 2
+    one_side = np.where(np.isnan(bid), ask, bid)
+    return np.where(np.isnan(mid), np.where(np.isnan(one_side), last, one_side), mid)
+
+
+def aggregate_ohlc(timestamps: np.ndarray, prices: np.ndarray, interval: int) -> list[Candle]:
+    """Aggregate a chronological tick series into OHLC candles of interval seconds."""
+    valid = ~np.isnan(prices)
+    timestamps, prices = timestamps[valid], prices[valid]
+    if not len(timestamps):
+        return []
+
+    buckets = (timestamps // interval).astype(np.int64)
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(buckets)] - 1
+
+    opens = prices[starts]
+    closes = prices[ends]
+    highs = np.maximum.reduceat(prices, starts)
+    lows = np.minimum.reduceat(prices, starts)
+    counts = np.diff(np.r_[starts, len(buckets)])
+
+    def dec(value: float) -> Decimal:
+        return Decimal(str(round(float(value), 4)))
+
+    return [
+        Candle(
+            timestamp=int(buckets[s] * interval),
+            open=dec(o),
+            high=dec(h),
+            low=dec(lo),
+            close=dec(c),
+            ticks=int(n),
+        )
+        for s, o, h, lo, c, n in zip(starts, opens, highs, lows, closes, counts)
+    ]
+
+
+class PriceHistory:
+    """Per-token ring buffers fed from PriceCache updates."""
+
+    def __init__(self, capacity: int = 4096, max_tokens: int = 2000, min_spacing: float = 1.0):
+        self.capacity = capacity
+        self.max_tokens = max_tokens
+        self.min_spacing = min_spacing
+        self._buffers: dict[str, TickRingBuffer] = {}
+
+    def _key(self, platform: str, token_id: str) -> str:
+        return f"{platform}:{token_id}"
+
+    def record(self, update) -> None:
+        """Record a PriceUpdate tick. Registered as a PriceCache tick listener."""
+        self.append(
+            update.platform,
+            update.token_id,
+            update.timestamp,
+            update.best_bid,
+            update.best_ask,
+            update.last_trade_price,
+        )
+
+    def append(
+        self,
+        platform: str,
+        token_id: str,
+        timestamp: float,
+        bid: Optional[Decimal],
+        ask: Optional[Decimal],
+        last: Optional[Decimal],
+    ) -> None:
+        """Append a tick for a token, creating its buffer on first sight."""
+        self._buffer_for(platform, token_id).append(
+            timestamp,
+            float(bid) if bid is not None else None,
+            float(ask) if ask is not None else None,
+            float(last) if last is not None else None,
+        )
+
+    def extend(
+        self,
+        platform: str,
+        token_id: str,
+        timestamps: np.ndarray,
+        bids: np.ndarray,
+        asks: np.ndarray,
+        lasts: np.ndarray,
+    ) -> None:
+        """Append many ticks for a token at once (missing values as NaN)."""
+        self._buffer_for(platform, token_id).extend(timestamps, bids, asks, lasts)
+
+    def _buffer_for(self, platform: str, token_id: str) -> TickRingBuffer:
+        """A token's buffer, created (evicting the stalest if full) on first sight."""
+        key = self._key(platform, token_id)
+        buffer = self._buffers.get(key)
+        if buffer is None:
+            if len(self._buffers) >= self.max_tokens:
+                self._evict_stalest()
+            buffer = TickRingBuffer(self.capacity, self.min_spacing)
+            self._buffers[key] = buffer
+        return buffer
+
+    def _evict_stalest(self) -> None:
+        """Drop the buffer that has gone longest without a tick."""
+        stalest = min(self._buffers, key=lambda k: self._buffers[k].newest_timestamp or 0)
+        del self._buffers[stalest]
+
+    def get_buffer(self, platform: str, token_id: str) -> Optional[TickRingBuffer]:
+        return self._buffers.get(self._key(platform, token_id))
+
+    def oldest_timestamp(self, platform: str, token_id: str) -> Optional[float]:
+        """Timestamp of the oldest tick held for a token, or None if nothing is held."""
+        buffer = self.get_buffer(platform, token_id)
+        return buffer.oldest_timestamp if buffer else None
+
+    def get_candles(
+        self,
+        platform: str,
+        token_id: str,
+        interval: str = "1m",
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+    ) -> list[Candle]:
+        """Build candles for a token from its buffered ticks.
+
+        Args:
+            platform: Platform name (e.g. "polymarket")
+            token_id: Outcome token ID
+            interval: One of CANDLE_INTERVALS ("1m", "5m", "1h")
+            start: Optional start timestamp (unix seconds)
+            end: Optional end timestamp (unix seconds)
+        """
+        seconds = CANDLE_INTERVALS.get(interval)
+        if seconds is None:
+            raise ValueError(f"Unsupported candle interval: {interval}")
+
+        buffer = self.get_buffer(platform, token_id)
+        if buffer is None:
+            return []
+
+        # Buffers drop out-of-order ticks, so snapshots are already chronological
+        ts, bid, ask, last = buffer.snapshot(start, end)
+        return aggregate_ohlc(ts, tick_prices(bid, ask, last), seconds)
+
+    def stats(self) -> dict:
+        """Return buffer statistics."""
+        now = time.time()
+        oldest = [b.oldest_timestamp for b in self._buffers.values() if len(b)]
+        return {
+            "tokens": len(self._buffers),
+            "ticks": sum(len(b) for b in self._buffers.values()),
+            "max_depth_seconds": round(now - min(oldest), 1) if oldest else None,
+        }
+
+
+# Global price history instance
+price_history = PriceHistory()
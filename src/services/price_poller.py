@@ -3,9 +3,15 @@ Polling-based price updater for platforms without WebSocket support.
 
 Periodically fetches prices from REST APIs and updates the shared price cache.
 Used for: Kalshi, Limitless, Opinion Labs
+
+Each market has its own poll interval, adapted from its subscriber count and
+recent volatility. Every tick the poller takes the most overdue markets per
+platform (up to batch_size) and fetches their orderbooks in one batch, so all
+subscriptions are rotated through instead of only the first few.
 """
 
 import asyncio
+import time
 from decimal import Decimal
 from typing import Optional, Set
 from dataclasses import dataclass
@@ -20,6 +26,12 @@ from src.utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Platforms served by the poller (value of the Platform enum)
+POLLED_PLATFORMS = ("kalshi", "limitless", "opinion")
+
+# Platforms whose orderbook endpoint is keyed by market slug rather than ID
+SLUG_PLATFORMS = ("limitless",)
+
 
 @dataclass
 class MarketSubscription:
@@ -28,6 +40,15 @@ class MarketSubscription:
     market_id: str
     yes_token: Optional[str] = None
     no_token: Optional[str] = None
+    slug: Optional[str] = None
+    slug_attempted_at: Optional[float] = None  # Last catalog lookup for a missing slug
+    subscribers: int = 1
+    # Scheduling state
+    interval: float = 5.0
+    next_poll_at: float = 0.0
+    last_polled_at: Optional[float] = None
+    last_mid: Optional[Decimal] = None
+    volatility: float = 0.0  # EWMA of absolute mid-price change per poll
 
 
 class PricePoller:
@@ -38,15 +59,28 @@ class PricePoller:
     this provides near-real-time price updates via periodic polling.
     """
 
+    # Mid-price change per poll (EWMA) above which a market counts as volatile,
+    # and below which it counts as calm
+    VOLATILE_THRESHOLD = 0.005
+    CALM_THRESHOLD = 0.0005
+    VOLATILITY_ALPHA = 0.3
+
+    # Seconds before a market whose slug lookup failed is looked up again
+    SLUG_RETRY_INTERVAL = 600.0
+
     def __init__(
         self,
         price_cache: PriceCache,
-        poll_interval: float = 5.0,  # Poll every 5 seconds
-        batch_size: int = 10,  # Max markets per batch
+        poll_interval: float = 5.0,  # Base interval for a market with one subscriber
+        batch_size: int = 50,  # Max markets per platform per tick
+        min_interval: float = 1.0,
+        max_interval: float = 60.0,
     ):
         self.price_cache = price_cache
         self.poll_interval = poll_interval
         self.batch_size = batch_size
+        self.min_interval = min_interval
+        self.max_interval = max_interval
 
         self._subscriptions: dict[str, MarketSubscription] = {}  # key -> subscription
         self._running = False
@@ -82,26 +116,131 @@ class PricePoller:
         market_id: str,
         yes_token: Optional[str] = None,
         no_token: Optional[str] = None,
+        slug: Optional[str] = None,
     ) -> None:
-        """Subscribe to price updates for a market."""
+        """Subscribe to price updates for a market.
+
+        Subscriptions are reference counted; each subscribe needs a matching
+        unsubscribe. slug is needed by SLUG_PLATFORMS and looked up from the
+        platform's catalog on first poll when not given.
+        """
         key = self._make_key(platform, market_id)
-        self._subscriptions[key] = MarketSubscription(
-            platform=platform,
-            market_id=market_id,
-            yes_token=yes_token,
-            no_token=no_token,
-        )
+        sub = self._subscriptions.get(key)
+        if sub:
+            sub.subscribers += 1
+            sub.yes_token = yes_token or sub.yes_token
+            sub.no_token = no_token or sub.no_token
+            sub.slug = slug or sub.slug
+        else:
+            sub = MarketSubscription(
+                platform=platform,
+                market_id=market_id,
+                yes_token=yes_token,
+                no_token=no_token,
+                slug=slug,
+            )
+            self._subscriptions[key] = sub
+        sub.interval = self._compute_interval(sub)
         logger.debug("Subscribed to market", platform=platform, market_id=market_id[:20])
 
     def unsubscribe(self, platform: str, market_id: str) -> None:
         """Unsubscribe from a market."""
         key = self._make_key(platform, market_id)
-        self._subscriptions.pop(key, None)
+        sub = self._subscriptions.get(key)
+        if not sub:
+            return
+        sub.subscribers -= 1
+        if sub.subscribers <= 0:
+            del self._subscriptions[key]
+        else:
+            sub.interval = self._compute_interval(sub)
 
     def get_subscribed_platforms(self) -> Set[str]:
         """Get set of platforms with active subscriptions."""
         return {sub.platform for sub in self._subscriptions.values()}
 
+    def subscription_count(self, platform: Optional[str] = None) -> int:
+        """Number of subscribed markets, optionally for one platform."""
+        return sum(
+            1 for sub in self._subscriptions.values()
+            if platform is None or sub.platform == platform
+        )
+
+    # ===================
+    # Scheduling
+    # ===================
+
+    def _compute_interval(self, sub: MarketSubscription) -> float:
+        """Poll interval for a market from its subscriber count and volatility."""
+        interval = self.poll_interval / max(sub.subscribers, 1) ** 0.5
+        if sub.volatility >= self.VOLATILE_THRESHOLD:
+            interval /= 2
+        elif sub.last_mid is not None and sub.volatility < self.CALM_THRESHOLD:
+            interval *= 2
+        return min(max(interval, self.min_interval), self.max_interval)
+
+    def _due_subscriptions(self, now: float) -> dict[str, list[MarketSubscription]]:
+        """Most overdue subscriptions per platform, capped at batch_size each."""
+        by_platform: dict[str, list[MarketSubscription]] = {}
+        for sub in self._subscriptions.values():
+            if sub.next_poll_at <= now:
+                by_platform.setdefault(sub.platform, []).append(sub)
+
+        for platform, subs in by_platform.items():
+            subs.sort(key=lambda s: s.next_poll_at)
+            by_platform[platform] = subs[:self.batch_size]
+        return by_platform
+
+    def _record_poll(self, sub: MarketSubscription, mid: Optional[Decimal], now: float) -> None:
+        """Update volatility and schedule the next poll after a successful fetch."""
+        if mid is not None:
+            if sub.last_mid is not None:
+                change = float(abs(mid - sub.last_mid))
+                sub.volatility = (
+                    self.VOLATILITY_ALPHA * change
+                    + (1 - self.VOLATILITY_ALPHA) * sub.volatility
+                )
+            sub.last_mid = mid
+        sub.last_polled_at = now
+        sub.interval = self._compute_interval(sub)
+        sub.next_poll_at = now + sub.interval
+
+    # ===================
+    # Metrics
+    # ===================
+
+    def get_staleness(self) -> dict[str, Optional[float]]:
+        """Seconds since each market's last successful poll (None if never polled)."""
+        now = time.time()
+        return {
+            key: (now - sub.last_polled_at) if sub.last_polled_at else None
+            for key, sub in self._subscriptions.items()
+        }
+
+    def get_stats(self) -> dict:
+        """Return poller statistics including per-market staleness."""
+        staleness = self.get_staleness()
+        polled = [s for s in staleness.values() if s is not None]
+        return {
+            "active": self._running,
+            "subscriptions": len(self._subscriptions),
+            "never_polled": len(staleness) - len(polled),
+            "max_staleness": round(max(polled), 2) if polled else None,
+            "avg_staleness": round(sum(polled) / len(polled), 2) if polled else None,
+            "markets": {
+                key: {
+                    "staleness": round(staleness[key], 2) if staleness[key] is not None else None,
+                    "interval": round(sub.interval, 2),
+                    "subscribers": sub.subscribers,
+                }
+                for key, sub in self._subscriptions.items()
+            },
+        }
+
+    # ===================
+    # Polling
+    # ===================
+
     async def _poll_loop(self) -> None:
         """Main polling loop."""
         while self._running:
@@ -110,152 +249,120 @@ class PricePoller:
             except Exception as e:
                 logger.error("Polling error", error=str(e))
 
-            await asyncio.sleep(self.poll_interval)
+            # Tick at the finest interval; each market is only fetched when due
+            await asyncio.sleep(self.min_interval)
 
     async def _poll_all_platforms(self) -> None:
-        """Poll all platforms with subscriptions."""
-        # Group subscriptions by platform
-        by_platform: dict[str, list[MarketSubscription]] = {}
-        for sub in self._subscriptions.values():
-            if sub.platform not in by_platform:
-                by_platform[sub.platform] = []
-            by_platform[sub.platform].append(sub)
+        """Poll all platforms with due subscriptions."""
+        due = self._due_subscriptions(time.time())
 
         # Poll each platform concurrently
-        tasks = []
-        for platform, subs in by_platform.items():
-            tasks.append(self._poll_platform(platform, subs))
-
+        tasks = [self._poll_platform(platform, subs) for platform, subs in due.items()]
         if tasks:
             await asyncio.gather(*tasks, return_exceptions=True)
 
     async def _poll_platform(self, platform: str, subscriptions: list[MarketSubscription]) -> None:
-        """Poll a single platform for all subscribed markets."""
-        try:
-            if platform == "kalshi":
-                await self._poll_kalshi(subscriptions)
-            elif platform == "limitless":
-                await self._poll_limitless(subscriptions)
-            elif platform == "opinion":
-                await self._poll_opinion(subscriptions)
-            else:
-                logger.warning("Unknown platform for polling", platform=platform)
-        except Exception as e:
-            logger.error("Platform polling failed", platform=platform, error=str(e))
-
-    async def _poll_kalshi(self, subscriptions: list[MarketSubscription]) -> None:
-        """Poll Kalshi markets via DFlow API."""
+        """Poll a single platform for a batch of subscribed markets."""
         from src.platforms import platform_registry
+        from src.platforms.base import OrderBookRequest
         from src.db.models import Platform, Outcome
 
-        kalshi = platform_registry.get(Platform.KALSHI)
-        if not kalshi:
+        if platform not in POLLED_PLATFORMS:
+            logger.warning("Unknown platform for polling", platform=platform)
             return
 
-        for sub in subscriptions[:self.batch_size]:
-            try:
-                # Get orderbook for YES outcome
-                orderbook = await kalshi.get_orderbook(sub.market_id, Outcome.YES)
-
-                if sub.yes_token:
-                    update = PriceUpdate(
-                        platform="kalshi",
-                        market_id=sub.market_id,
-                        token_id=sub.yes_token,
-                        best_bid=orderbook.best_bid,
-                        best_ask=orderbook.best_ask,
-                    )
-                    await self.price_cache.update_price(update)
-
-                    # Also cache orderbook
-                    ob_update = OrderBookUpdate(
-                        platform="kalshi",
-                        market_id=sub.market_id,
-                        token_id=sub.yes_token,
-                        bids=orderbook.bids,
-                        asks=orderbook.asks,
-                    )
-                    await self.price_cache.update_orderbook(ob_update)
-
-            except Exception as e:
-                logger.debug("Kalshi poll failed", market_id=sub.market_id[:20], error=str(e))
-
-    async def _poll_limitless(self, subscriptions: list[MarketSubscription]) -> None:
-        """Poll Limitless markets."""
-        from src.platforms import platform_registry
-        from src.db.models import Platform, Outcome
+        try:
+            client = platform_registry.get(Platform(platform))
+            if platform in SLUG_PLATFORMS:
+                await self._resolve_slugs(client, subscriptions)
+            orderbooks = await client.get_orderbooks([
+                OrderBookRequest(
+                    market_id=sub.market_id,
+                    outcome=Outcome.YES,
+                    token_id=sub.yes_token,
+                    slug=sub.slug,
+                )
+                for sub in subscriptions
+            ])
+        except Exception as e:
+            logger.error("Platform polling failed", platform=platform, error=str(e))
+            orderbooks = [None] * len(subscriptions)
 
-        limitless = platform_registry.get(Platform.LIMITLESS)
-        if not limitless:
-            return
+        now = time.time()
+        for sub, orderbook in zip(subscriptions, orderbooks):
+            if orderbook is None or (orderbook.best_bid is None and orderbook.best_ask is None):
+                # Retry on the normal cadence rather than every tick; an empty
+                # book is usually a lookup miss, so it is not a fresh price
+                sub.next_poll_at = now + sub.interval
+                logger.debug("Poll failed", platform=platform, market_id=sub.market_id[:20])
+                continue
 
-        for sub in subscriptions[:self.batch_size]:
             try:
-                # Get market data which includes prices
-                market = await limitless.get_market(sub.market_id)
-                if not market:
-                    continue
-
-                # Update YES token price
-                if sub.yes_token and market.yes_price:
-                    update = PriceUpdate(
-                        platform="limitless",
-                        market_id=sub.market_id,
-                        token_id=sub.yes_token,
-                        best_bid=market.yes_price - Decimal("0.01"),  # Estimate spread
-                        best_ask=market.yes_price,
-                    )
-                    await self.price_cache.update_price(update)
-
-                # Update NO token price
-                if sub.no_token and market.no_price:
-                    update = PriceUpdate(
-                        platform="limitless",
-                        market_id=sub.market_id,
-                        token_id=sub.no_token,
-                        best_bid=market.no_price - Decimal("0.01"),
-                        best_ask=market.no_price,
-                    )
-                    await self.price_cache.update_price(update)
-
+                await self._publish(platform, sub, orderbook)
             except Exception as e:
-                logger.debug("Limitless poll failed", market_id=sub.market_id[:20], error=str(e))
-
-    async def _poll_opinion(self, subscriptions: list[MarketSubscription]) -> None:
-        """Poll Opinion Labs markets."""
-        from src.platforms import platform_registry
-        from src.db.models import Platform, Outcome
+                logger.debug("Publishing polled prices failed", market_id=sub.market_id[:20], error=str(e))
 
-        opinion = platform_registry.get(Platform.OPINION)
-        if not opinion:
+            if orderbook.best_bid is not None and orderbook.best_ask is not None:
+                mid = (orderbook.best_bid + orderbook.best_ask) / 2
+            else:
+                mid = orderbook.best_ask or orderbook.best_bid
+            self._record_poll(sub, mid, now)
+
+    async def _resolve_slugs(self, client, subscriptions: list[MarketSubscription]) -> None:
+        """Fill in missing slugs from the platform catalog.
+
+        A market whose lookup fails is not looked up again for
+        SLUG_RETRY_INTERVAL seconds; it is polled without a slug meanwhile.
+        """
+        now = time.time()
+        missing = [
+            sub for sub in subscriptions
+            if not sub.slug and (
+                sub.slug_attempted_at is None
+                or now - sub.slug_attempted_at >= self.SLUG_RETRY_INTERVAL
+            )
+        ]
+        if not missing:
             return
-
-        for sub in subscriptions[:self.batch_size]:
-            try:
-                # Get orderbook
-                orderbook = await opinion.get_orderbook(sub.market_id, Outcome.YES)
-
-                if sub.yes_token:
-                    update = PriceUpdate(
-                        platform="opinion",
-                        market_id=sub.market_id,
-                        token_id=sub.yes_token,
-                        best_bid=orderbook.best_bid,
-                        best_ask=orderbook.best_ask,
-                    )
-                    await self.price_cache.update_price(update)
-
-                    ob_update = OrderBookUpdate(
-                        platform="opinion",
-                        market_id=sub.market_id,
-                        token_id=sub.yes_token,
-                        bids=orderbook.bids,
-                        asks=orderbook.asks,
-                    )
-                    await self.price_cache.update_orderbook(ob_update)
-
-            except Exception as e:
-                logger.debug("Opinion poll failed", market_id=sub.market_id[:20], error=str(e))
+        for sub in missing:
+            sub.slug_attempted_at = now
+        markets = await asyncio.gather(
+            *[client.get_market(sub.market_id) for sub in missing],
+            return_exceptions=True,
+        )
+        for sub, market in zip(missing, markets):
+            if isinstance(market, Exception) or market is None:
+                logger.debug("Market slug lookup failed", market_id=sub.market_id[:20])
+                continue
+            sub.slug = (market.raw_data or {}).get("slug") or market.event_id or None
+
+    async def _publish(self, platform: str, sub: MarketSubscription, orderbook) -> None:
+        """Push a polled YES orderbook (and the implied NO prices) into the price cache."""
+        if sub.yes_token:
+            await self.price_cache.update_price(PriceUpdate(
+                platform=platform,
+                market_id=sub.market_id,
+                token_id=sub.yes_token,
+                best_bid=orderbook.best_bid,
+                best_ask=orderbook.best_ask,
+            ))
+            await self.price_cache.update_orderbook(OrderBookUpdate(
+                platform=platform,
+                market_id=sub.market_id,
+                token_id=sub.yes_token,
+                bids=orderbook.bids,
+                asks=orderbook.asks,
+            ))
+
+        # Binary markets: NO bid = 1 - YES ask, NO ask = 1 - YES bid
+        if sub.no_token and (orderbook.best_bid or orderbook.best_ask):
+            await self.price_cache.update_price(PriceUpdate(
+                platform=platform,
+                market_id=sub.market_id,
+                token_id=sub.no_token,
+                best_bid=Decimal("1") - orderbook.best_ask if orderbook.best_ask else None,
+                best_ask=Decimal("1") - orderbook.best_bid if orderbook.best_bid else None,
+            ))
 
 
 # Global poller instance
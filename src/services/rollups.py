@@ -0,0 +1,137 @@
+"""
+Daily rollup compactor.
+
+Analytics periods read closed UTC days from the daily_trade_rollups and
+daily_fee_rollups tables and only the remaining edges from the raw orders
+and fee_transactions (see rollup_window in src.db.database).
+
+The compactor periodically rolls up each day once it is lag_days old and
+advances the watermark, so every day is computed once rather than on every
+request. The first run backfills from the oldest order. Each cycle also
+reconciles the last reconcile_days rolled-up days against the raw rows and
+rebuilds any day that drifted (e.g. an order confirmed after its day was
+rolled up).
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class RollupCompactor:
+    """Background job keeping the daily rollup tables up to date."""
+
+    def __init__(
+        self,
+        interval: float = 3600.0,
+        lag_days: int = 1,
+        reconcile_days: int = 7,
+    ):
+        self.interval = interval
+        self.lag_days = lag_days
+        self.reconcile_days = reconcile_days
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Start the periodic compaction loop."""
+        if self._task:
+            return
+        self._task = asyncio.create_task(self._loop())
+        logger.info("Rollup compactor started", interval=self.interval)
+
+    async def stop(self) -> None:
+        """Stop the loop. A day being rolled up is rolled back and redone next start."""
+        if not self._task:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await self.compact()
+                await self.reconcile()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Rollup compaction failed", error=str(e))
+            await asyncio.sleep(self.interval)
+
+    def last_closed_day(self):
+        """Most recent UTC day old enough to roll up."""
+        return datetime.now(timezone.utc).date() - timedelta(days=self.lag_days + 1)
+
+    async def compact(self) -> int:
+        """Roll up every closed day after the watermark. Returns number of days rolled up."""
+        from src.db.database import (
+            get_first_activity_day,
+            get_rollup_watermark,
+            rebuild_daily_rollups,
+        )
+
+        watermark = await get_rollup_watermark()
+        if watermark is not None:
+            day = watermark + timedelta(days=1)
+        else:
+            day = await get_first_activity_day()
+            if day is None:
+                return 0
+
+        last_day = self.last_closed_day()
+        rolled = 0
+        while day <= last_day:
+            await rebuild_daily_rollups(day, advance_watermark=True)
+            rolled += 1
+            day += timedelta(days=1)
+
+        if rolled:
+            logger.info("Daily rollups compacted", days=rolled, through=str(last_day))
+        return rolled
+
+    async def reconcile(self) -> list:
+        """Rebuild recent rolled-up days that no longer match the raw rows. Returns those days."""
+        from src.db.database import (
+            find_stale_rollup_days,
+            get_rollup_watermark,
+            rebuild_daily_rollups,
+        )
+
+        watermark = await get_rollup_watermark()
+        if watermark is None:
+            return []
+
+        stale = await find_stale_rollup_days(
+            watermark - timedelta(days=self.reconcile_days - 1),
+            watermark,
+        )
+        for day in stale:
+            await rebuild_daily_rollups(day)
+        if stale:
+            logger.warning("Rebuilt drifted daily rollups", days=[str(d) for d in stale])
+        return stale
+
+
+def _create_compactor() -> RollupCompactor:
+    from src.config import settings
+    return RollupCompactor(
+        interval=settings.rollup_interval,
+        lag_days=settings.rollup_lag_days,
+        reconcile_days=settings.rollup_reconcile_days,
+    )
+
+
+# Global compactor instance (created on first use so settings load lazily)
+_compactor: Optional[RollupCompactor] = None
+
+
+def get_rollup_compactor() -> RollupCompactor:
+    """Get the global rollup compactor."""
+    global _compactor
+    if _compactor is None:
+        _compactor = _create_compactor()
+    return _compactor
@@ -0,0 +1,414 @@
+"""
+Append-only on-disk store for live price ticks.
+
+Ticks from the PriceCache are buffered in memory and appended in batches
+(one write + fsync per flush) to segment files, one per UTC day and
+platform:
+
+    {root}/{YYYYMMDD}/{platform}.ticks   fixed-width records (TICK_DTYPE)
+    {root}/{YYYYMMDD}/{platform}.tokens  token ids, one per line; the line
+                                         number is the record's token index
+
+Segments are read back through np.memmap, so replaying a time range only
+touches the columns it needs. Used to warm the in-memory price history on
+startup and to backtest alerts against real ticks. Day directories older
+than the retention period are pruned by the flush loop.
+"""
+
+import asyncio
+import os
+import shutil
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Iterator, Optional
+
+import numpy as np
+
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# One fixed-width record per tick (20 bytes)
+TICK_DTYPE = np.dtype([
+    ("token", "<u4"),
+    ("ts", "<f8"),
+    ("bid", "<f4"),
+    ("ask", "<f4"),
+])
+
+
+@dataclass
+class TickBatch:
+    """Ticks read from one segment: token ids plus records indexing into them."""
+    platform: str
+    token_ids: list[str]
+    records: np.ndarray  # TICK_DTYPE
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+
+class _Segment:
+    """Writer state for one (day, platform) segment.
+
+    append/index_for run on the event loop; buffers are swapped out with take()
+    there and written by write() in a worker thread.
+    """
+
+    def __init__(self, directory: Path, platform: str):
+        directory.mkdir(parents=True, exist_ok=True)
+        self.ticks_path = directory / f"{platform}.ticks"
+        self.tokens_path = directory / f"{platform}.tokens"
+        self.token_index: dict[str, int] = {}
+        for i, line in enumerate(self._repair()):
+            self.token_index[line] = i
+        self.new_tokens: list[str] = []
+        self.pending: list[tuple[int, float, float, float]] = []
+
+    def _repair(self) -> list[str]:
+        """
+        Cut what a crash mid-write left behind and return the token lines.
+
+        A torn trailing record would misalign every record appended after it,
+        so .ticks is truncated to whole records. Token lines past the last one
+        a record refers to (including a torn last line) are dropped.
+        """
+        last_token = -1
+        if self.ticks_path.exists():
+            size = self.ticks_path.stat().st_size
+            whole = size - size % TICK_DTYPE.itemsize
+            if whole != size:
+                os.truncate(self.ticks_path, whole)
+                logger.warning("Truncated torn tick record", path=str(self.ticks_path), bytes=size - whole)
+            if whole:
+                records = np.memmap(self.ticks_path, dtype=TICK_DTYPE, mode="r", shape=(whole // TICK_DTYPE.itemsize,))
+                last_token = int(records["token"].max())
+                del records
+
+        if not self.tokens_path.exists():
+            return []
+        text = self.tokens_path.read_text()
+        lines = text.splitlines()
+        if text and not text.endswith("\n"):
+            lines.pop()
+        kept = lines[:last_token + 1]
+        if len(kept) != len(lines) or not text.endswith("\n"):
+            with open(self.tokens_path, "w") as f:
+                f.write("".join(f"{t}\n" for t in kept))
+                f.flush()
+                os.fsync(f.fileno())
+        return kept
+
+    def index_for(self, token_id: str) -> int:
+        index = self.token_index.get(token_id)
+        if index is None:
+            index = len(self.token_index)
+            self.token_index[token_id] = index
+            self.new_tokens.append(token_id)
+        return index
+
+    def take(self) -> tuple[list[str], list]:
+        """Swap out the pending tokens and ticks for a write (call on the event loop)."""
+        tokens, self.new_tokens = self.new_tokens, []
+        pending, self.pending = self.pending, []
+        return tokens, pending
+
+    def restore(self, tokens: list[str], pending: list) -> None:
+        """Put back what a failed write did not get to disk, ahead of newer items."""
+        self.new_tokens[:0] = tokens
+        self.pending[:0] = pending
+
+    def write(self, tokens: list[str], pending: list) -> int:
+        """
+        Append taken tokens and ticks; fsync each file once.
+
+        Each list is cleared once it is on disk, so after a failure it holds
+        only what still needs writing.
+        """
+        written = len(pending)
+        if tokens:
+            # Tokens are made durable before the ticks that reference them
+            _append_synced(self.tokens_path, "".join(f"{t}\n" for t in tokens).encode())
+            tokens.clear()
+        if pending:
+            _append_synced(self.ticks_path, np.array(pending, dtype=TICK_DTYPE).tobytes())
+            pending.clear()
+        return written
+
+
+def _append_synced(path: Path, data: bytes) -> None:
+    """Append and fsync, cutting the file back if the write fails part way."""
+    with open(path, "ab") as f:
+        start = f.tell()
+        try:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        except BaseException:
+            f.truncate(start)
+            raise
+
+
+def _day_key(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime("%Y%m%d")
+
+
+class TickStore:
+    """Append-only tick log with batched fsync and range replay."""
+
+    # Seconds between retention sweeps of old day directories
+    PRUNE_INTERVAL = 3600.0
+
+    def __init__(self, root: str, flush_interval: float = 1.0, retention_days: int = 0):
+        self.root = Path(root)
+        self.flush_interval = flush_interval
+        self.retention_days = retention_days  # 0 keeps every day
+        self._last_prune = 0.0
+        self._segments: dict[tuple[str, str], _Segment] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._running = False
+        self._ticks_written = 0
+        self._flush_lock = asyncio.Lock()
+
+    # ===================
+    # Writing
+    # ===================
+
+    def record(self, update) -> None:
+        """Buffer a PriceUpdate tick. Registered as a PriceCache tick listener."""
+        self.append(update.platform, update.token_id, update.timestamp, update.best_bid, update.best_ask)
+
+    def append(self, platform: str, token_id: str, timestamp: float, bid, ask) -> None:
+        """Buffer one tick for the next flush."""
+        key = (_day_key(timestamp), platform)
+        segment = self._segments.get(key)
+        if segment is None:
+            segment = _Segment(self.root / key[0], platform)
+            self._segments[key] = segment
+
+        segment.pending.append((
+            segment.index_for(token_id),
+            timestamp,
+            float(bid) if bid is not None else np.nan,
+            float(ask) if ask is not None else np.nan,
+        ))
+
+    def _take(self) -> list[tuple[_Segment, list[str], list]]:
+        """Swap out every segment's buffers (on the event loop) for one flush."""
+        batches = []
+        today = _day_key(time.time())
+        for key, segment in list(self._segments.items()):
+            if segment.new_tokens or segment.pending:
+                batches.append((segment, *segment.take()))
+            elif key[0] < today:
+                # Past day with its last write done: drop the writer state
+                del self._segments[key]
+        return batches
+
+    @staticmethod
+    def _write(batches: list[tuple[_Segment, list[str], list]]) -> int:
+        written = 0
+        for segment, tokens, pending in batches:
+            written += segment.write(tokens, pending)
+        return written
+
+    @staticmethod
+    def _restore(batches: list[tuple[_Segment, list[str], list]]) -> None:
+        for segment, tokens, pending in batches:
+            segment.restore(tokens, pending)
+
+    def flush(self) -> int:
+        """Write all buffered ticks to disk. Returns number of ticks written."""
+        batches = self._take()
+        try:
+            written = self._write(batches)
+        except Exception:
+            self._restore(batches)
+            raise
+        self._ticks_written += written
+        return written
+
+    async def flush_async(self) -> int:
+        """
+        Like flush, but the writes and fsyncs run in a worker thread.
+
+        Buffers are swapped out on the loop first, so ticks appended while the
+        thread writes wait for the next flush instead of being lost. Flushes
+        run one at a time and a cancelled caller does not abandon a write.
+        """
+        return await asyncio.shield(self._flush_in_thread())
+
+    async def _flush_in_thread(self) -> int:
+        async with self._flush_lock:
+            return await self._write_in_thread()
+
+    async def _write_in_thread(self) -> int:
+        batches = self._take()
+        try:
+            written = await asyncio.to_thread(self._write, batches)
+        except Exception:
+            self._restore(batches)
+            raise
+        self._ticks_written += written
+        return written
+
+    async def start(self) -> None:
+        """Start the background flush loop."""
+        if self._running:
+            return
+        self._running = True
+        self._task = asyncio.create_task(self._flush_loop())
+        logger.info("Tick store started", root=str(self.root), flush_interval=self.flush_interval)
+
+    async def stop(self) -> None:
+        """Stop the flush loop and write whatever is still buffered."""
+        self._running = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush_async()
+        logger.info("Tick store stopped", ticks_written=self._ticks_written)
+
+    async def _flush_loop(self) -> None:
+        while self._running:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush_async()
+            except Exception as e:
+                logger.error("Tick store flush failed", error=str(e))
+
+            if self.retention_days and time.monotonic() - self._last_prune >= self.PRUNE_INTERVAL:
+                self._last_prune = time.monotonic()
+                try:
+                    await asyncio.to_thread(self.prune)
+                except Exception as e:
+                    logger.error("Tick store prune failed", error=str(e))
+
+    def prune(self, now: Optional[float] = None) -> list[str]:
+        """Delete day directories older than retention_days. Returns the days removed."""
+        if not self.retention_days or not self.root.is_dir():
+            return []
+        now = now if now is not None else time.time()
+        cutoff = _day_key(now - self.retention_days * 86400)
+        open_days = {day for day, _ in self._segments}
+        removed = []
+        for directory in sorted(self.root.iterdir()):
+            day = directory.name
+            if not (directory.is_dir() and len(day) == 8 and day.isdigit()):
+                continue
+            if day >= cutoff or day in open_days:
+                continue
+            shutil.rmtree(directory)
+            removed.append(day)
+        if removed:
+            logger.info("Pruned old tick segments", days=len(removed), oldest_kept=cutoff)
+        return removed
+
+    # ===================
+    # Reading
+    # ===================
+
+    def _segment_days(self, start: float, end: float) -> list[str]:
+        day = datetime.fromtimestamp(start, tz=timezone.utc).date()
+        last = datetime.fromtimestamp(end, tz=timezone.utc).date()
+        days = []
+        while day <= last:
+            days.append(day.strftime("%Y%m%d"))
+            day += timedelta(days=1)
+        return days
+
+    def replay(
+        self,
+        start: float,
+        end: Optional[float] = None,
+        platform: Optional[str] = None,
+    ) -> Iterator[TickBatch]:
+        """Yield stored ticks in [start, end], one batch per segment, in day order.
+
+        Only flushed ticks are visible.
+        """
+        end = end if end is not None else time.time()
+        for day in self._segment_days(start, end):
+            directory = self.root / day
+            if not directory.is_dir():
+                continue
+            for ticks_path in sorted(directory.glob("*.ticks")):
+                seg_platform = ticks_path.stem
+                if platform is not None and seg_platform != platform:
+                    continue
+
+                # Ignore a partially written trailing record after a crash
+                count = ticks_path.stat().st_size // TICK_DTYPE.itemsize
+                if not count:
+                    continue
+                data = np.memmap(ticks_path, dtype=TICK_DTYPE, mode="r", shape=(count,))
+                ts = data["ts"]
+                mask = (ts >= start) & (ts <= end)
+                if not mask.any():
+                    continue
+
+                tokens_path = ticks_path.with_suffix(".tokens")
+                token_ids = tokens_path.read_text().splitlines() if tokens_path.exists() else []
+                yield TickBatch(platform=seg_platform, token_ids=token_ids, records=np.array(data[mask]))
+
+    def warm(self, history, since: float) -> int:
+        """Load stored ticks since a timestamp into a PriceHistory. Returns ticks loaded.
+
+        Each segment is grouped by token and bulk-loaded into the token's ring
+        buffer, so the work per segment is per token rather than per tick.
+        """
+        loaded = 0
+        for batch in self.replay(since):
+            records = batch.records[batch.records["token"] < len(batch.token_ids)]
+            if not len(records):
+                continue
+            # Stable sort keeps each token's ticks in the order they were written
+            records = records[np.argsort(records["token"], kind="stable")]
+            tokens, starts = np.unique(records["token"], return_index=True)
+            for token, group in zip(tokens, np.split(records, starts[1:])):
+                history.extend(
+                    batch.platform,
+                    batch.token_ids[token],
+                    group["ts"],
+                    group["bid"],
+                    group["ask"],
+                    np.full(len(group), np.nan, dtype=np.float32),
+                )
+            loaded += len(records)
+        logger.info("Price history warmed from tick store", ticks=loaded)
+        return loaded
+
+    def stats(self) -> dict:
+        """Return writer statistics."""
+        return {
+            "ticks_written": self._ticks_written,
+            "pending": sum(len(s.pending) for s in self._segments.values()),
+            "open_segments": len(self._segments),
+        }
+
+
+def _create_tick_store() -> TickStore:
+    from src.config import settings
+    return TickStore(
+        settings.tick_store_dir,
+        flush_interval=settings.tick_store_flush_interval,
+        retention_days=settings.tick_store_retention_days,
+    )
+
+
+# Global tick store instance (created on first use so settings load lazily)
+_tick_store: Optional[TickStore] = None
+
+
+def get_tick_store() -> TickStore:
+    """Get the global tick store."""
+    global _tick_store
+    if _tick_store is None:
+        _tick_store = _create_tick_store()
+    return _tick_store
@@ -16,6 +16,7 @@ from collections import defaultdict
 import websockets
 from websockets.exceptions import ConnectionClosed, WebSocketException
 
+from src.services.price_history import price_history
 from src.utils.logging import get_logger
 
 logger = get_logger(__name__)
@@ -63,6 +64,7 @@ class PriceCache:
         self._ttl = ttl_seconds
         self._lock = asyncio.Lock()
         self._subscribers: dict[str, list[Callable]] = defaultdict(list)
+        self._tick_listeners: list[Callable] = []
 
     def _cache_key(self, platform: str, token_id: str) -> str:
         return f"{platform}:{token_id}"
@@ -86,8 +88,11 @@ class PriceCache:
             else:
                 self._cache[key] = update
 
+        merged = self._cache.get(key)
+        self._notify_tick_listeners(merged)
+
         # Notify subscribers
-        await self._notify_subscribers(key, self._cache.get(key))
+        await self._notify_subscribers(key, merged)
 
     async def update_orderbook(self, update: OrderBookUpdate) -> None:
         """Update cached orderbook."""
@@ -104,6 +109,13 @@ class PriceCache:
                 return update
             return None
 
+    def peek_price(self, platform: str, token_id: str) -> Optional[PriceUpdate]:
+        """Get cached price if not expired, without the lock (for synchronous tick listeners)."""
+        update = self._cache.get(self._cache_key(platform, token_id))
+        if update and (time.time() - update.timestamp) < self._ttl:
+            return update
+        return None
+
     async def get_orderbook(self, platform: str, token_id: str) -> Optional[OrderBookUpdate]:
         """Get cached orderbook if not expired."""
         key = self._cache_key(platform, token_id)
@@ -124,6 +136,20 @@ class PriceCache:
         if callback in self._subscribers[key]:
             self._subscribers[key].remove(callback)
 
+    def add_tick_listener(self, callback: Callable) -> None:
+        """Register a synchronous callback invoked with every merged price update."""
+        self._tick_listeners.append(callback)
+
+    def _notify_tick_listeners(self, update: Optional[PriceUpdate]) -> None:
+        """Feed a merged update to all tick listeners."""
+        if not update:
+            return
+        for callback in self._tick_listeners:
+            try:
+                callback(update)
+            except Exception as e:
+                logger.warning("Tick listener failed", error=str(e))
+
     async def _notify_subscribers(self, key: str, update: Optional[PriceUpdate]) -> None:
         """Notify all subscribers of a price update."""
         if not update:
@@ -381,5 +407,6 @@ class BaseWebSocketClient(ABC):
         await self.connect()
 
 
-# Global price cache instance
+# Global price cache instance; every tick also lands in the in-memory price history
 price_cache = PriceCache(ttl_seconds=60.0)
+price_cache.add_tick_listener(price_history.record)
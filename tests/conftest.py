@@ -26,3 +26,39 @@ def encryption_key() -> str:
 def test_user_id() -> int:
     """Provide a test Telegram user ID."""
     return 123456789
+
+
+@pytest.fixture
+def sqlite_db(tmp_path, monkeypatch):
+    """Run database code against SQLite files standing in for Postgres.
+
+    Call as sqlite_db(models, body): the models' tables are created (on the
+    replica too when replica=True), body(database) is awaited with
+    src.db.database initialised, and its result is returned.
+    """
+    pytest.importorskip("aiosqlite")
+    monkeypatch.setenv("TELEGRAM_BOT_TOKEN", "test")
+    monkeypatch.setenv("DATABASE_URL", "postgresql://localhost/test")
+    monkeypatch.setenv("ENCRYPTION_KEY", "a" * 64)
+    from src.config import settings
+    from src.db import database
+
+    def run(models, body, replica: bool = False):
+        replica_url = f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}" if replica else None
+        monkeypatch.setattr(settings, "database_replica_url", replica_url)
+        tables = [model.__table__ for model in models]
+
+        async def main():
+            await database.init_db(f"sqlite+aiosqlite:///{tmp_path / 'primary.db'}")
+            try:
+                engines = [database._engine] + ([database._replica_engine] if replica else [])
+                for engine in engines:
+                    async with engine.begin() as conn:
+                        await conn.run_sync(database.Base.metadata.create_all, tables=tables)
+                return await body(database)
+            finally:
+                await database.close_db()
+
+        return asyncio.run(main())
+
+    return run
@@ -87,6 +87,42 @@ class TestPlatformBase:
         prob = float(price * 100)
         assert prob == 65.0
 
+    def test_get_orderbooks_default_batches_and_dedupes(self):
+        """Test the default batch orderbook fetch is aligned and dedupes requests."""
+        import asyncio
+        from src.db.models import Outcome
+        from src.db.models import Platform
+        from src.platforms.base import BasePlatform, OrderBook, OrderBookRequest
+
+        calls = []
+
+        class StubPlatform(BasePlatform):
+            platform = Platform.KALSHI
+
+            initialize = close = get_markets = search_markets = None
+            get_market = get_trending_markets = get_quote = execute_trade = None
+
+            async def get_orderbook(self, market_id, outcome, token_id=None, slug=None):
+                calls.append((market_id, outcome))
+                if market_id == "bad":
+                    raise RuntimeError("boom")
+                return OrderBook(market_id=market_id, outcome=outcome,
+                                 bids=[(Decimal("0.4"), Decimal("1"))], asks=[])
+
+        requests = [
+            OrderBookRequest("m1", Outcome.YES),
+            OrderBookRequest("bad", Outcome.YES),
+            OrderBookRequest("m1", Outcome.YES),
+            OrderBookRequest("m1", Outcome.NO),
+        ]
+        books = asyncio.run(StubPlatform().get_orderbooks(requests))
+
+        assert len(books) == 4
+        assert books[1] is None
+        assert books[0] is books[2]
+        assert books[3].outcome == Outcome.NO
+        assert len(calls) == 3
+
 
 class TestModels:
     """Test database models."""
@@ -113,6 +149,500 @@ class TestModels:
         assert Outcome.YES.value == "yes"
         assert Outcome.NO.value == "no"
 
+    def test_amount_numeric_mirrors(self):
+        """Test amount strings are mirrored into their numeric columns."""
+        from src.db.models import FeeTransaction, Order, Position
+
+        order = Order(input_amount="1500000")
+        assert order.input_amount_numeric == Decimal("1500000")
+        order.input_amount = "not a number"
+        assert order.input_amount_numeric is None
+
+        assert FeeTransaction(amount_usdc="0.25").amount_usdc_numeric == Decimal("0.25")
+        assert Position(token_amount="NaN").token_amount_numeric is None
+
+
+class TestNotificationDispatcher:
+    """Tests for the queued Telegram notification dispatcher."""
+
+    def test_dedupes_and_retries_after_rate_limit(self):
+        """Test duplicates are dropped and RetryAfter re-queues the message."""
+        import asyncio
+        from telegram.error import RetryAfter
+        from src.services.notifications import NotificationDispatcher, TelegramRateLimiter
+
+        sent = []
+        limited = []
+
+        class StubBot:
+            async def send_message(self, chat_id, text, parse_mode=None, reply_markup=None):
+                if text == "limited" and not limited:
+                    limited.append(chat_id)
+                    raise RetryAfter(0)
+                sent.append(chat_id)
+
+        async def run():
+            dispatcher = NotificationDispatcher(TelegramRateLimiter(global_rate=1000, per_chat_interval=0), workers=2)
+            dispatcher.set_bot(StubBot())
+            await dispatcher.start()
+            assert dispatcher.notify(1, "hello", dedup_key="a")
+            assert not dispatcher.notify(1, "hello again", dedup_key="a")
+            assert dispatcher.notify(2, "hello", dedup_key="a")
+            assert dispatcher.notify(3, "limited")
+            await dispatcher.stop()
+            return dispatcher.stats()
+
+        stats = asyncio.run(run())
+
+        assert sorted(sent) == [1, 2, 3]
+        assert limited == [3]
+        assert stats["sent"] == 3
+        assert stats["deduplicated"] == 1
+        assert stats["retried"] == 1
+        assert stats["queue_depth"] == 0
+
+    def test_rate_limiter_spaces_sends_per_chat(self):
+        """Test per-chat reservations are spaced by the per-chat interval."""
+        import asyncio
+        import time
+        from src.services.notifications import TelegramRateLimiter
+
+        async def run():
+            limiter = TelegramRateLimiter(global_rate=1000, per_chat_interval=0.05)
+            start = time.monotonic()
+            await asyncio.gather(*(limiter.acquire(1) for _ in range(3)))
+            await limiter.acquire(2)
+            return time.monotonic() - start
+
+        elapsed = asyncio.run(run())
+        assert 0.1 <= elapsed < 0.5
+
+
+class TestPostTradePipeline:
+    """Tests for the outbox-backed post-trade job pipeline."""
+
+    def test_retries_failed_jobs_until_done(self, monkeypatch):
+        """Test a failing job is retried and removed from the outbox once it succeeds."""
+        import asyncio
+        import time
+        from types import SimpleNamespace
+        from src.db import database
+        from src.services.post_trade import PostTradePipeline
+
+        outbox = {}
+        calls = []
+
+        async def enqueue_post_trade_jobs(jobs):
+            for kind, payload in jobs:
+                job_id = len(outbox) + 1
+                outbox[job_id] = SimpleNamespace(id=job_id, kind=kind, payload=payload, status="pending", attempts=0)
+
+        async def claim_post_trade_jobs(limit, lease_seconds):
+            due = [j for j in outbox.values() if j.status == "pending"][:limit]
+            for job in due:
+                job.status = "running"
+                job.attempts += 1
+            return due
+
+        async def complete_post_trade_job(job_id):
+            del outbox[job_id]
+
+        async def fail_post_trade_job(job_id, error, retry_in):
+            outbox[job_id].status = "failed" if retry_in is None else "pending"
+
+        for fn in (enqueue_post_trade_jobs, claim_post_trade_jobs, complete_post_trade_job, fail_post_trade_job):
+            monkeypatch.setattr(database, fn.__name__, fn)
+
+        async def flaky(payload):
+            calls.append(payload["n"])
+            if len(calls) == 1:
+                raise ConnectionError("database unavailable")
+
+        async def run():
+            pipeline = PostTradePipeline({"flaky": flaky}, workers=1, poll_interval=0.01, retry_base=0)
+            await pipeline.start()
+            await pipeline.enqueue([("flaky", {"n": 1}), ("unknown", {})])
+            deadline = time.monotonic() + 2
+            while outbox.get(1) and time.monotonic() < deadline:
+                await asyncio.sleep(0.01)
+            await pipeline.stop()
+            return pipeline.stats()
+
+        stats = asyncio.run(run())
+
+        assert calls == [1, 1]
+        assert list(outbox) == [2] and outbox[2].status == "failed"
+        assert stats["completed"] == 1
+        assert stats["retried"] == 1
+        assert stats["failed"] == 1
+
+    def test_confirmed_order_and_partner_volume_apply_once(self, sqlite_db):
+        """Test jobs commit with the order confirmation and a repeated partner job is not counted twice."""
+        import json
+        from sqlalchemy import select
+        from src.db.models import Chain, Order, OrderStatus, Partner, Platform, PostTradeJob
+
+        async def body(database):
+            order = await database.create_order(
+                user_id="u1", platform=Platform.KALSHI, chain=Chain.SOLANA, market_id="m1",
+                outcome="yes", side="buy", input_token="USDC", input_amount="1000000",
+                output_token="T", expected_output="1",
+            )
+            async with database.get_session() as session:
+                session.add(Partner(id="p1", name="P", code="P1"))
+
+            await database.update_order(
+                order.id, status=OrderStatus.CONFIRMED,
+                post_trade_jobs=[("partner_volume", json.dumps({"order_id": order.id}))],
+            )
+            async with database.get_session() as session:
+                job_id = (await session.execute(select(PostTradeJob.id))).scalar_one()
+
+            # A second run of the same job (lease expired, completion failed) counts nothing
+            first = await database.update_partner_volume("p1", Decimal("10"), Decimal("0.1"), job_id=job_id)
+            again = await database.update_partner_volume("p1", Decimal("10"), Decimal("0.1"), job_id=job_id)
+            async with database.get_session() as session:
+                partner = await session.get(Partner, "p1")
+                jobs = (await session.execute(select(PostTradeJob))).scalars().all()
+                status = (await session.get(Order, order.id)).status
+            return first, again, partner.total_volume_usdc, partner.total_fees_usdc, len(jobs), status
+
+        result = sqlite_db([Order, Partner, PostTradeJob], body)
+
+        assert result == (True, False, "10", "0.1", 0, OrderStatus.CONFIRMED)
+
+
+class TestRollupWindow:
+    """Tests for splitting analytics periods between rollups and raw rows."""
+
+    def test_only_whole_days_come_from_rollups(self):
+        """Test a partial first day and days after the watermark are left raw."""
+        from datetime import date, datetime, timezone
+        from src.db.database import rollup_window
+
+        watermark = date(2026, 10, 16)
+
+        # Unbounded period: everything up to the watermark
+        assert rollup_window(None, watermark) == (None, watermark)
+        # Period starting mid-day: that day is read raw
+        assert rollup_window(datetime(2026, 10, 10, 12, tzinfo=timezone.utc), watermark) == (date(2026, 10, 11), watermark)
+        # Period starting at midnight UTC: that day is rolled up
+        assert rollup_window(datetime(2026, 10, 10, tzinfo=timezone.utc), watermark) == (date(2026, 10, 10), watermark)
+        # Period newer than the watermark, or no rollups yet
+        assert rollup_window(datetime(2026, 10, 17, 1, tzinfo=timezone.utc), watermark) is None
+        assert rollup_window(datetime(2026, 10, 10, tzinfo=timezone.utc), None) is None
+
+
+class TestPoolMetrics:
+    """Tests for connection pool checkout metrics."""
+
+    def test_wait_histogram_buckets(self):
+        """Test waits land in the first bucket at or above them."""
+        from src.db.database import PoolMetrics
+
+        metrics = PoolMetrics(buckets_ms=(1, 10, 100))
+        for wait in (0.0005, 0.001, 0.05, 2.0):
+            metrics.observe(wait)
+
+        snapshot = metrics.snapshot()
+        assert snapshot["wait_histogram_ms"] == {"le_1ms": 2, "le_10ms": 0, "le_100ms": 1, "inf": 1}
+        assert snapshot["checkouts"] == 4
+        assert snapshot["wait_max_ms"] == 2000.0
+
+
+class TestReadReplicaRouting:
+    """Tests for routing read-only helpers to the replica (SQLite files stand in for Postgres)."""
+
+    def test_reads_use_replica_except_after_own_write(self, sqlite_db, monkeypatch):
+        """Test a user's reads stick to the primary after they trade, others read the replica."""
+        from src.config import settings
+        from src.db import database
+        from src.db.models import Chain, Order, OrderSide, Outcome, Platform, User
+
+        monkeypatch.setattr(settings, "db_replica_sticky_seconds", 60.0)
+        monkeypatch.setattr(database, "_sticky_until", {})
+        order = dict(platform=Platform.KALSHI, chain=Chain.SOLANA, market_id="m1",
+                     input_token="USDC", input_amount="1000000", output_token="T", expected_output="1")
+
+        async def body(database):
+            # Only the replica has u2's order, only the primary has u1's
+            async with database._replica_session_factory() as session:
+                session.add(Order(id="replica-order", user_id="u2", outcome=Outcome.YES, side=OrderSide.BUY, **order))
+                await session.commit()
+            await database.create_order(user_id="u1", outcome="yes", side="buy", **order)
+
+            u1_sticky = await database.get_user_orders("u1")
+            u2 = await database.get_user_orders("u2")
+            database._sticky_until.clear()
+            u1_replica = await database.get_user_orders("u1")
+            return len(u1_sticky), [o.id for o in u2], len(u1_replica)
+
+        assert sqlite_db([User, Order], body, replica=True) == (1, ["replica-order"], 0)
+
+
+class TestIdentityCache:
+    """Tests for the user/wallet identity cache (a SQLite file stands in for Postgres)."""
+
+    # mutation -> (write, read back, check the read sees the write); m is src.db.models
+    MUTATIONS = {
+        "create_wallet": (
+            lambda db, m: db.create_wallet("u1", m.ChainFamily.SOLANA, "sol-new", "key"),
+            lambda db, m: db.get_wallet("u1", m.ChainFamily.SOLANA),
+            lambda wallet, m: wallet.public_key == "sol-new",
+        ),
+        "import_wallet": (
+            lambda db, m: db.create_wallet("u1", m.ChainFamily.SOLANA, "sol-imported", "key", source="imported"),
+            lambda db, m: db.get_user_wallets("u1"),
+            lambda wallets, m: "sol-imported" in {w.public_key for w in wallets},
+        ),
+        "switch_active_wallet": (
+            lambda db, m: db.switch_active_wallet("u1", m.ChainFamily.EVM),
+            lambda db, m: db.get_wallet("u1", m.ChainFamily.EVM),
+            lambda wallet, m: wallet.public_key == "0ximported",
+        ),
+        "deactivate_wallet": (
+            lambda db, m: db.deactivate_wallet("u1", m.ChainFamily.EVM),
+            lambda db, m: db.get_wallet("u1", m.ChainFamily.EVM),
+            lambda wallet, m: wallet is None,
+        ),
+        "delete_wallet_by_chain": (
+            lambda db, m: db.delete_wallet_by_chain("u1", m.ChainFamily.EVM),
+            lambda db, m: db.get_user_wallets("u1"),
+            lambda wallets, m: wallets == [],
+        ),
+        "update_user_platform": (
+            lambda db, m: db.update_user_platform(111, m.Platform.POLYMARKET),
+            lambda db, m: db.get_user_by_telegram_id(111),
+            lambda user, m: user.active_platform == m.Platform.POLYMARKET,
+        ),
+    }
+
+    @pytest.mark.parametrize("mutation", list(MUTATIONS))
+    def test_mutation_invalidates_cached_identity(self, mutation, sqlite_db, monkeypatch):
+        """Test each mutation path drops the cached user and wallets so the next read is fresh."""
+        from sqlalchemy import event
+        from src.db import database, models
+        from src.db.models import ChainFamily, User, Wallet
+
+        cache = database.IdentityCache(ttl=60)
+        monkeypatch.setattr(database, "_identity_cache", cache)
+        mutate, read, is_fresh = self.MUTATIONS[mutation]
+
+        async def body(database):
+            # The raw platform UPDATE uses Postgres' now(); reconnect so every connection has it
+            event.listen(database._engine.sync_engine, "connect",
+                         lambda conn, record: conn.create_function("now", 0, lambda: "2026-01-01"))
+            await database._engine.dispose()
+            async with database.get_session() as session:
+                session.add(User(id="u1", telegram_id=111))
+                session.add(Wallet(id="w1", user_id="u1", chain_family=ChainFamily.EVM, public_key="0xgenerated"))
+                session.add(Wallet(id="w2", user_id="u1", chain_family=ChainFamily.EVM, public_key="0ximported",
+                                   source="imported", is_active=False))
+
+            # Warm the cache, then serve every lookup from it
+            for _ in range(2):
+                await database.get_user_by_telegram_id(111)
+                await database.get_wallet("u1", ChainFamily.EVM)
+                await database.get_wallet("u1", ChainFamily.SOLANA)
+                await database.get_user_wallets("u1")
+            warm = cache.stats()
+
+            await mutate(database, models)
+            assert cache.get_user(111) is database._MISS
+            assert cache.get_wallets("u1") is database._MISS
+            return warm, await read(database, models)
+
+        warm, result = sqlite_db([User, Wallet], body)
+
+        assert (warm["user_hits"], warm["wallet_hits"], warm["wallets_hits"]) == (1, 2, 1)
+        assert warm["user_hit_rate"] == 0.5
+        assert is_fresh(result, models)
+
+
+class TestAlertClaims:
+    """Tests for claiming triggered price alerts (a SQLite file stands in for Postgres)."""
+
+    def test_each_alert_is_claimed_once(self, sqlite_db):
+        """Test two evaluators triggering the same alert only get it back once between them."""
+        from datetime import datetime
+        from src.db.models import Platform, PriceAlertRecord
+
+        at = datetime(2026, 1, 1)
+
+        async def body(database):
+            async with database.get_session() as session:
+                for alert_id in ("a1", "a2", "a3"):
+                    session.add(PriceAlertRecord(
+                        id=alert_id, user_telegram_id=1, platform=Platform.KALSHI, market_id="m",
+                        market_title="M", outcome="yes", condition="above", target_price=Decimal("0.5"),
+                    ))
+
+            first = await database.claim_triggered_price_alerts(
+                [("a1", Decimal("0.6"), at), ("a2", Decimal("0.6"), at)]
+            )
+            second = await database.claim_triggered_price_alerts(
+                [("a2", Decimal("0.7"), at), ("a3", Decimal("0.7"), at)]
+            )
+            async with database.get_session() as session:
+                a2 = await session.get(PriceAlertRecord, "a2")
+            return first, second, a2.triggered_price
+
+        first, second, a2_price = sqlite_db([PriceAlertRecord], body)
+
+        assert first == {"a1", "a2"}
+        assert second == {"a3"}
+        assert a2_price == Decimal("0.6")
+
+
+class TestUserFanOut:
+    """Tests for streaming user telegram IDs in keyset batches (a SQLite file stands in for Postgres)."""
+
+    def test_batches_resume_after_last_id(self, sqlite_db):
+        """Test every reachable user is yielded once, in order, across batch boundaries."""
+        from datetime import datetime
+        from src.db.models import User
+
+        async def body(database):
+            async with database.get_session() as session:
+                for telegram_id in range(1, 8):
+                    session.add(User(
+                        id=str(telegram_id), telegram_id=telegram_id,
+                        bot_blocked_at=datetime(2026, 1, 1) if telegram_id == 4 else None,
+                    ))
+
+            everyone = [i async for i in database.stream_user_telegram_ids(batch_size=3)]
+            resumed = [
+                i async for i in database.stream_user_telegram_ids(
+                    batch_size=2, after_telegram_id=2, reachable_only=True,
+                )
+            ]
+            return everyone, resumed
+
+        everyone, resumed = sqlite_db([User], body)
+
+        assert everyone == [1, 2, 3, 4, 5, 6, 7]
+        assert resumed == [3, 5, 6, 7]
+
+
+class TestKeysetPagination:
+    """Tests for (created_at, id) cursor paging of positions (a SQLite file stands in for Postgres)."""
+
+    def test_cursor_round_trip(self):
+        """Test cursors decode back to the row key and malformed ones are rejected."""
+        from datetime import datetime, timezone
+        from src.db.database import decode_cursor, encode_cursor
+
+        created_at = datetime(2026, 3, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+        cursor = encode_cursor(created_at, "pos-1")
+        assert decode_cursor(cursor) == (created_at, "pos-1")
+        assert len(encode_cursor(created_at, "x" * 36)) + len("positions:n:") <= 64
+        for bad in ("", "abc", "zz.pos-1", "1f."):
+            with pytest.raises(ValueError):
+                decode_cursor(bad)
+
+    def test_pages_forward_and_back(self, sqlite_db):
+        """Test paging visits every position once, newest first, and Prev returns the same pages."""
+        from datetime import datetime, timedelta, timezone
+        from src.db.models import Chain, Outcome, Platform, Position, PositionStatus
+
+        start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+        async def body(database):
+            async with database.get_session() as session:
+                # p3 and p4 share a timestamp, so the id breaks the tie
+                for i in range(7):
+                    session.add(Position(
+                        id=f"p{i}", user_id="u1", platform=Platform.KALSHI, chain=Chain.SOLANA,
+                        market_id=f"m{i}", market_title="M", outcome=Outcome.YES, token_id="t",
+                        token_amount="1", entry_price=0.5, status=PositionStatus.OPEN,
+                        created_at=start + timedelta(hours=i - (i == 4)),
+                    ))
+                session.add(Position(
+                    id="other", user_id="u2", platform=Platform.KALSHI, chain=Chain.SOLANA,
+                    market_id="m", market_title="M", outcome=Outcome.YES, token_id="t",
+                    token_amount="1", entry_price=0.5, created_at=start,
+                ))
+
+            forward, cursor = [], None
+            while True:
+                page = await database.get_user_positions_page("u1", limit=3, after=cursor)
+                forward.append(page)
+                if not page.next_cursor:
+                    break
+                cursor = page.next_cursor
+
+            back = await database.get_user_positions_page("u1", limit=3, before=forward[-1].prev_cursor)
+            first = await database.get_user_positions_page("u1", limit=3, before=back.prev_cursor)
+            return forward, back, first
+
+        forward, back, first = sqlite_db([Position], body)
+
+        ids = [[p.id for p in page.items] for page in forward]
+        assert ids == [["p6", "p5", "p4"], ["p3", "p2", "p1"], ["p0"]]
+        assert forward[0].prev_cursor is None
+        assert [p.id for p in back.items] == ids[1]
+        assert [p.id for p in first.items] == ids[0]
+        assert first.prev_cursor is None and first.next_cursor == forward[0].next_cursor
+
+
+class TestPnlSummary:
+    """Tests for the SQL-side PnL sums (a SQLite file stands in for Postgres)."""
+
+    def test_sums_are_exact_per_platform(self, sqlite_db, monkeypatch):
+        """Test closed-position and order PnL come back as exact Decimals grouped by platform."""
+        from src.db import database
+        from src.db.models import (
+            Chain, Order, OrderSide, OrderStatus, Outcome, Platform, Position, PositionStatus,
+        )
+
+        # The string-cast fallback uses Postgres' regex operator; every row here has the mirror
+        monkeypatch.setattr(database, "_numeric_amount", lambda numeric, string: numeric)
+
+        def position(pid, platform, entry, current, status=PositionStatus.CLOSED):
+            return Position(
+                id=pid, user_id="u1", platform=platform, chain=Chain.SOLANA, market_id=pid,
+                market_title="M", outcome=Outcome.YES, token_id="t", token_amount="10",
+                entry_price=Decimal(entry), current_price=Decimal(current) if current else None,
+                status=status,
+            )
+
+        def order(oid, side, amount, status=OrderStatus.CONFIRMED):
+            return Order(
+                id=oid, user_id="u1", platform=Platform.KALSHI, chain=Chain.SOLANA, market_id="m",
+                outcome=Outcome.YES, side=side, input_token="USDC", input_amount=amount,
+                output_token="T", expected_output="1", status=status,
+            )
+
+        async def body(database):
+            async with database.get_session() as session:
+                session.add_all([
+                    position("k1", Platform.KALSHI, "0.1", "0.3"),
+                    position("k2", Platform.KALSHI, "0.2", "0.1"),
+                    position("k3", Platform.KALSHI, "0.3", None),
+                    position("k4", Platform.KALSHI, "0.1", "0.9", status=PositionStatus.OPEN),
+                    position("p1", Platform.POLYMARKET, "0.5", "0.5"),
+                    order("o1", OrderSide.BUY, "1100000"),
+                    order("o2", OrderSide.BUY, "2200000"),
+                    order("o3", OrderSide.SELL, "3300001"),
+                    order("o4", OrderSide.SELL, "9000000", status=OrderStatus.FAILED),
+                ])
+            return (
+                await database.get_closed_pnl_by_platform("u1"),
+                await database.get_closed_pnl_by_platform("u1", platform=Platform.POLYMARKET),
+                await database.get_realized_pnl("u1", Platform.KALSHI),
+            )
+
+        closed, polymarket, realized = sqlite_db([Position, Order], body)
+
+        kalshi = closed["kalshi"]
+        assert Decimal(kalshi["total_pnl"]) == Decimal("1")
+        assert Decimal(kalshi["total_invested"]) == Decimal("6")
+        assert (kalshi["total_trades"], kalshi["winning_trades"], kalshi["losing_trades"]) == (3, 1, 1)
+        assert list(polymarket) == ["polymarket"] and polymarket["polymarket"]["total_pnl"] == 0
+        assert realized["realized_pnl"] == Decimal("0.000001")
+        assert realized["total_cost"] == Decimal("3.3")
+        assert realized["trade_count"] == 3
+
 
 # Integration tests would go here with database fixtures
 class TestDatabase:
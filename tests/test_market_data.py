@@ -0,0 +1,258 @@
+"""
+Tests for live market data services (price history, tick storage, market matching).
+"""
+
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+
+class TestPriceHistory:
+    """Test the in-memory price history ring buffers."""
+
+    def test_ring_buffer_wraps_in_order(self):
+        """Test the buffer keeps the newest ticks in chronological order."""
+        from src.services.price_history import TickRingBuffer
+
+        buffer = TickRingBuffer(capacity=3, min_spacing=0)
+        for i in range(5):
+            buffer.append(100.0 + i, 0.1 * i, None, None)
+
+        ts, bid, ask, last = buffer.snapshot()
+        assert list(ts) == [102.0, 103.0, 104.0]
+        assert np.isnan(ask).all()
+        assert buffer.oldest_timestamp == 102.0
+
+    def test_ring_buffer_coalesces_close_ticks(self):
+        """Test ticks within min_spacing overwrite the newest slot."""
+        from src.services.price_history import TickRingBuffer
+
+        buffer = TickRingBuffer(capacity=10, min_spacing=1.0)
+        buffer.append(100.0, 0.40, 0.42, None)
+        buffer.append(100.5, 0.41, 0.43, None)
+
+        assert len(buffer) == 1
+        _, bid, _, _ = buffer.snapshot()
+        assert abs(bid[0] - 0.41) < 1e-6
+
+    def test_ring_buffer_drops_stale_ticks(self):
+        """Test a tick older than the newest one (e.g. a replayed one) does not overwrite it."""
+        from src.services.price_history import TickRingBuffer
+
+        buffer = TickRingBuffer(capacity=10, min_spacing=1.0)
+        buffer.append(100.0, 0.40, 0.42, None)
+        buffer.append(50.0, 0.10, 0.12, None)
+
+        ts, bid, _, _ = buffer.snapshot()
+        assert list(ts) == [100.0]
+        assert abs(bid[0] - 0.40) < 1e-6
+
+    def test_ring_buffer_extend_matches_append(self):
+        """Test a bulk extend leaves the buffer exactly as appending each tick would."""
+        from src.services.price_history import TickRingBuffer
+
+        # Coalesced, stale and wrapping ticks, continuing a buffer that already holds one
+        ts = np.array([100.2, 101.0, 101.5, 99.0, 103.0, 104.0, 105.0, 105.1])
+        bid = np.array([0.1, 0.2, 0.3, 0.9, np.nan, 0.5, 0.6, 0.7], dtype=np.float32)
+        ask = np.full(len(ts), 0.8, dtype=np.float32)
+        last = np.full(len(ts), np.nan, dtype=np.float32)
+
+        one_by_one = TickRingBuffer(capacity=4, min_spacing=1.0)
+        bulk = TickRingBuffer(capacity=4, min_spacing=1.0)
+        for buffer in (one_by_one, bulk):
+            buffer.append(100.0, 0.0, 0.8, None)
+        for row in zip(ts, bid, ask, last):
+            one_by_one.append(*(None if np.isnan(v) else float(v) for v in row))
+        bulk.extend(ts, bid, ask, last)
+
+        for expected, actual in zip(one_by_one.snapshot(), bulk.snapshot()):
+            assert np.array_equal(expected, actual, equal_nan=True)
+        assert len(bulk) == 4
+
+    def test_get_candles_ohlc(self):
+        """Test 1m candles from mid prices."""
+        from src.services.price_history import PriceHistory
+
+        history = PriceHistory(capacity=100, min_spacing=0)
+        ticks = [(0, "0.40", "0.42"), (30, "0.50", "0.52"), (59, "0.30", "0.32"), (60, "0.60", "0.62")]
+        for ts, bid, ask in ticks:
+            history.append("polymarket", "tok", 1_700_000_040 + ts, Decimal(bid), Decimal(ask), None)
+
+        candles = history.get_candles("polymarket", "tok", "1m")
+        assert len(candles) == 2
+        first = candles[0]
+        assert first.timestamp == 1_700_000_040
+        assert first.open == Decimal("0.41")
+        assert first.high == Decimal("0.51")
+        assert first.low == Decimal("0.31")
+        assert first.close == Decimal("0.31")
+        assert first.ticks == 3
+        assert candles[1].open == Decimal("0.61")
+
+    def test_get_candles_unknown_token(self):
+        """Test an unseen token yields no candles."""
+        from src.services.price_history import PriceHistory
+
+        assert PriceHistory().get_candles("kalshi", "missing", "5m") == []
+
+
+class TestTickStore:
+    """Test the append-only on-disk tick store."""
+
+    def test_flush_and_replay_range(self, tmp_path):
+        """Test flushed ticks replay by time range with token ids resolved."""
+        from src.services.tick_store import TickStore
+
+        store = TickStore(str(tmp_path))
+        base = 1_700_000_000.0
+        store.append("kalshi", "A", base, Decimal("0.40"), Decimal("0.42"))
+        store.append("kalshi", "B", base + 10, None, Decimal("0.70"))
+        store.append("kalshi", "A", base + 20, Decimal("0.45"), Decimal("0.47"))
+        assert store.flush() == 3
+
+        batches = list(store.replay(base + 5, base + 30))
+        assert len(batches) == 1
+        batch = batches[0]
+        assert batch.platform == "kalshi"
+        assert [batch.token_ids[t] for t in batch.records["token"]] == ["B", "A"]
+        assert np.isnan(batch.records["bid"][0])
+
+    def test_replay_ignores_partial_record_and_warms_history(self, tmp_path):
+        """Test a torn trailing write is skipped and replay feeds PriceHistory."""
+        from src.services.price_history import PriceHistory
+        from src.services.tick_store import TickStore
+
+        store = TickStore(str(tmp_path))
+        base = 1_700_000_000.0
+        store.append("opinion", "tok", base, Decimal("0.20"), Decimal("0.22"))
+        store.flush()
+        segment = next(tmp_path.glob("*/opinion.ticks"))
+        with open(segment, "ab") as f:
+            f.write(b"\x00" * 7)
+
+        reopened = TickStore(str(tmp_path))
+        history = PriceHistory(min_spacing=0)
+        assert reopened.warm(history, base - 1) == 1
+        assert history.oldest_timestamp("opinion", "tok") == base
+
+    def test_ticks_appended_during_a_write_are_kept(self, tmp_path):
+        """Test a flush only writes the buffers it swapped out, so later appends keep their token lines."""
+        from src.services.tick_store import TickStore
+
+        store = TickStore(str(tmp_path))
+        base = 1_700_000_000.0
+        store.append("kalshi", "A", base, Decimal("0.40"), Decimal("0.42"))
+        batches = store._take()
+        # Arrives on the loop while the worker thread writes the taken batch
+        store.append("kalshi", "B", base + 1, Decimal("0.60"), Decimal("0.62"))
+        assert store._write(batches) == 1
+        assert store.flush() == 1
+
+        batch = next(store.replay(base - 1, base + 10))
+        assert [batch.token_ids[t] for t in batch.records["token"]] == ["A", "B"]
+
+    def test_reopen_repairs_torn_writes(self, tmp_path):
+        """Test reopening cuts a torn record and unreferenced token lines so new appends stay aligned."""
+        from src.services.tick_store import TickStore
+
+        store = TickStore(str(tmp_path))
+        base = 1_700_000_000.0
+        store.append("kalshi", "A", base, Decimal("0.40"), Decimal("0.42"))
+        store.flush()
+        ticks = next(tmp_path.glob("*/kalshi.ticks"))
+        with open(ticks, "ab") as f:
+            f.write(b"\x01" * 7)
+        with open(ticks.with_suffix(".tokens"), "a") as f:
+            f.write("orphan\nto")
+
+        reopened = TickStore(str(tmp_path))
+        reopened.append("kalshi", "B", base + 1, Decimal("0.60"), Decimal("0.62"))
+        reopened.flush()
+
+        assert ticks.with_suffix(".tokens").read_text() == "A\nB\n"
+        batch = next(reopened.replay(base - 1, base + 10))
+        assert [batch.token_ids[t] for t in batch.records["token"]] == ["A", "B"]
+        assert batch.records["ts"].tolist() == [base, base + 1]
+
+    def test_prune_drops_days_past_retention(self, tmp_path):
+        """Test day directories older than the retention period are deleted and newer ones kept."""
+        from src.services.tick_store import TickStore
+
+        store = TickStore(str(tmp_path), retention_days=2)
+        day = 86400.0
+        now = 1_700_000_000.0
+        for age in (0, 1, 3, 5):
+            store.append("kalshi", "A", now - age * day, Decimal("0.40"), Decimal("0.42"))
+        store.flush()
+        # A second flush releases the now idle past-day writers
+        store.flush()
+        (tmp_path / "notes").mkdir()
+
+        removed = store.prune(now)
+
+        assert len(removed) == 2
+        assert len(list(tmp_path.glob("*/kalshi.ticks"))) == 2
+        assert (tmp_path / "notes").is_dir()
+        assert [len(batch) for batch in store.replay(now - 2 * day, now)] == [1, 1]
+
+
+class TestMarketMatching:
+    """Test cross-platform market title matching."""
+
+    def test_extract_match_key_strips_phrases_and_stop_words(self):
+        """Test titles reduce to meaningful lowercase words."""
+        from src.services.market_matching import extract_match_key
+
+        key = extract_match_key("Will the Lakers beat the Celtics in the NBA Finals?")
+        assert key == {"lakers", "celtics", "nba", "finals?"}
+
+    def test_match_catalogs_agrees_with_brute_force(self):
+        """Test the blocking index finds exactly the pairs a nested loop finds."""
+        import random
+
+        from src.services.market_matching import extract_match_key, match_catalogs
+
+        rng = random.Random(3)
+        vocab = [f"word{i}" for i in range(40)]
+        titles_a = [" ".join(rng.sample(vocab, rng.randint(3, 7))) for _ in range(150)]
+        titles_b = [" ".join(rng.sample(vocab, rng.randint(3, 7))) for _ in range(150)]
+        keys_a = [extract_match_key(t) for t in titles_a]
+        keys_b = [extract_match_key(t) for t in titles_b]
+
+        expected = set()
+        for i, a in enumerate(keys_a):
+            for j, b in enumerate(keys_b):
+                common = len(a & b)
+                if common >= 3 and common / len(a | b) >= 0.4:
+                    expected.add((i, j))
+
+        found = {(p.index_a, p.index_b) for p in match_catalogs(keys_a, keys_b)}
+        assert expected
+        assert found == expected
+
+    def test_similarity_matrix_thresholds(self):
+        """Test the sparse similarity matrix keeps only pairs above the threshold."""
+        from src.services.market_matching import similarity_matrix
+
+        keys_a = [{"lakers", "celtics", "finals"}, {"bitcoin", "100k", "2026"}]
+        keys_b = [{"lakers", "celtics", "finals", "game"}, {"bitcoin", "ethereum", "flip"}]
+
+        matrix = similarity_matrix(keys_a, keys_b, min_similarity=0.5)
+        assert matrix[0, 0] == 0.75
+        assert matrix.nnz == 1
+
+    def test_match_cache_is_symmetric_and_dedupes(self):
+        """Test confirmed matches are found from either side and queued once."""
+        from src.services.market_matching import MatchCache
+
+        cache = MatchCache()
+        cache.add(("kalshi", "KX-1"), ("polymarket", "0xabc"), None, source="dome")
+        cache.add(("polymarket", "0xabc"), ("kalshi", "KX-1"), None, source="dome")
+        with pytest.raises(ValueError):
+            cache.add(("kalshi", "KX-2"), ("polymarket", "0xdef"), 0.8, source="title")
+
+        assert len(cache) == 1
+        assert cache.matches_for(("polymarket", "0xabc")) == {("kalshi", "KX-1")}
+        assert cache.matches_for(("kalshi", "KX-1")) == {("polymarket", "0xabc")}
+        assert len(cache._pending) == 1
@@ -220,6 +220,54 @@ class TestReferralChain:
 
         assert total_distributed == Decimal("0")
 
+    def test_distribute_batches_credits(self, monkeypatch):
+        """Test distribution credits the whole chain in one call with cached rates."""
+        import asyncio
+        from types import SimpleNamespace
+        from src.db.models import ChainFamily
+        from src.services import fee
+
+        chain = [SimpleNamespace(id=f"r{i}", username=None) for i in range(1, 4)]
+        config_reads = []
+        credited = []
+
+        async def get_referral_chain(user_id):
+            return chain
+
+        async def get_all_config():
+            config_reads.append(1)
+            return {"user_rate_r1": "50", "referral_tier2_percent": "10"}
+
+        async def credit_referral_earnings(**kwargs):
+            credited.append(kwargs["credits"])
+            # "dup" stands in for an order whose commissions were already credited
+            return kwargs["order_id"] != "dup"
+
+        monkeypatch.setattr(fee, "get_referral_chain", get_referral_chain)
+        monkeypatch.setattr(fee, "get_all_config", get_all_config)
+        monkeypatch.setattr(fee, "credit_referral_earnings", credit_referral_earnings)
+        fee.invalidate_rate_cache()
+
+        async def run():
+            return [
+                await fee.distribute_referral_fees("trader", order_id, "1.00", ChainFamily.EVM)
+                for order_id in ("o1", "o2", "dup")
+            ]
+
+        results = asyncio.run(run())
+        fee.invalidate_rate_cache()
+
+        assert len(config_reads) == 1
+        assert results[0]["total_distributed"] == "0.630000"
+        assert "already_credited" not in results[0]
+        assert results[2]["already_credited"] is True
+        assert results[2]["total_distributed"] == "0"
+        assert credited[0] == [
+            (1, "r1", Decimal("0.500000")),  # custom rate
+            (2, "r2", Decimal("0.100000")),  # configured tier rate
+            (3, "r3", Decimal("0.030000")),  # default tier rate
+        ]
+
 
 class TestStartWithReferral:
     """Test /start command with referral code."""